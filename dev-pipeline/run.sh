@@ -7,9 +7,21 @@ set -euo pipefail
 # Drives the prizm-dev-team multi-agent team through iterative
 # CodeBuddy CLI sessions to build a complete app from a feature list.
 #
+# Pipeline state lives in a resident controller process
+# (scripts/pipeline_controller.py) that this script talks to over a
+# pair of FIFOs, so each loop iteration costs a few pipe round trips
+# instead of several Python interpreter launches.  Instead of sleeping,
+# the runner asks the controller to wait for session events (exit,
+# session-status.json written, stale heartbeat, feature list changes);
+# the controller watches the session directories with inotify where
+# available and polls otherwise.
+#
 # Usage:
-#   ./run.sh run [feature-list.json]    Start/resume the pipeline
-#   ./run.sh status [feature-list.json] Show pipeline status
+#   ./run.sh run [feature-list.json] [--parallel N]  Start/resume the pipeline
+#   ./run.sh plan [feature-list.json] [--parallel N] Show execution waves and critical path
+#   ./run.sh status [feature-list.json] [--tail N] [--errors]
+#                                       Show pipeline status (and session log excerpts)
+#   ./run.sh stats [--trace FILE]       Show phase timings, retry cost and throughput
 #   ./run.sh reset                      Clear all state and start fresh
 #
 # Environment Variables:
@@ -17,6 +29,13 @@ set -euo pipefail
 #   SESSION_TIMEOUT       Session timeout in seconds (default: 3600)
 #   CODEBUDDY_CLI         CLI command name (default: cbc)
 #   HEARTBEAT_STALE_THRESHOLD  Heartbeat stale threshold in seconds (default: 600)
+#   PARALLEL_SESSIONS     Concurrent CodeBuddy sessions (default: 1)
+#   SESSION_EXIT_GRACE    Seconds a session may keep running after writing
+#                         session-status.json before it is stopped (default: 60)
+#   PROMPT_CACHE          Set to 0 to render bootstrap prompts without the
+#                         fragment cache (same as --no-cache)
+#   LOG_MAX_MB            Rotate a session log after this many MiB (default: 64)
+#   LOG_QUOTA_MB          Disk quota for all session logs in MiB (default: 2048)
 # ============================================================
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
@@ -28,10 +47,26 @@ MAX_RETRIES=${MAX_RETRIES:-3}
 SESSION_TIMEOUT=${SESSION_TIMEOUT:-3600}
 HEARTBEAT_STALE_THRESHOLD=${HEARTBEAT_STALE_THRESHOLD:-600}
 CODEBUDDY_CLI=${CODEBUDDY_CLI:-"cbc"}
+PARALLEL_SESSIONS=${PARALLEL_SESSIONS:-1}
+SESSION_EXIT_GRACE=${SESSION_EXIT_GRACE:-60}
+PROMPT_CACHE=${PROMPT_CACHE:-1}
+LOG_MAX_MB=${LOG_MAX_MB:-64}
+LOG_QUOTA_MB=${LOG_QUOTA_MB:-2048}
+
+# Upper bound for one controller wait, so a session process that died
+# without writing its exit code is still noticed.
+WAIT_TIMEOUT=30
 
 # Feature list path (set in main, used by cleanup trap)
 FEATURE_LIST=""
 
+# Controller process state (set by ctl_start)
+CTL_DIR="$STATE_DIR/.controller"
+CTL_PID=""
+CTL_SEQ=0
+CTL_RESPONSE=""
+CTL_PENDING=0
+
 # Colors for output
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -45,6 +80,85 @@ log_warn()    { echo -e "${YELLOW}[WARN]${NC}    $(date '+%Y-%m-%d %H:%M:%S') $*
 log_error()   { echo -e "${RED}[ERROR]${NC}   $(date '+%Y-%m-%d %H:%M:%S') $*"; }
 log_success() { echo -e "${GREEN}[SUCCESS]${NC} $(date '+%Y-%m-%d %H:%M:%S') $*"; }
 
+# ============================================================
+# Pipeline Controller Client
+# ============================================================
+
+# Run a single controller method without starting the resident process.
+# Args: method [params-json]
+ctl_exec() {
+    local params="${2:-}"
+    [[ -z "$params" ]] && params='{}'
+    python3 "$SCRIPTS_DIR/pipeline_controller.py" \
+        --feature-list "$FEATURE_LIST" \
+        --state-dir "$STATE_DIR" \
+        --max-retries "$MAX_RETRIES" \
+        --stale-threshold "$HEARTBEAT_STALE_THRESHOLD" \
+        exec "$1" --params "$params"
+}
+
+# Start the resident controller with its stdin/stdout bound to FIFOs.
+# Requests are written to fd 3 and responses read from fd 4.
+ctl_start() {
+    rm -rf "$CTL_DIR"
+    mkdir -p "$CTL_DIR"
+    mkfifo "$CTL_DIR/req" "$CTL_DIR/resp"
+
+    python3 "$SCRIPTS_DIR/pipeline_controller.py" \
+        --feature-list "$FEATURE_LIST" \
+        --state-dir "$STATE_DIR" \
+        --max-retries "$MAX_RETRIES" \
+        --stale-threshold "$HEARTBEAT_STALE_THRESHOLD" \
+        serve <"$CTL_DIR/req" >"$CTL_DIR/resp" 2>"$CTL_DIR/controller.log" &
+    CTL_PID=$!
+
+    exec 3>"$CTL_DIR/req"
+    exec 4<"$CTL_DIR/resp"
+}
+
+# Send one JSON-RPC request and store the response line in CTL_RESPONSE.
+# Args: method [params-json]
+ctl_call() {
+    local method="$1"
+    local params="${2:-}"
+    [[ -z "$params" ]] && params='{}'
+
+    CTL_SEQ=$((CTL_SEQ + 1))
+    printf '{"jsonrpc":"2.0","id":%d,"method":"%s","params":%s}\n' \
+        "$CTL_SEQ" "$method" "$params" >&3
+    # A request interrupted by a signal (e.g. a blocking wait) still has
+    # its response in the pipe; skip it before reading ours.
+    if [[ $CTL_PENDING -eq 1 ]]; then
+        IFS= read -r CTL_RESPONSE <&4 || true
+    fi
+    CTL_PENDING=1
+    if ! IFS= read -r CTL_RESPONSE <&4; then
+        log_error "Pipeline controller exited unexpectedly (see $CTL_DIR/controller.log)"
+        CTL_PID=""
+        exit 1
+    fi
+    CTL_PENDING=0
+    if [[ "$CTL_RESPONSE" == *'"error":'* ]]; then
+        log_error "Controller $method failed: $(jq -r '.error.message' <<< "$CTL_RESPONSE")"
+        return 1
+    fi
+}
+
+ctl_stop() {
+    if [[ -n "$CTL_PID" ]]; then
+        local reply
+        printf '{"jsonrpc":"2.0","method":"shutdown"}\n' >&3 2>/dev/null || true
+        if [[ $CTL_PENDING -eq 1 ]]; then
+            IFS= read -r reply <&4 2>/dev/null || true
+        fi
+        IFS= read -r reply <&4 2>/dev/null || true
+        exec 3>&- 4<&-
+        wait "$CTL_PID" 2>/dev/null || true
+        CTL_PID=""
+        rm -rf "$CTL_DIR"
+    fi
+}
+
 # ============================================================
 # Graceful Shutdown
 # ============================================================
@@ -53,17 +167,49 @@ cleanup() {
     echo ""
     log_warn "Received interrupt signal. Saving state..."
 
-    if [[ -n "$FEATURE_LIST" && -f "$FEATURE_LIST" ]]; then
-        python3 "$SCRIPTS_DIR/update-feature-status.py" \
-            --feature-list "$FEATURE_LIST" \
-            --state-dir "$STATE_DIR" \
-            --action pause 2>/dev/null || true
+    # The signal may land inside an `IFS= read`; restore word splitting.
+    local IFS=$' \t\n'
+
+    # Stop sessions started by the parallel runner
+    local child_pids
+    child_pids=$(jobs -p 2>/dev/null || true)
+    if [[ -n "$CTL_PID" ]]; then
+        child_pids=$(echo "$child_pids" | grep -vx "$CTL_PID" || true)
+    fi
+    if [[ -n "$child_pids" ]]; then
+        # Runner subshells exit on the signal but their pipelines (timeout +
+        # CLI, log sink) would keep running: stop those too and wait for
+        # everything to exit before recording the paused state.
+        local pid descendants=""
+        for pid in $child_pids; do
+            descendants+=" $(pgrep -P "$pid" 2>/dev/null | tr '\n' ' ' || true)"
+            stop_session "$pid"
+        done
+        wait $child_pids 2>/dev/null || true
+        local deadline=$(( $(date +%s) + 10 ))
+        for pid in $descendants; do
+            while kill -0 "$pid" 2>/dev/null; do
+                if [[ $(date +%s) -ge $deadline ]]; then
+                    kill -KILL "$pid" 2>/dev/null || true
+                    break
+                fi
+                sleep 0.1
+            done
+        done
+    fi
+
+    if [[ -n "$CTL_PID" ]] && kill -0 "$CTL_PID" 2>/dev/null; then
+        ctl_call pause >/dev/null 2>&1 || true
+    elif [[ -n "$FEATURE_LIST" && -f "$FEATURE_LIST" && -f "$STATE_DIR/pipeline.json" ]]; then
+        ctl_exec pause >/dev/null 2>&1 || true
     fi
+    ctl_stop
 
     log_info "Pipeline paused. Run './run.sh run' to resume."
     exit 130
 }
 trap cleanup SIGINT SIGTERM
+trap ctl_stop EXIT
 
 # ============================================================
 # Dependency Check
@@ -90,6 +236,280 @@ check_dependencies() {
     fi
 }
 
+# ============================================================
+# Feature Session
+# ============================================================
+
+# Run one CodeBuddy session for a feature. The CLI exit code is written
+# to "$session_dir/exit-code"; the caller reports it to the controller.
+# Args: feature_list feature_id session_id run_id retry_count resume_phase background
+# When background is "true" the session output only goes to its log file.
+run_feature_session() {
+    local feature_list="$1"
+    local feature_id="$2"
+    local session_id="$3"
+    local run_id="$4"
+    local retry_count="$5"
+    local resume_phase="$6"
+    local background="${7:-false}"
+
+    local session_dir="$STATE_DIR/features/$feature_id/sessions/$session_id"
+    mkdir -p "$session_dir/logs"
+
+    local bootstrap_prompt="$session_dir/bootstrap-prompt.md"
+    local -a cache_args=()
+    [[ "$PROMPT_CACHE" == "0" ]] && cache_args=(--no-cache)
+    python3 "$SCRIPTS_DIR/generate-bootstrap-prompt.py" \
+        --feature-list "$feature_list" \
+        --feature-id "$feature_id" \
+        --session-id "$session_id" \
+        --run-id "$run_id" \
+        --retry-count "$retry_count" \
+        --max-retries "$MAX_RETRIES" \
+        --resume-phase "$resume_phase" \
+        --state-dir "$STATE_DIR" \
+        --output "$bootstrap_prompt" \
+        ${cache_args[@]+"${cache_args[@]}"} >/dev/null 2>&1
+
+    # Run CodeBuddy CLI session (controller FIFOs are not inherited)
+    log_info "Spawning CodeBuddy session: $session_id"
+    local exit_code=0
+
+    # Output goes through a rotating, compressing log sink (echoed to the
+    # terminal for foreground sessions)
+    local -a sink_args=(
+        sink --log-dir "$session_dir/logs" --state-dir "$STATE_DIR"
+        --max-bytes $((LOG_MAX_MB * 1024 * 1024))
+        --quota-bytes $((LOG_QUOTA_MB * 1024 * 1024))
+    )
+    [[ "$background" != "true" ]] && sink_args+=(--echo)
+
+    if timeout "$SESSION_TIMEOUT" "$CODEBUDDY_CLI" \
+        --print "$bootstrap_prompt" \
+        --yes \
+        2>&1 3>&- 4<&- | python3 "$SCRIPTS_DIR/session_log.py" "${sink_args[@]}"; then
+        exit_code=0
+    else
+        exit_code=$?
+    fi
+
+    # Written atomically: the controller treats its appearance as "session exited"
+    echo "$exit_code" > "$session_dir/exit-code.tmp"
+    mv "$session_dir/exit-code.tmp" "$session_dir/exit-code"
+}
+
+# Print a session id for a feature that does not collide with an
+# earlier session started in the same second.
+# Args: feature_id
+new_session_id() {
+    local base
+    base="$1-$(date +%Y%m%d%H%M%S)"
+    local session_id="$base" n=1
+    while [[ -e "$STATE_DIR/features/$1/sessions/$session_id" ]]; do
+        n=$((n + 1))
+        session_id="$base-$n"
+    done
+    echo "$session_id"
+}
+
+# Stop a session that is still running, including its CLI process.
+# Args: pid
+stop_session() {
+    pkill -TERM -P "$1" 2>/dev/null || true
+    kill -TERM "$1" 2>/dev/null || true
+}
+
+# Block on controller events until the foreground session exits.
+# Args: feature_id session_id pid
+wait_for_session() {
+    local feature_id="$1"
+    local session_id="$2"
+    local pid="$3"
+    local grace_deadline=0
+
+    while kill -0 "$pid" 2>/dev/null; do
+        local timeout=$WAIT_TIMEOUT
+        if [[ $grace_deadline -gt 0 ]]; then
+            local left=$((grace_deadline - $(date +%s)))
+            if [[ $left -le 0 ]]; then
+                log_warn "[$feature_id] Session still running ${SESSION_EXIT_GRACE}s after writing its status — stopping it"
+                stop_session "$pid"
+                break
+            fi
+            [[ $left -lt $timeout ]] && timeout=$left
+        fi
+
+        ctl_call wait "{\"timeout\":$timeout}"
+        local event event_feature
+        eval "$(jq -r '.result | @sh "event=\(.event) event_feature=\(.feature_id // "")"' <<< "$CTL_RESPONSE")"
+        case "$event" in
+            session_finished)
+                [[ "$event_feature" == "$feature_id" ]] && break
+                ;;
+            status_written)
+                if [[ "$event_feature" == "$feature_id" && $grace_deadline -eq 0 ]]; then
+                    grace_deadline=$(( $(date +%s) + SESSION_EXIT_GRACE ))
+                fi
+                ;;
+            heartbeat_stale)
+                report_stuck_features
+                ;;
+        esac
+    done
+    wait "$pid" 2>/dev/null || true
+}
+
+# Report a finished session to the controller and log the outcome.
+# Args: feature_id session_id
+finish_feature_session() {
+    local feature_id="$1"
+    local session_id="$2"
+    local session_dir="$STATE_DIR/features/$feature_id/sessions/$session_id"
+
+    local exit_code=""
+    if [[ -f "$session_dir/exit-code" ]]; then
+        exit_code=$(<"$session_dir/exit-code")
+    fi
+    [[ -z "$exit_code" ]] && exit_code=1
+
+    ctl_call update "{\"feature_id\":\"$feature_id\",\"session_id\":\"$session_id\",\"exit_code\":$exit_code}"
+
+    local session_status feature_status
+    eval "$(jq -r '.result | @sh "session_status=\(.session_status) feature_status=\(.feature_status)"' <<< "$CTL_RESPONSE")"
+
+    case "$session_status" in
+        timed_out) log_warn "[$feature_id] Session timed out after ${SESSION_TIMEOUT}s" ;;
+        crashed)   log_warn "[$feature_id] Session ended without status file — treating as crashed" ;;
+    esac
+    log_info "[$feature_id] Session result: $session_status (feature: $feature_status)"
+}
+
+# ============================================================
+# Stuck Detection
+# ============================================================
+
+report_stuck_features() {
+    ctl_call detect_stuck || return 0
+    if [[ "$CTL_RESPONSE" != *'"stuck_count": 0'* ]]; then
+        local stuck_lines
+        stuck_lines=$(jq -r '.result.stuck_features[] | "  - \(.feature_id): \(.reason) — \(.suggestion)"' <<< "$CTL_RESPONSE")
+        log_warn "Detected $(echo "$stuck_lines" | grep -c .) stuck feature(s):"
+        echo "$stuck_lines"
+    fi
+}
+
+# ============================================================
+# Parallel Loop
+# ============================================================
+
+# Keep up to PARALLEL_SESSIONS sessions running, starting ready features
+# in critical-path order as soon as a slot frees up.
+run_parallel_loop() {
+    local feature_list="$1"
+    local run_id="$2"
+    local session_count=0
+    local -a running_pids=()
+    local -a running_ids=()
+    local -a running_sessions=()
+    local -a running_grace=()
+
+    while true; do
+        # Reap finished sessions
+        local -a alive_pids=()
+        local -a alive_ids=()
+        local -a alive_sessions=()
+        local -a alive_grace=()
+        local i
+        for i in ${running_pids[@]+"${!running_pids[@]}"}; do
+            if kill -0 "${running_pids[$i]}" 2>/dev/null; then
+                alive_pids+=("${running_pids[$i]}")
+                alive_ids+=("${running_ids[$i]}")
+                alive_sessions+=("${running_sessions[$i]}")
+                alive_grace+=("${running_grace[$i]}")
+            else
+                wait "${running_pids[$i]}" 2>/dev/null || true
+                finish_feature_session "${running_ids[$i]}" "${running_sessions[$i]}"
+                session_count=$((session_count + 1))
+            fi
+        done
+        running_pids=(${alive_pids[@]+"${alive_pids[@]}"})
+        running_ids=(${alive_ids[@]+"${alive_ids[@]}"})
+        running_sessions=(${alive_sessions[@]+"${alive_sessions[@]}"})
+        running_grace=(${alive_grace[@]+"${alive_grace[@]}"})
+
+        report_stuck_features
+
+        local free_slots=$((PARALLEL_SESSIONS - ${#running_pids[@]}))
+        local signal=""
+        if [[ $free_slots -gt 0 ]]; then
+            ctl_call get_next "{\"limit\":$free_slots}"
+            signal=$(jq -r '.result.signal // ""' <<< "$CTL_RESPONSE")
+
+            local line
+            while IFS= read -r line; do
+                [[ -z "$line" ]] && continue
+                local feature_id feature_title retry_count resume_phase session_id
+                eval "$line"
+
+                session_id=$(new_session_id "$feature_id")
+                ctl_call start "{\"feature_id\":\"$feature_id\",\"session_id\":\"$session_id\"}"
+
+                log_info "Feature: ${BOLD}$feature_id${NC} — $feature_title (retry $retry_count / $MAX_RETRIES)"
+                run_feature_session "$feature_list" "$feature_id" "$session_id" "$run_id" \
+                    "$retry_count" "$resume_phase" true 3>&- 4<&- &
+                running_pids+=("$!")
+                running_ids+=("$feature_id")
+                running_sessions+=("$session_id")
+                running_grace+=(0)
+            done < <(jq -r '.result.features[] | @sh "feature_id=\(.feature_id) feature_title=\(.title) retry_count=\(.retry_count) resume_phase=\(.resume_from_phase // "null")"' <<< "$CTL_RESPONSE")
+        fi
+
+        if [[ "$signal" == "PIPELINE_COMPLETE" && ${#running_pids[@]} -eq 0 ]]; then
+            echo ""
+            log_success "════════════════════════════════════════════════════"
+            log_success "  All features completed! Pipeline finished."
+            log_success "  Total sessions: $session_count"
+            log_success "════════════════════════════════════════════════════"
+            break
+        fi
+
+        if [[ "$signal" == "PIPELINE_BLOCKED" && ${#running_pids[@]} -eq 0 ]]; then
+            log_warn "All remaining features are blocked by dependencies or failed."
+            log_warn "Run './run.sh status' to see details."
+            log_warn "Waiting up to 60s for the feature list to change... (Ctrl+C to stop)"
+            ctl_call wait '{"timeout":60}'
+            continue
+        fi
+
+        # Stop sessions that outlived their grace period, then sleep until
+        # the controller reports the next session event.
+        local now timeout=$WAIT_TIMEOUT
+        now=$(date +%s)
+        for i in ${running_pids[@]+"${!running_pids[@]}"}; do
+            local grace="${running_grace[$i]}"
+            [[ $grace -eq 0 ]] && continue
+            if [[ $grace -le $now ]]; then
+                log_warn "[${running_ids[$i]}] Session still running ${SESSION_EXIT_GRACE}s after writing its status — stopping it"
+                stop_session "${running_pids[$i]}"
+                timeout=1
+            elif [[ $((grace - now)) -lt $timeout ]]; then
+                timeout=$((grace - now))
+            fi
+        done
+
+        ctl_call wait "{\"timeout\":$timeout}"
+        local event event_feature
+        eval "$(jq -r '.result | @sh "event=\(.event) event_feature=\(.feature_id // "")"' <<< "$CTL_RESPONSE")"
+        if [[ "$event" == "status_written" ]]; then
+            for i in ${running_ids[@]+"${!running_ids[@]}"}; do
+                if [[ "${running_ids[$i]}" == "$event_feature" && "${running_grace[$i]}" -eq 0 ]]; then
+                    running_grace[$i]=$((now + SESSION_EXIT_GRACE))
+                fi
+            done
+        fi
+    done
+}
+
 # ============================================================
 # Main Loop
 # ============================================================
@@ -114,30 +534,29 @@ main() {
 
     check_dependencies
 
-    # Initialize pipeline state if needed
-    if [[ ! -f "$STATE_DIR/pipeline.json" ]]; then
-        log_info "Initializing pipeline state..."
-        local init_result
-        init_result=$(python3 "$SCRIPTS_DIR/init-pipeline.py" \
-            --feature-list "$feature_list" \
-            --state-dir "$STATE_DIR" 2>&1)
+    ctl_start
 
-        local init_valid
-        init_valid=$(echo "$init_result" | python3 -c "import sys,json; print(json.load(sys.stdin).get('valid', False))" 2>/dev/null || echo "False")
+    # Initialize pipeline state if needed
+    local init_valid="false" init_resumed="false" features_count=0
+    ctl_call init || true
+    eval "$(jq -r '.result // {} | @sh "init_valid=\(.valid // false) init_resumed=\(.resumed // false) features_count=\(.features_count // 0)"' <<< "$CTL_RESPONSE")"
 
-        if [[ "$init_valid" != "True" ]]; then
-            log_error "Pipeline initialization failed:"
-            echo "$init_result"
-            exit 1
-        fi
+    if [[ "$init_valid" != "true" ]]; then
+        log_error "Pipeline initialization failed:"
+        echo "$CTL_RESPONSE"
+        exit 1
+    fi
 
-        local features_count
-        features_count=$(echo "$init_result" | python3 -c "import sys,json; print(json.load(sys.stdin).get('features_count', 0))" 2>/dev/null || echo "0")
-        log_success "Pipeline initialized with $features_count features"
-    else
+    if [[ "$init_resumed" == "true" ]]; then
         log_info "Resuming existing pipeline..."
+    else
+        log_success "Pipeline initialized with $features_count features"
     fi
 
+    local run_id
+    ctl_call resume
+    run_id=$(jq -r '.result.run_id' <<< "$CTL_RESPONSE")
+
     # Print header
     echo ""
     echo -e "${BOLD}════════════════════════════════════════════════════${NC}"
@@ -147,43 +566,33 @@ main() {
     log_info "Max retries per feature: $MAX_RETRIES"
     log_info "Session timeout: ${SESSION_TIMEOUT}s"
     log_info "CodeBuddy CLI: $CODEBUDDY_CLI"
+    log_info "Parallel sessions: $PARALLEL_SESSIONS"
     echo -e "${BOLD}════════════════════════════════════════════════════${NC}"
     echo ""
 
+    if [[ "$PARALLEL_SESSIONS" -gt 1 ]]; then
+        python3 "$SCRIPTS_DIR/scheduler.py" \
+            --feature-list "$feature_list" \
+            --parallel "$PARALLEL_SESSIONS" \
+            --action plan 2>/dev/null || true
+        echo ""
+        run_parallel_loop "$feature_list" "$run_id"
+        return
+    fi
+
     # Main processing loop
     local session_count=0
 
     while true; do
         # Check for stuck features
-        local stuck_result
-        stuck_result=$(python3 "$SCRIPTS_DIR/detect-stuck.py" \
-            --state-dir "$STATE_DIR" \
-            --feature-list "$FEATURE_LIST" \
-            --max-retries "$MAX_RETRIES" \
-            --stale-threshold "$HEARTBEAT_STALE_THRESHOLD" 2>/dev/null || echo '{"stuck_count": 0}')
-
-        local stuck_count
-        stuck_count=$(echo "$stuck_result" | python3 -c "import sys,json; print(json.load(sys.stdin).get('stuck_count', 0))" 2>/dev/null || echo "0")
-
-        if [[ "$stuck_count" -gt 0 ]]; then
-            log_warn "Detected $stuck_count stuck feature(s):"
-            echo "$stuck_result" | python3 -c "
-import sys, json
-data = json.load(sys.stdin)
-for f in data.get('stuck_features', []):
-    print(f'  - {f[\"feature_id\"]}: {f[\"reason\"]} — {f[\"suggestion\"]}')
-" 2>/dev/null || true
-        fi
+        report_stuck_features
 
         # Find next feature to process
-        local next_feature
-        next_feature=$(python3 "$SCRIPTS_DIR/update-feature-status.py" \
-            --feature-list "$feature_list" \
-            --state-dir "$STATE_DIR" \
-            --max-retries "$MAX_RETRIES" \
-            --action get_next 2>/dev/null)
+        local feature_id="" feature_title="" retry_count=0 resume_phase="null" signal=""
+        ctl_call get_next '{"limit":1}'
+        eval "$(jq -r '.result | (.features[0] // {}) as $f | @sh "signal=\(.signal // "") feature_id=\($f.feature_id // "") feature_title=\($f.title // "") retry_count=\($f.retry_count // 0) resume_phase=\($f.resume_from_phase // "null")"' <<< "$CTL_RESPONSE")"
 
-        if [[ "$next_feature" == "PIPELINE_COMPLETE" ]]; then
+        if [[ "$signal" == "PIPELINE_COMPLETE" ]]; then
             echo ""
             log_success "════════════════════════════════════════════════════"
             log_success "  All features completed! Pipeline finished."
@@ -192,21 +601,14 @@ for f in data.get('stuck_features', []):
             break
         fi
 
-        if [[ "$next_feature" == "PIPELINE_BLOCKED" ]]; then
+        if [[ -z "$feature_id" ]]; then
             log_warn "All remaining features are blocked by dependencies or failed."
             log_warn "Run './run.sh status' to see details."
-            log_warn "Waiting 60s before re-checking... (Ctrl+C to stop)"
-            sleep 60
+            log_warn "Waiting up to 60s for the feature list to change... (Ctrl+C to stop)"
+            ctl_call wait '{"timeout":60}'
             continue
         fi
 
-        # Parse feature info
-        local feature_id feature_title retry_count resume_phase
-        feature_id=$(echo "$next_feature" | jq -r '.feature_id')
-        feature_title=$(echo "$next_feature" | jq -r '.title')
-        retry_count=$(echo "$next_feature" | jq -r '.retry_count // 0')
-        resume_phase=$(echo "$next_feature" | jq -r '.resume_from_phase // "null"')
-
         echo ""
         echo -e "${BOLD}────────────────────────────────────────────────────${NC}"
         log_info "Feature: ${BOLD}$feature_id${NC} — $feature_title"
@@ -216,83 +618,17 @@ for f in data.get('stuck_features', []):
         fi
         echo -e "${BOLD}────────────────────────────────────────────────────${NC}"
 
-        # Generate session ID and bootstrap prompt
-        local session_id run_id
-        run_id=$(jq -r '.run_id' "$STATE_DIR/pipeline.json")
-        session_id="${feature_id}-$(date +%Y%m%d%H%M%S)"
-
-        local session_dir="$STATE_DIR/features/$feature_id/sessions/$session_id"
-        mkdir -p "$session_dir/logs"
-
-        local bootstrap_prompt="$session_dir/bootstrap-prompt.md"
-        python3 "$SCRIPTS_DIR/generate-bootstrap-prompt.py" \
-            --feature-list "$feature_list" \
-            --feature-id "$feature_id" \
-            --session-id "$session_id" \
-            --run-id "$run_id" \
-            --retry-count "$retry_count" \
-            --resume-phase "$resume_phase" \
-            --state-dir "$STATE_DIR" \
-            --output "$bootstrap_prompt" >/dev/null 2>&1
-
-        # Update current session tracking
-        python3 -c "
-import json, sys
-from datetime import datetime
-data = {
-    'feature_id': '$feature_id',
-    'session_id': '$session_id',
-    'started_at': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
-}
-with open('$STATE_DIR/current-session.json', 'w') as f:
-    json.dump(data, f, indent=2)
-"
-
-        # Run CodeBuddy CLI session
-        log_info "Spawning CodeBuddy session: $session_id"
-        local exit_code=0
-
-        if timeout "$SESSION_TIMEOUT" "$CODEBUDDY_CLI" \
-            --print "$bootstrap_prompt" \
-            --yes \
-            2>&1 | tee "$session_dir/logs/session.log"; then
-            exit_code=0
-        else
-            exit_code=$?
-        fi
+        # Generate session ID and record the session start
+        local session_id
+        session_id=$(new_session_id "$feature_id")
+        ctl_call start "{\"feature_id\":\"$feature_id\",\"session_id\":\"$session_id\"}"
 
-        # Check session outcome
-        local session_status_file="$session_dir/session-status.json"
-        local session_status
-
-        if [[ $exit_code -eq 124 ]]; then
-            log_warn "Session timed out after ${SESSION_TIMEOUT}s"
-            session_status="timed_out"
-        elif [[ -f "$session_status_file" ]]; then
-            session_status=$(python3 "$SCRIPTS_DIR/check-session-status.py" \
-                --status-file "$session_status_file" 2>/dev/null)
-        else
-            log_warn "Session ended without status file — treating as crashed"
-            session_status="crashed"
-        fi
-
-        log_info "Session result: $session_status"
-
-        # Update feature status based on session outcome
-        python3 "$SCRIPTS_DIR/update-feature-status.py" \
-            --feature-list "$feature_list" \
-            --state-dir "$STATE_DIR" \
-            --feature-id "$feature_id" \
-            --session-status "$session_status" \
-            --session-id "$session_id" \
-            --max-retries "$MAX_RETRIES" \
-            --action update >/dev/null 2>&1
+        run_feature_session "$feature_list" "$feature_id" "$session_id" "$run_id" \
+            "$retry_count" "$resume_phase" false 3>&- 4<&- &
+        wait_for_session "$feature_id" "$session_id" "$!"
+        finish_feature_session "$feature_id" "$session_id"
 
         session_count=$((session_count + 1))
-
-        # Brief pause before next iteration
-        log_info "Pausing 5s before next feature..."
-        sleep 5
     done
 }
 
@@ -301,11 +637,13 @@ with open('$STATE_DIR/current-session.json', 'w') as f:
 # ============================================================
 
 show_help() {
-    echo "Usage: $0 <command> [feature-list.json]"
+    echo "Usage: $0 <command> [feature-list.json] [--parallel N]"
     echo ""
     echo "Commands:"
     echo "  run      Start or resume the pipeline (default)"
+    echo "  plan     Show execution waves, critical path and estimated makespan"
     echo "  status   Show current pipeline status"
+    echo "  stats    Show p50/p95 phase durations, retry cost and throughput"
     echo "  reset    Clear all state and start fresh"
     echo "  help     Show this help message"
     echo ""
@@ -314,17 +652,87 @@ show_help() {
     echo "  SESSION_TIMEOUT       Session timeout in seconds (default: 3600)"
     echo "  CODEBUDDY_CLI         CLI command name (default: cbc)"
     echo "  HEARTBEAT_STALE_THRESHOLD  Heartbeat stale threshold in seconds (default: 600)"
+    echo "  PARALLEL_SESSIONS     Concurrent CodeBuddy sessions (default: 1)"
+    echo "  SESSION_EXIT_GRACE    Seconds a session may run after writing its status (default: 60)"
+    echo "  PROMPT_CACHE          Set to 0 to disable the bootstrap prompt cache (default: 1)"
+    echo "  LOG_MAX_MB            Rotate a session log after this many MiB (default: 64)"
+    echo "  LOG_QUOTA_MB          Disk quota for all session logs in MiB (default: 2048)"
+    echo ""
+    echo "Options:"
+    echo "  --parallel N          Run up to N feature sessions at once (overrides PARALLEL_SESSIONS)"
+    echo "  --no-cache            Render every bootstrap prompt from scratch (PROMPT_CACHE=0)"
+    echo "  --trace FILE          (stats) Also export a Chrome trace-event file of the run"
+    echo "  --tail N              (status) Show the last N log lines of unfinished features"
+    echo "  --errors              (status) Show indexed error lines of unfinished features"
     echo ""
     echo "Examples:"
     echo "  ./run.sh run                                    # Run with default feature-list.json"
     echo "  ./run.sh run /path/to/feature-list.json         # Run with custom feature list"
+    echo "  ./run.sh run feature-list.json --parallel 4     # Run independent features 4 at a time"
+    echo "  ./run.sh plan feature-list.json --parallel 4    # Preview waves and critical path"
     echo "  ./run.sh status                                 # Show pipeline status"
+    echo "  ./run.sh stats --trace trace.json               # Timings + trace for chrome://tracing"
     echo "  MAX_RETRIES=5 SESSION_TIMEOUT=7200 ./run.sh run # Custom config"
 }
 
-case "${1:-run}" in
+# Split positional arguments from options
+COMMAND="${1:-run}"
+[[ $# -gt 0 ]] && shift
+POSITIONAL=()
+TRACE_OUTPUT=""
+STATUS_TAIL=0
+STATUS_ERRORS=false
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --no-cache)
+            PROMPT_CACHE=0
+            shift
+            ;;
+        --tail)
+            STATUS_TAIL="${2:-}"
+            shift 2 || shift
+            ;;
+        --errors)
+            STATUS_ERRORS=true
+            shift
+            ;;
+        --trace)
+            TRACE_OUTPUT="${2:-}"
+            shift 2 || shift
+            ;;
+        --trace=*)
+            TRACE_OUTPUT="${1#--trace=}"
+            shift
+            ;;
+        --parallel)
+            PARALLEL_SESSIONS="${2:-}"
+            shift 2 || shift
+            ;;
+        --parallel=*)
+            PARALLEL_SESSIONS="${1#--parallel=}"
+            shift
+            ;;
+        *)
+            POSITIONAL+=("$1")
+            shift
+            ;;
+    esac
+done
+if [[ ! "$PARALLEL_SESSIONS" =~ ^[1-9][0-9]*$ ]]; then
+    log_error "--parallel must be a positive integer, got '$PARALLEL_SESSIONS'"
+    exit 1
+fi
+FEATURE_LIST_ARG="${POSITIONAL[0]:-.dev-pipeline/feature-list.json}"
+
+case "$COMMAND" in
     run|resume)
-        main "${2:-.dev-pipeline/feature-list.json}"
+        main "$FEATURE_LIST_ARG"
+        ;;
+    plan)
+        python3 "$SCRIPTS_DIR/scheduler.py" \
+            --feature-list "$FEATURE_LIST_ARG" \
+            --parallel "$PARALLEL_SESSIONS" \
+            --action plan
         ;;
     status)
         check_dependencies
@@ -332,10 +740,19 @@ case "${1:-run}" in
             log_error "No pipeline state found. Run './run.sh run' first."
             exit 1
         fi
-        python3 "$SCRIPTS_DIR/update-feature-status.py" \
-            --feature-list "${2:-.dev-pipeline/feature-list.json}" \
-            --state-dir "$STATE_DIR" \
-            --action status
+        FEATURE_LIST="$FEATURE_LIST_ARG"
+        if [[ ! "$STATUS_TAIL" =~ ^[0-9]+$ ]]; then
+            log_error "--tail must be a non-negative integer, got '$STATUS_TAIL'"
+            exit 1
+        fi
+        ctl_exec status "{\"format\": \"text\", \"tail\": $STATUS_TAIL, \"errors\": $STATUS_ERRORS}"
+        ;;
+    stats)
+        python3 "$SCRIPTS_DIR/pipeline_metrics.py" --state-dir "$STATE_DIR" report
+        if [[ -n "$TRACE_OUTPUT" ]]; then
+            python3 "$SCRIPTS_DIR/pipeline_metrics.py" --state-dir "$STATE_DIR" \
+                trace --output "$TRACE_OUTPUT"
+        fi
         ;;
     reset)
         log_warn "Resetting pipeline state..."
@@ -346,7 +763,7 @@ case "${1:-run}" in
         show_help
         ;;
     *)
-        log_error "Unknown command: $1"
+        log_error "Unknown command: $COMMAND"
         show_help
         exit 1
         ;;
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+bench_controller.py - Measure per-iteration state overhead of the runner.
+
+Drives a synthetic feature list to completion twice, without running any
+CodeBuddy sessions:
+
+  one-shot   every state call launches ``pipeline_controller.py exec``,
+             the way run.sh used to launch one Python script per action
+  resident   a single ``pipeline_controller.py serve`` process answers
+             the same calls over a JSON-RPC pipe
+
+Each loop iteration issues detect_stuck, get_next, start and update, the
+calls run.sh makes per feature.  With an indexed state store the
+per-iteration cost should stay flat as --features grows; use
+--resident-only for large lists, where the one-shot run takes minutes.
+
+Usage:
+  python3 bench_controller.py [--features 50] [--resident-only]
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+CONTROLLER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline_controller.py")
+
+
+def make_feature_list(path, count):
+    """Write a linear chain of *count* features to *path*."""
+    features = []
+    for i in range(count):
+        fid = "F-{:03d}".format(i + 1)
+        deps = ["F-{:03d}".format(i)] if i else []
+        features.append({"id": fid, "title": "Feature {}".format(i + 1),
+                         "dependencies": deps, "estimated_complexity": "low"})
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"app_name": "bench", "features": features}, fh)
+
+
+def _base_args(feature_list, state_dir):
+    return [sys.executable, CONTROLLER, "--feature-list", feature_list, "--state-dir", state_dir]
+
+
+def run_one_shot(feature_list, state_dir):
+    """Return ``(startup_s, iterations, loop_s)`` using one process per call."""
+    base = _base_args(feature_list, state_dir)
+
+    def call(method, params=None):
+        out = subprocess.check_output(base + ["exec", method, "--params", json.dumps(params or {})])
+        return json.loads(out.decode("utf-8"))
+
+    start = time.perf_counter()
+    call("init")
+    call("resume")
+    startup = time.perf_counter() - start
+    return (startup,) + _drive(call)
+
+
+def run_resident(feature_list, state_dir):
+    """Return ``(startup_s, iterations, loop_s)`` using one serve process."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(_base_args(feature_list, state_dir) + ["serve"],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            universal_newlines=True, bufsize=1)
+    seq = [0]
+
+    def call(method, params=None):
+        seq[0] += 1
+        proc.stdin.write(json.dumps({"jsonrpc": "2.0", "id": seq[0], "method": method,
+                                     "params": params or {}}) + "\n")
+        proc.stdin.flush()
+        response = json.loads(proc.stdout.readline())
+        if "error" in response:
+            raise RuntimeError(response["error"]["message"])
+        return response["result"]
+
+    try:
+        call("init")
+        call("resume")
+        startup = time.perf_counter() - start
+        result = _drive(call)
+        call("pause")
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return (startup,) + result
+
+
+def _drive(call):
+    iterations = 0
+    start = time.perf_counter()
+    while True:
+        call("detect_stuck")
+        batch = call("get_next", {"limit": 1})
+        if not batch["features"]:
+            break
+        fid = batch["features"][0]["feature_id"]
+        session_id = "{}-bench".format(fid)
+        call("start", {"feature_id": fid, "session_id": session_id})
+        call("update", {"feature_id": fid, "session_id": session_id, "session_status": "success"})
+        iterations += 1
+    return iterations, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resident vs one-shot controller calls.")
+    parser.add_argument("--features", type=int, default=50, help="Number of features (default: 50)")
+    parser.add_argument("--resident-only", action="store_true",
+                        help="Skip the one-shot run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-controller-")
+    try:
+        feature_list = os.path.join(workdir, "feature-list.json")
+        make_feature_list(feature_list, args.features)
+        print("Synthetic pipeline: {} features, 4 state calls per iteration".format(args.features))
+        runners = [("one-shot", run_one_shot), ("resident", run_resident)]
+        if args.resident_only:
+            runners = runners[1:]
+        for label, runner in runners:
+            state_dir = os.path.join(workdir, "state-" + label)
+            startup, iterations, elapsed = runner(feature_list, state_dir)
+            print("  {:<9} startup {:>8.1f} ms   per iteration {:>7.2f} ms   ({} iterations)".format(
+                label, startup * 1000, elapsed * 1000 / max(iterations, 1), iterations))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
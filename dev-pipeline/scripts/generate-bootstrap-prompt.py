@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+generate-bootstrap-prompt.py - Render the session bootstrap prompt.
+
+Fills templates/bootstrap-prompt.md for one feature session.  Rendering
+happens in two stages:
+
+  1. The feature-specific part (feature text, dependency outputs, global
+     context, agent paths, fresh-start vs resume block) is rendered into a
+     fragment split at the per-session placeholders: a JSON list of
+     literal text alternating with session slot names.  Fragments are
+     stored content-addressed under ``<state-dir>/prompt-cache/blobs/``,
+     keyed by a SHA-256 of the template, the feature object, its dependency
+     outputs, the resume phase and everything else that goes into them.
+  2. The per-session fields (run id, session id, retry count, previous
+     session status, status file path) are joined into the slots.  The
+     rendered feature text is never scanned again, so placeholder-like
+     text in a feature comes out verbatim.
+
+A small stat-keyed index maps (feature list, template, feature, resume
+phase) to the fragment digest, so a retry or resume of an unchanged
+feature skips parsing the feature list altogether.  Cached fragments are
+evicted least-recently-used once the cache exceeds --cache-max-bytes or
+--cache-max-entries.
+
+Usage:
+  python3 generate-bootstrap-prompt.py --feature-list F --feature-id F-001 \\
+      --session-id S --run-id R --retry-count 0 --resume-phase null \\
+      --state-dir state --output prompt.md [--max-retries 3] [--no-cache]
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+import state_store
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.dirname(SCRIPT_DIR)
+REPO_ROOT = os.path.dirname(PIPELINE_DIR)
+DEFAULT_TEMPLATE = os.path.join(PIPELINE_DIR, "templates", "bootstrap-prompt.md")
+
+TEAM_DIR = os.path.join(REPO_ROOT, "agent-team-master", "prizm-dev-team")
+VALIDATOR_SCRIPTS_DIR = os.path.join(TEAM_DIR, "prizm-dev-team-coordinator", "scripts")
+AGENT_PATHS = {
+    "TEAM_CONFIG_PATH": os.path.join(REPO_ROOT, "agent-team-config-master", "prizm-dev-team", "config.json"),
+    "COORDINATOR_SUBAGENT_PATH": os.path.join(TEAM_DIR, "prizm-dev-team-coordinator", "subagent.md"),
+    "PM_SUBAGENT_PATH": os.path.join(TEAM_DIR, "prizm-dev-team-pm", "subagent.md"),
+    "DEV_SUBAGENT_PATH": os.path.join(TEAM_DIR, "prizm-dev-team-dev", "subagent.md"),
+    "QA_SUBAGENT_PATH": os.path.join(TEAM_DIR, "prizm-dev-team-qa", "subagent.md"),
+    "REVIEW_SUBAGENT_PATH": os.path.join(TEAM_DIR, "prizm-dev-team-review", "subagent.md"),
+    "VALIDATOR_SCRIPTS_DIR": VALIDATOR_SCRIPTS_DIR,
+    "INIT_SCRIPT_PATH": os.path.join(VALIDATOR_SCRIPTS_DIR, "init-dev-team.py"),
+}
+
+# Placeholders filled per session (stage 2); everything else is cached.
+SESSION_FIELDS = ("RUN_ID", "SESSION_ID", "RETRY_COUNT", "PREV_SESSION_STATUS",
+                  "SESSION_STATUS_PATH")
+
+CACHE_VERSION = 2
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_CACHE_MAX_ENTRIES = 512
+
+_PLACEHOLDER_RE = re.compile(r"\{\{([A-Z_]+)\}\}")
+_BLOCK_RE = re.compile(r"\{\{IF_([A-Z_]+)\}\}\n?(.*?)\{\{END_IF_\1\}\}\n?", re.S)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _err(msg):
+    """Print an error message to stderr."""
+    print("ERROR: {}".format(msg), file=sys.stderr)
+
+
+def _write_atomic(path, text):
+    parent = os.path.dirname(path)
+    if parent and not os.path.isdir(parent):
+        os.makedirs(parent, exist_ok=True)
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp_path, path)
+
+
+def _sha256(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [os.path.abspath(path), st.st_size, st.st_mtime_ns]
+
+
+def render(template, values, blocks, slots=()):
+    """Single-pass render: keep or drop ``{{IF_X}}`` blocks, then fill
+    ``{{NAME}}`` placeholders present in *values* (others are kept).
+
+    Returns a list of literal text alternating with the names of the
+    placeholders listed in *slots*, which are left for fill_slots().
+    """
+    text = _BLOCK_RE.sub(lambda m: m.group(2) if blocks.get(m.group(1)) else "", template)
+    parts = []
+    literal = []
+    pos = 0
+    for m in _PLACEHOLDER_RE.finditer(text):
+        literal.append(text[pos:m.start()])
+        pos = m.end()
+        name = m.group(1)
+        if name in slots:
+            parts.extend(("".join(literal), name))
+            literal = []
+        else:
+            literal.append(values.get(name, m.group(0)))
+    literal.append(text[pos:])
+    parts.append("".join(literal))
+    return parts
+
+
+def fill_slots(parts, values):
+    """Join a split fragment from render(), filling its slots from *values*."""
+    return "".join(part if i % 2 == 0 else values[part] for i, part in enumerate(parts))
+
+
+# ---------------------------------------------------------------------------
+# Prompt content
+# ---------------------------------------------------------------------------
+
+
+def _bullets(items):
+    if not items:
+        return "- (none)"
+    return "\n".join("- {}".format(item) for item in items)
+
+
+def _format_global_context(context):
+    if not context:
+        return "(none)"
+    if isinstance(context, dict):
+        return "\n".join("- **{}**: {}".format(key.replace("_", " ").title(), value)
+                         for key, value in context.items())
+    return str(context)
+
+
+def dependency_outputs(feature, features_by_id, pipeline, state_dir):
+    """Return ``[{id, title, session_id, artifacts}]`` for completed dependencies.
+
+    Artifacts come from the session-status.json of each dependency's last
+    session recorded in the pipeline state.
+    """
+    records = (pipeline or {}).get("features", {})
+    outputs = []
+    for dep in feature.get("dependencies", []):
+        record = records.get(dep, {})
+        session_id = record.get("last_session_id")
+        artifacts = {}
+        if session_id:
+            status = state_store.load_json(os.path.join(state_dir, "features", dep, "sessions",
+                                             session_id, "session-status.json"))
+            if isinstance(status, dict) and isinstance(status.get("artifacts"), dict):
+                artifacts = status["artifacts"]
+        outputs.append({
+            "id": dep,
+            "title": features_by_id.get(dep, {}).get("title", ""),
+            "session_id": session_id,
+            "artifacts": artifacts,
+        })
+    return outputs
+
+
+def _format_dependencies(outputs):
+    lines = []
+    for out in outputs:
+        line = "{}: {}".format(out["id"], out["title"]) if out["title"] else out["id"]
+        if out["artifacts"]:
+            line += " (artifacts: {})".format(", ".join(
+                "{}={}".format(k, v) for k, v in sorted(out["artifacts"].items())))
+        lines.append(line)
+    return _bullets(lines) if lines else "None — this feature has no dependencies."
+
+
+def feature_fields(feature, outputs, global_context, max_retries, resume_phase, project_root):
+    """Return the stage-1 placeholder values for a feature."""
+    values = dict(AGENT_PATHS)
+    values.update({
+        "FEATURE_ID": feature["id"],
+        "FEATURE_TITLE": feature.get("title", ""),
+        "FEATURE_DESCRIPTION": feature.get("description", "") or "(no description)",
+        "ACCEPTANCE_CRITERIA": _bullets(feature.get("acceptance_criteria", [])),
+        "COMPLETED_DEPENDENCIES": _format_dependencies(outputs),
+        "GLOBAL_CONTEXT": _format_global_context(global_context),
+        "MAX_RETRIES": str(max_retries),
+        "RESUME_PHASE": "N/A" if resume_phase is None else str(resume_phase),
+        "PROJECT_ROOT": project_root,
+    })
+    return values
+
+
+# ---------------------------------------------------------------------------
+# Fragment cache
+# ---------------------------------------------------------------------------
+
+
+class PromptCache(object):
+    """Content-addressed fragment store with a stat-keyed lookup index.
+
+    ``blobs/<sha256>.json`` holds split fragments; ``index/<key>.json``
+    maps a cheap key (file stats + feature id + resume phase) to a blob
+    digest plus the dependency sessions it was rendered from.  Both are
+    written atomically, so concurrent generators never see partial files.
+    A blob's mtime is its last use, which drives LRU eviction.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_CACHE_MAX_BYTES,
+                 max_entries=DEFAULT_CACHE_MAX_ENTRIES):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.index_dir = os.path.join(root, "index")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest + ".json")
+
+    def lookup(self, index_key):
+        """Return the index entry for *index_key*, or None."""
+        entry = state_store.load_json(os.path.join(self.index_dir, index_key + ".json"))
+        if isinstance(entry, dict) and entry.get("version") == CACHE_VERSION:
+            return entry
+        return None
+
+    def get(self, digest):
+        """Return the cached fragment for *digest* (and mark it used), or None."""
+        path = self._blob_path(digest)
+        fragment = state_store.load_json(path)
+        if not isinstance(fragment, list) or len(fragment) % 2 != 1:
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            return None
+        return fragment
+
+    def put(self, index_key, digest, fragment, dep_sessions):
+        _write_atomic(self._blob_path(digest), json.dumps(fragment, ensure_ascii=False))
+        _write_atomic(os.path.join(self.index_dir, index_key + ".json"), json.dumps({
+            "version": CACHE_VERSION,
+            "digest": digest,
+            "dep_sessions": dep_sessions,
+        }, sort_keys=True))
+        self.evict()
+
+    def evict(self):
+        """Drop least-recently-used blobs until the cache is within bounds.
+
+        Blobs left by older cache versions are never read again; they age
+        out with the rest.
+        """
+        try:
+            names = [n for n in os.listdir(self.blob_dir) if not n.endswith(".tmp")]
+        except OSError:
+            return
+        blobs = []
+        total = 0
+        for name in names:
+            try:
+                st = os.stat(os.path.join(self.blob_dir, name))
+            except OSError:
+                continue
+            blobs.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+        blobs.sort()
+        count = len(blobs)
+        for _, size, name in blobs:
+            if total <= self.max_bytes and count <= self.max_entries:
+                break
+            try:
+                os.remove(os.path.join(self.blob_dir, name))
+            except OSError:
+                continue
+            total -= size
+            count -= 1
+        # Index entries pointing at evicted blobs are simply cache misses;
+        # prune them once the index outgrows the blob store.
+        try:
+            index_names = os.listdir(self.index_dir)
+        except OSError:
+            return
+        if len(index_names) > 2 * self.max_entries:
+            for name in index_names:
+                entry = state_store.load_json(os.path.join(self.index_dir, name))
+                if not isinstance(entry, dict) or not os.path.exists(
+                        self._blob_path(str(entry.get("digest")))):
+                    try:
+                        os.remove(os.path.join(self.index_dir, name))
+                    except OSError:
+                        pass
+
+
+# ---------------------------------------------------------------------------
+# Generation
+# ---------------------------------------------------------------------------
+
+
+def _dep_sessions(dependencies, pipeline):
+    records = (pipeline or {}).get("features", {})
+    return {dep: records.get(dep, {}).get("last_session_id") for dep in dependencies}
+
+
+def build_fragment(args, template, pipeline, resume_phase, project_root):
+    """Parse the feature list and render the stage-1 fragment.
+
+    Returns ``(digest, fragment, dependencies)``; the fragment is split at
+    the SESSION_FIELDS placeholders (see render()).
+    """
+    data = state_store.load_json(args.feature_list)
+    if not isinstance(data, dict) or not isinstance(data.get("features"), list):
+        raise ValueError("Cannot read features from {}".format(args.feature_list))
+    features_by_id = {f["id"]: f for f in data["features"] if isinstance(f, dict) and "id" in f}
+    feature = features_by_id.get(args.feature_id)
+    if feature is None:
+        raise ValueError("Feature {} not found in {}".format(args.feature_id, args.feature_list))
+
+    outputs = dependency_outputs(feature, features_by_id, pipeline, args.state_dir)
+    global_context = data.get("global_context")
+    fresh = resume_phase is None
+    digest = _sha256(template.encode("utf-8"), feature, outputs, global_context,
+                     args.max_retries, resume_phase, project_root, AGENT_PATHS)
+    values = feature_fields(feature, outputs, global_context, args.max_retries,
+                            resume_phase, project_root)
+    fragment = render(template, values, {"FRESH_START": fresh, "RESUME": not fresh},
+                      SESSION_FIELDS)
+    return digest, fragment, list(feature.get("dependencies", []))
+
+
+def generate(args):
+    """Render the prompt for *args*; return ``(text, cache_status)``."""
+    resume_phase = None if args.resume_phase in (None, "", "null", "None") else args.resume_phase
+    project_root = os.getcwd()
+    pipeline = state_store.load_state(args.state_dir)
+    template_path = args.template
+
+    cache = None
+    index_key = None
+    fragment = None
+    status = "disabled"
+    if not args.no_cache:
+        cache = PromptCache(os.path.join(args.state_dir, "prompt-cache"),
+                            args.cache_max_bytes, args.cache_max_entries)
+        index_key = _sha256(CACHE_VERSION, _stat_key(args.feature_list), _stat_key(template_path),
+                            args.feature_id, resume_phase, args.max_retries, project_root)
+        entry = cache.lookup(index_key)
+        if entry is not None and entry.get("dep_sessions") == _dep_sessions(
+                entry.get("dep_sessions", {}), pipeline):
+            fragment = cache.get(entry["digest"])
+        status = "hit" if fragment is not None else "miss"
+
+    if fragment is None:
+        with open(template_path, "r", encoding="utf-8") as fh:
+            template = fh.read()
+        digest, fragment_text, dependencies = build_fragment(
+            args, template, pipeline, resume_phase, project_root)
+        if cache is not None:
+            cached = cache.get(digest)
+            if cached is not None:
+                status = "hit"
+            cache.put(index_key, digest, fragment_text, _dep_sessions(dependencies, pipeline))
+        fragment = fragment_text
+
+    record = ((pipeline or {}).get("features", {}).get(args.feature_id) or {})
+    session_dir = os.path.join(os.path.abspath(args.state_dir), "features", args.feature_id,
+                               "sessions", args.session_id)
+    session_values = {
+        "RUN_ID": args.run_id or "",
+        "SESSION_ID": args.session_id,
+        "RETRY_COUNT": str(args.retry_count),
+        "PREV_SESSION_STATUS": record.get("last_session_status") or "N/A",
+        "SESSION_STATUS_PATH": os.path.join(session_dir, "session-status.json"),
+    }
+    return fill_slots(fragment, session_values), status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the dev-pipeline session bootstrap prompt.")
+    parser.add_argument("--feature-list", required=True, help="Path to feature-list.json")
+    parser.add_argument("--feature-id", required=True)
+    parser.add_argument("--session-id", required=True)
+    parser.add_argument("--run-id", default="")
+    parser.add_argument("--retry-count", type=int, default=0)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--resume-phase", default="null",
+                        help="Phase to resume from, or 'null' for a fresh start")
+    parser.add_argument("--state-dir", required=True, help="Pipeline state directory")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="Prompt template path")
+    parser.add_argument("--output", required=True, help="Where to write the prompt")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Render from scratch without reading or writing the prompt cache")
+    parser.add_argument("--cache-max-bytes", type=int, default=DEFAULT_CACHE_MAX_BYTES,
+                        help="Prompt cache size bound in bytes (default: 16 MiB)")
+    parser.add_argument("--cache-max-entries", type=int, default=DEFAULT_CACHE_MAX_ENTRIES,
+                        help="Prompt cache entry bound (default: 512)")
+    args = parser.parse_args()
+
+    try:
+        text, status = generate(args)
+        _write_atomic(args.output, text)
+    except (OSError, ValueError) as exc:
+        _err(str(exc))
+        return 1
+    print(json.dumps({"output": args.output, "cache": status}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,827 @@
+#!/usr/bin/env python3
+"""
+pipeline_controller.py - Resident state controller for the dev-pipeline runner.
+
+Keeps the feature list and pipeline state in memory and answers requests
+over a line-delimited JSON-RPC channel on stdin/stdout, so run.sh does not
+have to launch a Python interpreter for every state query.  Each mutation
+appends the changed feature record to ``<state-dir>/pipeline.journal``;
+``pipeline.json`` is the compacted snapshot (see state_store.py).
+
+Features are indexed by status, and pending features keep a count of
+unfinished dependencies, so get_next, detect_stuck and wait only touch
+ready, in-progress and failed features instead of scanning the whole
+list on every runner loop.
+
+Modes:
+  serve                 Read one JSON-RPC request per line from stdin and
+                        write one response line to stdout
+  exec METHOD           Load state, run a single method, print the result
+
+Methods:
+  init          Validate the feature list and create pipeline.json
+  resume        Return features left in progress to pending and mark the
+                pipeline running (called by run.sh at startup)
+  get_next      Ready features in critical-path order (params: limit);
+                marks the pipeline completed once every feature is done
+  start         Mark a feature in progress (params: feature_id, session_id)
+  update        Record a session outcome (params: feature_id, session_id,
+                session_status | exit_code)
+  detect_stuck  Report failed, blocked and stale features
+  status        Pipeline summary (params: format = json|text, tail = N log
+                lines, errors = bool; log excerpts cover unfinished features)
+  wait          Block until a running session finishes or writes its status,
+                a heartbeat goes stale, or the feature list changes
+                (params: timeout)
+  pause         Mark the pipeline paused
+  shutdown      Stop the serve loop
+
+Request:  {"jsonrpc": "2.0", "id": 1, "method": "get_next", "params": {"limit": 1}}
+Response: {"jsonrpc": "2.0", "id": 1, "result": {...}}
+
+Usage:
+  python3 pipeline_controller.py --feature-list F --state-dir S [--max-retries 3] serve
+  python3 pipeline_controller.py --feature-list F --state-dir S exec status --params '{"format": "text"}'
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import argparse
+import inspect
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+from datetime import datetime, timezone
+
+import pipeline_metrics
+import scheduler
+import session_log
+from session_watcher import DirectoryWatcher
+from state_store import StateStore, load_json, write_json_atomic
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+FEATURE_PENDING = "pending"
+FEATURE_IN_PROGRESS = "in_progress"
+FEATURE_COMPLETED = "completed"
+FEATURE_FAILED = "failed"
+FEATURE_STATUSES = (FEATURE_PENDING, FEATURE_IN_PROGRESS, FEATURE_COMPLETED, FEATURE_FAILED)
+
+SESSION_STATUSES = {"success", "partial", "failed"}
+
+# Written by run.sh when the CLI process of a session exits.
+EXIT_CODE_FILE = "exit-code"
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _err(msg):
+    """Print an error message to stderr."""
+    print("ERROR: {}".format(msg), file=sys.stderr)
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class ControllerError(Exception):
+    """Raised for invalid requests; reported as a JSON-RPC error."""
+
+
+class InvalidParams(ControllerError):
+    """Raised when a method's params do not fit its signature or values."""
+
+
+# ---------------------------------------------------------------------------
+# Controller
+# ---------------------------------------------------------------------------
+
+
+class PipelineController(object):
+    """In-memory pipeline state with the runner's state-management actions."""
+
+    def __init__(self, feature_list, state_dir, max_retries=3, stale_threshold=600):
+        self.feature_list = os.path.abspath(feature_list)
+        self.state_dir = os.path.abspath(state_dir)
+        self.max_retries = max_retries
+        self.stale_threshold = stale_threshold
+        self._features_mtime = None
+        self.schedule = None
+        # Set by serve(): wait() returns early when a request arrives.
+        self.requests = None
+        self._notified_status = set()
+        self._notified_stale = set()
+        # Indices over self.state["features"], rebuilt with the schedule.
+        self._status = {}
+        self._members = {}
+        self._unmet = {}
+        self._ready = set()
+        self._position = {}
+        self.store = StateStore(self.state_dir)
+        self.state = self.store.load()
+        if self.state is not None:
+            self._reload_features()
+
+    # -- loading -------------------------------------------------------
+
+    def _reload_features(self):
+        """(Re)load the feature list when it changed on disk."""
+        try:
+            mtime = os.stat(self.feature_list).st_mtime
+        except OSError:
+            raise ControllerError("Feature list not found: {}".format(self.feature_list))
+        if mtime == self._features_mtime:
+            return
+        data = load_json(self.feature_list)
+        if not isinstance(data, dict) or not isinstance(data.get("features"), list):
+            raise ControllerError("Cannot read features from {}".format(self.feature_list))
+        features = [f for f in data["features"] if isinstance(f, dict) and "id" in f]
+        try:
+            self.schedule = scheduler.Schedule(features)
+        except ValueError as exc:
+            raise ControllerError(str(exc))
+        self._features_mtime = mtime
+        if self.state is not None:
+            self._reconcile()
+            self._rebuild_index()
+
+    def _reconcile(self):
+        """Make sure every feature has a progress record.
+
+        Features without one (older state files, or features added to the
+        list) are seeded from their session history on disk.
+        """
+        records = self.state.setdefault("features", {})
+        missing = [fid for fid in self.schedule.ids if fid not in records]
+        if missing:
+            progress = scheduler.collect_progress(self.state_dir, missing)
+            for fid in missing:
+                info = progress[fid]
+                if info["done"]:
+                    status = FEATURE_COMPLETED
+                elif info["retry_count"] > self.max_retries:
+                    status = FEATURE_FAILED
+                else:
+                    status = FEATURE_PENDING
+                records[fid] = {
+                    "status": status,
+                    "retry_count": info["retry_count"],
+                    "resume_from_phase": info["resume_from_phase"],
+                    "last_session_id": None,
+                    "last_session_status": None,
+                    "updated_at": _now(),
+                }
+            self.state["updated_at"] = _now()
+            self.store.compact()
+
+    def _rebuild_index(self):
+        """Index features by effective status and count unmet dependencies."""
+        records = self.state["features"]
+        self._position = {fid: i for i, fid in enumerate(self.schedule.ids)}
+        self._members = {status: set() for status in FEATURE_STATUSES}
+        self._status = {}
+        for fid in self.schedule.ids:
+            status = FEATURE_COMPLETED if self._is_done(fid) else records[fid]["status"]
+            self._status[fid] = status
+            self._members.setdefault(status, set()).add(fid)
+        self._unmet = {
+            fid: sum(1 for dep in self.schedule.deps[fid]
+                     if self._status.get(dep) != FEATURE_COMPLETED)
+            for fid in self.schedule.ids
+        }
+        self._ready = set(fid for fid in self._members[FEATURE_PENDING]
+                          if not self._unmet[fid])
+
+    def _refresh_ready(self, fid):
+        if self._status[fid] == FEATURE_PENDING and not self._unmet[fid]:
+            self._ready.add(fid)
+        else:
+            self._ready.discard(fid)
+
+    def _set_status(self, fid, status):
+        """Change a feature's status and keep the indices in step.
+
+        Features dropped from the feature list keep their record but are
+        no longer indexed; only the record changes.
+        """
+        self.state["features"][fid]["status"] = status
+        old = self._status.get(fid)
+        if old is None:
+            return
+        new = FEATURE_COMPLETED if self._is_done(fid) else status
+        if new == old:
+            return
+        self._members[old].discard(fid)
+        self._members.setdefault(new, set()).add(fid)
+        self._status[fid] = new
+        if FEATURE_COMPLETED in (old, new):
+            delta = -1 if new == FEATURE_COMPLETED else 1
+            for child in self.schedule.dependents[fid]:
+                self._unmet[child] += delta
+                self._refresh_ready(child)
+        self._refresh_ready(fid)
+
+    def _save(self, fid):
+        """Journal the current record of *fid*."""
+        now = _now()
+        record = self.state["features"][fid]
+        record["updated_at"] = now
+        self.state["updated_at"] = now
+        self.store.put_feature(fid, record)
+
+    def _by_position(self, fids):
+        return sorted(fids, key=self._position.__getitem__)
+
+    def _require_state(self):
+        if self.state is None:
+            raise ControllerError("No pipeline state found. Run init first.")
+        self._reload_features()
+
+    def _record(self, feature_id, listed=True):
+        """Return the progress record of *feature_id*.
+
+        With *listed*, the feature must still be in the feature list;
+        otherwise a record left by a feature removed from it is accepted.
+        """
+        record = self.state["features"].get(feature_id)
+        if record is None:
+            raise ControllerError("Unknown feature: {}".format(feature_id))
+        if listed and feature_id not in self._status:
+            raise ControllerError("Feature {} is no longer in {}".format(
+                feature_id, self.feature_list))
+        return record
+
+    def _is_done(self, fid):
+        if self.state["features"][fid]["status"] == FEATURE_COMPLETED:
+            return True
+        feature = self.schedule.features.get(fid, {})
+        return feature.get("status") in scheduler.DONE_STATUSES
+
+    def _session_dir(self, feature_id, session_id):
+        return os.path.join(self.state_dir, "features", feature_id, "sessions", session_id)
+
+    # -- methods -------------------------------------------------------
+
+    def init(self):
+        """Create pipeline.json for a fresh run, or report the existing one."""
+        if self.state is not None:
+            self._reload_features()
+            return {"valid": True, "resumed": True, "features_count": len(self.schedule.ids)}
+        try:
+            self._reload_features()
+        except ControllerError as exc:
+            return {"valid": False, "errors": [str(exc)], "features_count": 0}
+        if not self.schedule.ids:
+            return {"valid": False, "errors": ["features must be a non-empty array"],
+                    "features_count": 0}
+        if len(set(self.schedule.ids)) != len(self.schedule.ids):
+            return {"valid": False, "errors": ["feature ids must be unique"],
+                    "features_count": len(self.schedule.ids)}
+
+        self.store.create({
+            "run_id": "run-{}".format(datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")),
+            "feature_list": self.feature_list,
+            "status": "running",
+            "created_at": _now(),
+            "features": {},
+        })
+        self.state = self.store.state
+        self._reconcile()
+        self._rebuild_index()
+        return {"valid": True, "resumed": False, "features_count": len(self.schedule.ids)}
+
+    def resume(self):
+        """Return features left in progress by a previous runner to pending."""
+        self._require_state()
+        for fid in list(self._members[FEATURE_IN_PROGRESS]):
+            self._set_status(fid, FEATURE_PENDING)
+            self._save(fid)
+        self.store.put_pipeline(status="running", updated_at=_now())
+        return {"run_id": self.state["run_id"]}
+
+    def get_next(self, limit=1):
+        """Return up to *limit* ready features and a pipeline signal."""
+        self._require_state()
+        schedule = self.schedule
+        records = self.state["features"]
+        candidates = sorted(self._ready, key=schedule.rank_key)
+
+        features = []
+        for fid in candidates[:max(int(limit), 0)]:
+            features.append({
+                "feature_id": fid,
+                "title": schedule.features[fid].get("title", ""),
+                "retry_count": records[fid]["retry_count"],
+                "resume_from_phase": records[fid]["resume_from_phase"],
+                "weight": schedule.weight[fid],
+            })
+
+        if features:
+            signal = None
+        elif len(self._members[FEATURE_COMPLETED]) == len(schedule.ids):
+            signal = scheduler.PIPELINE_COMPLETE
+        elif self._members[FEATURE_IN_PROGRESS]:
+            signal = scheduler.PIPELINE_WAIT
+        else:
+            signal = scheduler.PIPELINE_BLOCKED
+
+        # Features added to the list reopen a completed pipeline.
+        if signal == scheduler.PIPELINE_COMPLETE:
+            if self.state.get("status") != "completed":
+                self.store.put_pipeline(status="completed", updated_at=_now())
+        elif self.state.get("status") == "completed":
+            self.store.put_pipeline(status="running", updated_at=_now())
+        return {"features": features, "signal": signal}
+
+    def start(self, feature_id, session_id):
+        """Mark *feature_id* in progress and record the current session."""
+        self._require_state()
+        record = self._record(feature_id)
+        self._set_status(feature_id, FEATURE_IN_PROGRESS)
+        record["last_session_id"] = session_id
+        record["session_started_at"] = time.time()
+        session_dir = self._session_dir(feature_id, session_id)
+        os.makedirs(os.path.join(session_dir, "logs"), exist_ok=True)
+        write_json_atomic(os.path.join(self.state_dir, "current-session.json"), {
+            "feature_id": feature_id,
+            "session_id": session_id,
+            "started_at": _now(),
+        })
+        self._save(feature_id)
+        return {"run_id": self.state["run_id"], "session_dir": session_dir}
+
+    def session_outcome(self, feature_id, session_id, exit_code=None):
+        """Derive a session status from its exit code and status file."""
+        if exit_code is not None and int(exit_code) == 124:
+            return "timed_out", None
+        status_file = os.path.join(self._session_dir(feature_id, session_id),
+                                   "session-status.json")
+        data = load_json(status_file)
+        if not isinstance(data, dict):
+            return "crashed", None
+        status = data.get("status")
+        if status not in SESSION_STATUSES:
+            return "crashed", data
+        return status, data
+
+    def update(self, feature_id, session_id, session_status=None, exit_code=None):
+        """Apply a finished session's outcome to its feature.
+
+        success -> completed; partial with can_resume -> retry from
+        resume_from_phase; anything else -> retry from scratch.  A feature
+        whose retry_count exceeds max_retries becomes failed.
+        """
+        self._require_state()
+        # The session may have been started before its feature was removed
+        # from the list; still record how it ended.
+        record = self._record(feature_id, listed=False)
+        status_data = None
+        if session_status is None:
+            session_status, status_data = self.session_outcome(feature_id, session_id, exit_code)
+        elif session_status == "partial":
+            _, status_data = self.session_outcome(feature_id, session_id)
+
+        attempt = record["retry_count"]
+        record["last_session_id"] = session_id
+        record["last_session_status"] = session_status
+        if session_status == "success":
+            self._set_status(feature_id, FEATURE_COMPLETED)
+            record["resume_from_phase"] = None
+        else:
+            record["retry_count"] += 1
+            if (session_status == "partial" and isinstance(status_data, dict)
+                    and status_data.get("can_resume")):
+                record["resume_from_phase"] = status_data.get("resume_from_phase")
+            else:
+                record["resume_from_phase"] = None
+            if record["retry_count"] > self.max_retries:
+                self._set_status(feature_id, FEATURE_FAILED)
+            else:
+                self._set_status(feature_id, FEATURE_PENDING)
+        self._record_metrics(feature_id, session_id, record, {
+            "session_status": session_status,
+            "attempt": attempt,
+            "exit_code": None if exit_code is None else int(exit_code),
+        })
+        self._save(feature_id)
+        return {
+            "feature_id": feature_id,
+            "session_status": session_status,
+            "feature_status": record["status"],
+            "retry_count": record["retry_count"],
+        }
+
+    def _record_metrics(self, feature_id, session_id, record, outcome):
+        """Append the spans of a finished session to the metrics store."""
+        session_dir = self._session_dir(feature_id, session_id)
+        started = record.pop("session_started_at", None)
+        if started is None:
+            try:
+                started = os.stat(session_dir).st_mtime
+            except OSError:
+                return
+        try:
+            pipeline_metrics.append_spans(self.state_dir, pipeline_metrics.session_spans(
+                self.state.get("run_id"), feature_id, session_id, session_dir,
+                started, time.time(), outcome,
+            ))
+        except OSError as exc:
+            _err("Cannot record metrics: {}".format(exc))
+
+    def heartbeat_age(self, feature_id, record, now=None):
+        """Seconds since the running session last showed signs of life."""
+        session_id = record.get("last_session_id")
+        if not session_id:
+            return None
+        session_dir = self._session_dir(feature_id, session_id)
+        mtimes = []
+        for path in (os.path.join(session_dir, "heartbeat.json"),
+                     os.path.join(session_dir, pipeline_metrics.PHASE_EVENTS_FILE),
+                     os.path.join(session_dir, "logs", "session.log"),
+                     session_dir):
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except OSError:
+                continue
+        if not mtimes:
+            return None
+        return (now or time.time()) - max(mtimes)
+
+    def detect_stuck(self, stale_threshold=None):
+        """Report features that cannot make progress without intervention."""
+        self._require_state()
+        threshold = self.stale_threshold if stale_threshold is None else stale_threshold
+        records = self.state["features"]
+        now = time.time()
+        stuck = {}
+        blocked = {}
+        for fid in self._members[FEATURE_FAILED]:
+            stuck[fid] = {
+                "feature_id": fid,
+                "reason": "max retries exceeded ({} attempts)".format(records[fid]["retry_count"]),
+                "suggestion": "inspect state/features/{}/sessions and reset the feature".format(fid),
+            }
+            for child in self.schedule.dependents[fid]:
+                if self._status[child] == FEATURE_PENDING:
+                    blocked.setdefault(child, []).append(fid)
+        for fid, failed in blocked.items():
+            stuck[fid] = {
+                "feature_id": fid,
+                "reason": "blocked by failed dependency {}".format(
+                    ", ".join(self._by_position(failed))),
+                "suggestion": "fix or skip the failed dependency",
+            }
+        for fid in self._members[FEATURE_IN_PROGRESS]:
+            age = self.heartbeat_age(fid, records[fid], now)
+            if age is not None and age > threshold:
+                stuck[fid] = {
+                    "feature_id": fid,
+                    "reason": "heartbeat stale for {}s".format(int(age)),
+                    "suggestion": "session may be hung; it is retried after SESSION_TIMEOUT",
+                }
+        stuck = [stuck[fid] for fid in self._by_position(stuck)]
+        return {"stuck_count": len(stuck), "stuck_features": stuck}
+
+    def status(self, format="json", tail=0, errors=False):
+        """Return a pipeline summary (or a text table when format='text').
+
+        With *tail* or *errors*, rows of unfinished features with a session
+        also carry ``log_tail`` / ``log_errors`` read from the session's log
+        index, without decompressing rotated segments.
+        """
+        self._require_state()
+        records = self.state["features"]
+        counts = {status: len(fids) for status, fids in self._members.items() if fids}
+        rows = []
+        for fid in self.schedule.ids:
+            record = records[fid]
+            status = self._status[fid]
+            rows.append({
+                "feature_id": fid,
+                "title": self.schedule.features[fid].get("title", ""),
+                "status": status,
+                "retry_count": record["retry_count"],
+                "last_session_status": record.get("last_session_status"),
+            })
+            session_id = record.get("last_session_id")
+            if (tail or errors) and session_id and status != FEATURE_COMPLETED:
+                log_dir = os.path.join(self._session_dir(fid, session_id), "logs")
+                rows[-1]["last_session_id"] = session_id
+                if tail:
+                    rows[-1]["log_tail"] = session_log.tail_lines(log_dir, int(tail))
+                if errors:
+                    rows[-1]["log_errors"] = session_log.error_lines(log_dir)
+        result = {
+            "run_id": self.state.get("run_id"),
+            "pipeline_status": self.state.get("status"),
+            "counts": counts,
+            "features": rows,
+        }
+        if format != "text":
+            return result
+
+        lines = ["Run: {} ({})".format(result["run_id"], result["pipeline_status"]), ""]
+        lines.append("{:<8} {:<12} {:>7}  {}".format("ID", "STATUS", "RETRIES", "TITLE"))
+        for row in rows:
+            lines.append("{:<8} {:<12} {:>7}  {}".format(
+                row["feature_id"], row["status"], row["retry_count"], row["title"]
+            ))
+        lines.append("")
+        lines.append(", ".join("{}: {}".format(k, v) for k, v in sorted(counts.items())))
+        for row in rows:
+            if "log_tail" not in row and "log_errors" not in row:
+                continue
+            lines.append("")
+            lines.append("── {} ({}) ──".format(row["feature_id"], row["last_session_id"]))
+            for item in row.get("log_errors", []):
+                lines.append("  ! {:>7}: {}".format(item["line"], item["text"]))
+            for text in row.get("log_tail", []):
+                lines.append("  " + text)
+        return {"text": "\n".join(lines)}
+
+    def _running_sessions(self):
+        records = self.state["features"]
+        return [(fid, records[fid]["last_session_id"])
+                for fid in self._by_position(self._members[FEATURE_IN_PROGRESS])
+                if records[fid].get("last_session_id")]
+
+    def _check_sessions(self, running, now):
+        """Return the first pending wait event, or None.
+
+        Also returns the seconds until the next heartbeat would go stale.
+        """
+        next_stale = None
+        for fid, session_id in running:
+            session_dir = self._session_dir(fid, session_id)
+            event = {"feature_id": fid, "session_id": session_id}
+            if os.path.exists(os.path.join(session_dir, EXIT_CODE_FILE)):
+                event["event"] = "session_finished"
+                return event, None
+            key = (fid, session_id)
+            if (key not in self._notified_status
+                    and os.path.exists(os.path.join(session_dir, "session-status.json"))):
+                self._notified_status.add(key)
+                event["event"] = "status_written"
+                return event, None
+            age = self.heartbeat_age(fid, self.state["features"][fid], now)
+            if age is None:
+                continue
+            if age > self.stale_threshold:
+                if key not in self._notified_stale:
+                    self._notified_stale.add(key)
+                    event["event"] = "heartbeat_stale"
+                    event["age"] = int(age)
+                    return event, None
+            else:
+                self._notified_stale.discard(key)
+                left = self.stale_threshold - age
+                if next_stale is None or left < next_stale:
+                    next_stale = left
+        try:
+            if os.stat(self.feature_list).st_mtime != self._features_mtime:
+                return {"event": "features_changed"}, None
+        except OSError:
+            return {"event": "features_changed"}, None
+        return None, next_stale
+
+    def wait(self, timeout=60):
+        """Block until something the runner must react to happens.
+
+        Events: session_finished (the CLI exited), status_written (the
+        session wrote session-status.json), heartbeat_stale,
+        features_changed, interrupted (another request arrived) or
+        timeout.  Each status_written / heartbeat_stale event is reported
+        once per session.
+        """
+        self._require_state()
+        deadline = time.time() + float(timeout)
+        running = self._running_sessions()
+        # Session directories only wake on files appearing (exit-code,
+        # session-status.json); log and heartbeat writes are covered by the
+        # next_stale timer.  Any write to the feature list is an event.
+        directories = [self._session_dir(fid, session_id) for fid, session_id in running]
+        feature_dir = [os.path.dirname(self.feature_list)]
+
+        interrupt_fd = self.requests.fileno() if self.requests is not None else None
+        with DirectoryWatcher(directories, interrupt_fd,
+                              content_directories=feature_dir) as watcher:
+            while True:
+                now = time.time()
+                event, next_stale = self._check_sessions(running, now)
+                if event is not None:
+                    break
+                if now >= deadline:
+                    event = {"event": "timeout"}
+                    break
+                if self.requests is not None and self.requests.has_line():
+                    event = {"event": "interrupted"}
+                    break
+                delay = deadline - now
+                if next_stale is not None:
+                    delay = min(delay, next_stale + 0.05)
+                if watcher.wait(delay) == "input":
+                    event = {"event": "interrupted"}
+                    break
+            event["watch_mode"] = watcher.mode
+        return event
+
+    def pause(self):
+        """Mark the pipeline paused; in-progress features become pending."""
+        if self.state is None:
+            return {"paused": False}
+        for fid in list(self._members[FEATURE_IN_PROGRESS]):
+            self._set_status(fid, FEATURE_PENDING)
+            self._save(fid)
+        self.state["status"] = "paused"
+        self.state["updated_at"] = _now()
+        self.store.compact()
+        return {"paused": True}
+
+    def close(self):
+        """Fold the journal into the snapshot before exiting."""
+        self.store.close()
+
+    METHODS = ("init", "resume", "get_next", "start", "update", "detect_stuck",
+               "status", "wait", "pause")
+
+    def dispatch(self, method, params):
+        """Call *method* with keyword *params*.
+
+        Params are checked against the method's signature before the call;
+        a ValueError raised by the method (a param of the right name but an
+        unusable value) is reported as invalid params as well.
+        """
+        if method not in self.METHODS:
+            raise ControllerError("Unknown method: {}".format(method))
+        if params is None:
+            params = {}
+        if not isinstance(params, dict):
+            raise InvalidParams("Invalid params for {}: expected a JSON object".format(method))
+        fn = getattr(self, method)
+        try:
+            inspect.signature(fn).bind(**params)
+        except TypeError as exc:
+            raise InvalidParams("Invalid params for {}: {}".format(method, exc))
+        try:
+            return fn(**params)
+        except ValueError as exc:
+            raise InvalidParams("Invalid params for {}: {}".format(method, exc))
+
+
+# ---------------------------------------------------------------------------
+# JSON-RPC loop
+# ---------------------------------------------------------------------------
+
+
+def handle_request(controller, line):
+    """Handle one request line; return ``(response_dict, keep_running)``."""
+    try:
+        request = json.loads(line)
+    except ValueError as exc:
+        error = {"code": -32700, "message": "Parse error: {}".format(exc)}
+        return {"jsonrpc": "2.0", "id": None, "error": error}, True
+    if not isinstance(request, dict):
+        error = {"code": -32600, "message": "Invalid request: expected a JSON object"}
+        return {"jsonrpc": "2.0", "id": None, "error": error}, True
+
+    req_id = request.get("id")
+    method = request.get("method")
+    if method == "shutdown":
+        return {"jsonrpc": "2.0", "id": req_id, "result": {"shutdown": True}}, False
+    try:
+        result = controller.dispatch(method, request.get("params"))
+        return {"jsonrpc": "2.0", "id": req_id, "result": result}, True
+    except InvalidParams as exc:
+        error = {"code": -32602, "message": str(exc)}
+    except ControllerError as exc:
+        error = {"code": -32000, "message": str(exc)}
+    except OSError as exc:
+        error = {"code": -32001, "message": "State I/O error: {}".format(exc)}
+    except Exception as exc:
+        # A bug must not take the resident controller down with it.
+        traceback.print_exc(file=sys.stderr)
+        error = {"code": -32603, "message": "Internal error: {!r}".format(exc)}
+    return {"jsonrpc": "2.0", "id": req_id, "error": error}, True
+
+
+class RequestReader(object):
+    """Unbuffered line reader over a file descriptor.
+
+    Reads straight from the descriptor so ``select`` on it stays accurate
+    while a ``wait`` request is blocking.
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self._buffer = b""
+
+    def fileno(self):
+        return self.fd
+
+    def has_line(self):
+        return b"\n" in self._buffer
+
+    def readline(self):
+        while b"\n" not in self._buffer:
+            chunk = os.read(self.fd, 65536)
+            if not chunk:
+                line, self._buffer = self._buffer, b""
+                return line.decode("utf-8")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line.decode("utf-8") + "\n"
+
+
+def serve(controller, stdin=None, stdout=None):
+    """Answer line-delimited JSON-RPC requests until EOF or shutdown."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    reader = RequestReader(stdin.fileno())
+    controller.requests = reader
+    while True:
+        line = reader.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        response, keep_running = handle_request(controller, line)
+        stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        stdout.flush()
+        if not keep_running:
+            break
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resident state controller for the dev-pipeline runner.",
+    )
+    parser.add_argument("--feature-list", required=True, help="Path to feature-list.json")
+    parser.add_argument("--state-dir", required=True, help="Pipeline state directory")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--stale-threshold", type=int, default=600,
+                        help="Heartbeat stale threshold in seconds (default: 600)")
+
+    subparsers = parser.add_subparsers(dest="mode")
+    subparsers.add_parser("serve", help="Serve JSON-RPC requests on stdin/stdout")
+    p_exec = subparsers.add_parser("exec", help="Run a single method and exit")
+    p_exec.add_argument("method", help="Method name")
+    p_exec.add_argument("--params", default="{}", help="JSON object of method params")
+    args = parser.parse_args()
+
+    if not args.mode:
+        parser.print_help(sys.stderr)
+        return 2
+
+    try:
+        controller = PipelineController(
+            args.feature_list, args.state_dir, args.max_retries, args.stale_threshold
+        )
+    except ControllerError as exc:
+        _err(str(exc))
+        return 1
+
+    if args.mode == "serve":
+        # Ctrl+C reaches the whole process group; the runner stops the
+        # controller itself (pause + shutdown, or EOF on stdin).
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        try:
+            return serve(controller)
+        finally:
+            controller.close()
+
+    try:
+        params = json.loads(args.params)
+    except ValueError as exc:
+        _err("Invalid --params: {}".format(exc))
+        return 2
+    try:
+        result = controller.dispatch(args.method, params)
+    except InvalidParams as exc:
+        _err(str(exc))
+        return 2
+    except ControllerError as exc:
+        _err(str(exc))
+        return 1
+    if isinstance(result, dict) and set(result) == {"text"}:
+        print(result["text"])
+    else:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+pipeline_metrics.py - Span metrics for dev-pipeline runs.
+
+Every finished session is turned into timestamped spans and appended to
+``<state-dir>/metrics.ndjson``, one JSON object per line:
+
+  {"run_id": "...", "feature_id": "F-001", "session_id": "...",
+   "cat": "phase", "name": "phase-3", "start": 1700000000.25,
+   "end": 1700000042.5, "attrs": {...}}
+
+Span categories:
+  session     whole session, from the controller's ``start`` to ``update``
+  prompt      bootstrap prompt generation (until bootstrap-prompt.md is written)
+  cli         CodeBuddy CLI process (until exit-code is written)
+  startup     CLI start until the first phase event
+  phase       one pipeline phase, from its phase event to the next one
+  checkpoint  instant event when a checkpoint was reached
+
+Phase and checkpoint events come from ``phase-events.ndjson`` in the
+session directory, which the session agent appends to (see
+templates/bootstrap-prompt.md).
+
+Actions:
+  report  Print p50/p95 durations, retry cost and throughput
+  trace   Write a Chrome trace-event file (chrome://tracing, Perfetto)
+
+Usage:
+  python3 pipeline_metrics.py --state-dir state report [--format text|json] [--run-id ID]
+  python3 pipeline_metrics.py --state-dir state trace --output trace.json [--run-id ID]
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import argparse
+import calendar
+import collections
+import json
+import math
+import os
+import re
+import sys
+
+METRICS_FILE = "metrics.ndjson"
+PHASE_EVENTS_FILE = "phase-events.ndjson"
+
+# Categories reported with percentiles, in pipeline order.
+DURATION_CATEGORIES = ("prompt", "startup", "phase", "cli")
+
+_TIMESTAMP_RE = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d):(\d\d)(\.\d+)?(Z|[+-]\d\d:?\d\d)?$"
+)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _err(msg):
+    """Print an error message to stderr."""
+    print("ERROR: {}".format(msg), file=sys.stderr)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _parse_timestamp(value):
+    """Return epoch seconds for an ISO-8601 string or a number, else None.
+
+    Timestamps without an offset are taken as UTC.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = _TIMESTAMP_RE.match(value.strip())
+    if not match:
+        return None
+    year, month, day, hour, minute, second = (int(g) for g in match.group(1, 2, 3, 4, 5, 6))
+    ts = calendar.timegm((year, month, day, hour, minute, second))
+    if match.group(7):
+        ts += float(match.group(7))
+    offset = match.group(8)
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        digits = offset[1:].replace(":", "")
+        ts -= sign * (int(digits[:2]) * 3600 + int(digits[2:]) * 60)
+    return float(ts)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of *values* (which must be non-empty)."""
+    ordered = sorted(values)
+    rank = max(int(math.ceil(pct / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+
+def read_phase_events(session_dir):
+    """Return ``[(ts, event_dict)]`` from a session's phase-events.ndjson."""
+    events = []
+    try:
+        with open(os.path.join(session_dir, PHASE_EVENTS_FILE), "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(event, dict):
+                    continue
+                ts = _parse_timestamp(event.get("timestamp"))
+                if ts is not None:
+                    events.append((ts, event))
+    except OSError:
+        pass
+    events.sort(key=lambda item: item[0])
+    return events
+
+
+def session_spans(run_id, feature_id, session_id, session_dir, started, ended, outcome):
+    """Build the spans of one finished session.
+
+    *started* and *ended* are epoch seconds seen by the controller;
+    *outcome* holds ``session_status``, ``retry_count`` and similar
+    attributes attached to the session span.
+    """
+    base = {"run_id": run_id, "feature_id": feature_id, "session_id": session_id}
+
+    def span(cat, name, start, end, attrs=None):
+        record = dict(base)
+        record.update({"cat": cat, "name": name, "start": round(start, 3),
+                       "end": round(max(end, start), 3)})
+        if attrs:
+            record["attrs"] = attrs
+        return record
+
+    spans = [span("session", "session", started, ended, dict(outcome))]
+
+    prompt_done = _mtime(os.path.join(session_dir, "bootstrap-prompt.md"))
+    if prompt_done is not None and started <= prompt_done <= ended:
+        spans.append(span("prompt", "prompt", started, prompt_done))
+    else:
+        prompt_done = started
+    cli_done = _mtime(os.path.join(session_dir, "exit-code"))
+    if cli_done is None or cli_done < prompt_done:
+        cli_done = ended
+    spans.append(span("cli", "cli", prompt_done, cli_done))
+
+    # Agent timestamps often have whole-second resolution; allow a second
+    # of slack and clamp events into the CLI span.
+    events = [(min(max(ts, prompt_done), cli_done), ev)
+              for ts, ev in read_phase_events(session_dir)
+              if prompt_done - 1 <= ts <= cli_done + 1]
+    phase_starts = [(ts, ev) for ts, ev in events if isinstance(ev.get("phase"), int)
+                    and ev.get("event", "phase_start") == "phase_start"]
+    if phase_starts:
+        spans.append(span("startup", "startup", prompt_done, phase_starts[0][0]))
+    for idx, (ts, ev) in enumerate(phase_starts):
+        end = phase_starts[idx + 1][0] if idx + 1 < len(phase_starts) else cli_done
+        spans.append(span("phase", "phase-{}".format(ev["phase"]), ts, end,
+                          {"phase": ev["phase"]}))
+    for ts, ev in events:
+        if ev.get("event") == "checkpoint" and ev.get("checkpoint"):
+            spans.append(span("checkpoint", str(ev["checkpoint"]), ts, ts,
+                              {"passed": bool(ev.get("passed", True))}))
+    return spans
+
+
+def append_spans(state_dir, spans):
+    """Append *spans* to the metrics file with a single write."""
+    if not spans:
+        return
+    payload = "".join(json.dumps(s, ensure_ascii=False, sort_keys=True) + "\n" for s in spans)
+    with open(os.path.join(state_dir, METRICS_FILE), "a", encoding="utf-8") as fh:
+        fh.write(payload)
+
+
+def load_spans(state_dir, run_id=None):
+    """Load spans from the metrics file, optionally for one run only."""
+    spans = []
+    try:
+        with open(os.path.join(state_dir, METRICS_FILE), "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if run_id is None or record.get("run_id") == run_id:
+                    spans.append(record)
+    except OSError:
+        pass
+    return spans
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+
+def _phase_sort_key(name):
+    prefix, _, suffix = name.rpartition("-")
+    return (prefix, int(suffix)) if suffix.isdigit() else (name, -1)
+
+
+def summarize(spans):
+    """Return a JSON-serialisable summary of *spans*."""
+    durations = collections.defaultdict(list)
+    sessions = [s for s in spans if s["cat"] == "session"]
+    for s in spans:
+        if s["cat"] in DURATION_CATEGORIES:
+            durations[(s["cat"], s["name"])].append(s["end"] - s["start"])
+
+    rows = []
+    for (cat, name), values in sorted(durations.items(), key=lambda item: (
+            DURATION_CATEGORIES.index(item[0][0]), _phase_sort_key(item[0][1]))):
+        rows.append({
+            "cat": cat,
+            "name": name,
+            "count": len(values),
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "total": round(sum(values), 3),
+        })
+
+    checkpoints = collections.Counter()
+    for s in spans:
+        if s["cat"] == "checkpoint":
+            checkpoints[s["name"]] += 1
+
+    completed = set()
+    retry_seconds = 0.0
+    retry_sessions = 0
+    for s in sessions:
+        status = s.get("attrs", {}).get("session_status")
+        if status == "success":
+            completed.add(s["feature_id"])
+        else:
+            retry_sessions += 1
+            retry_seconds += s["end"] - s["start"]
+
+    wall = 0.0
+    if sessions:
+        wall = max(s["end"] for s in sessions) - min(s["start"] for s in sessions)
+    session_total = sum(s["end"] - s["start"] for s in sessions)
+    return {
+        "runs": sorted(set(s.get("run_id") for s in sessions if s.get("run_id"))),
+        "sessions": len(sessions),
+        "features_completed": len(completed),
+        "wall_seconds": round(wall, 3),
+        "session_seconds": round(session_total, 3),
+        "retry_sessions": retry_sessions,
+        "retry_seconds": round(retry_seconds, 3),
+        "retry_share": round(retry_seconds / session_total, 4) if session_total else 0.0,
+        "features_per_hour": round(len(completed) * 3600.0 / wall, 3) if wall else 0.0,
+        "durations": rows,
+        "checkpoints": dict(sorted(checkpoints.items())),
+    }
+
+
+def _fmt_seconds(value):
+    if value >= 3600:
+        return "{:.1f}h".format(value / 3600.0)
+    if value >= 60:
+        return "{:.1f}m".format(value / 60.0)
+    return "{:.1f}s".format(value)
+
+
+def format_summary_text(summary):
+    lines = [
+        "Sessions: {}   Features completed: {}   Throughput: {} features/hour".format(
+            summary["sessions"], summary["features_completed"], summary["features_per_hour"]),
+        "Wall time: {}   Session time: {}".format(
+            _fmt_seconds(summary["wall_seconds"]), _fmt_seconds(summary["session_seconds"])),
+        "Retry cost: {} session(s), {} ({:.1%} of session time)".format(
+            summary["retry_sessions"], _fmt_seconds(summary["retry_seconds"]),
+            summary["retry_share"]),
+        "",
+        "{:<10} {:<10} {:>6} {:>9} {:>9} {:>9}".format("CATEGORY", "NAME", "COUNT", "P50", "P95", "TOTAL"),
+    ]
+    for row in summary["durations"]:
+        lines.append("{:<10} {:<10} {:>6} {:>9} {:>9} {:>9}".format(
+            row["cat"], row["name"], row["count"], _fmt_seconds(row["p50"]),
+            _fmt_seconds(row["p95"]), _fmt_seconds(row["total"])))
+    if summary["checkpoints"]:
+        lines.append("")
+        lines.append("Checkpoints reached: " + ", ".join(
+            "{} x{}".format(name, count) for name, count in summary["checkpoints"].items()))
+    return "\n".join(lines)
+
+
+def chrome_trace(spans):
+    """Return a Chrome trace-event document with one track per feature."""
+    if not spans:
+        return {"traceEvents": [], "displayTimeUnit": "ms"}
+    origin = min(s["start"] for s in spans)
+    tids = {}
+    events = []
+    for s in sorted(spans, key=lambda item: (item["start"], item["cat"] != "session")):
+        tid = tids.get(s["feature_id"])
+        if tid is None:
+            tid = tids[s["feature_id"]] = len(tids) + 1
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                           "args": {"name": s["feature_id"]}})
+        args = {"session_id": s["session_id"]}
+        args.update(s.get("attrs", {}))
+        event = {
+            "name": s["name"],
+            "cat": s["cat"],
+            "pid": 1,
+            "tid": tid,
+            "ts": int((s["start"] - origin) * 1e6),
+            "args": args,
+        }
+        if s["cat"] == "checkpoint":
+            event.update({"ph": "i", "s": "t"})
+        else:
+            event.update({"ph": "X", "dur": int((s["end"] - s["start"]) * 1e6)})
+        events.append(event)
+    events.insert(0, {"name": "process_name", "ph": "M", "pid": 1, "tid": 0,
+                      "args": {"name": "dev-pipeline"}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Span metrics for dev-pipeline runs.")
+    parser.add_argument("--state-dir", required=True, help="Pipeline state directory")
+    parser.add_argument("--run-id", help="Only include spans of this run")
+    subparsers = parser.add_subparsers(dest="action")
+    p_report = subparsers.add_parser("report", help="Print duration percentiles and throughput")
+    p_report.add_argument("--format", choices=["text", "json"], default="text")
+    p_trace = subparsers.add_parser("trace", help="Export a Chrome trace-event file")
+    p_trace.add_argument("--output", "-o", required=True, help="Output path")
+    args = parser.parse_args()
+
+    if not args.action:
+        parser.print_help(sys.stderr)
+        return 2
+
+    spans = load_spans(args.state_dir, args.run_id)
+    if not spans:
+        _err("No metrics recorded in {}".format(os.path.join(args.state_dir, METRICS_FILE)))
+        return 1
+
+    if args.action == "trace":
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(chrome_trace(spans), fh)
+        print("Wrote {} trace events to {}".format(len(spans), args.output))
+        return 0
+
+    summary = summarize(spans)
+    if args.format == "json":
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        print(format_summary_text(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+scheduler.py - Wave and critical-path scheduler for dev-pipeline feature lists.
+
+Turns the feature-list dependency DAG into execution waves, weights each
+feature by ``estimated_complexity`` and computes the critical path, so
+independent features can run in parallel CodeBuddy sessions.
+
+Actions:
+  plan    Print waves, the critical path and the estimated makespan
+  next    Print up to --limit ready features, one JSON object per line
+
+Progress is read from the session directories run.sh writes:
+``<state-dir>/features/<id>/sessions/<session-id>/session-status.json``.
+A feature is done once a session reports ``"status": "success"`` (or the
+feature list marks it completed/skipped/split).  Every other finished
+session counts as one retry.
+
+Usage:
+  python3 scheduler.py --feature-list feature-list.json --action plan [--parallel N] [--format text|json]
+  python3 scheduler.py --feature-list feature-list.json --state-dir state --action next \\
+      [--limit N] [--exclude F-001,F-002] [--max-retries 3]
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import argparse
+import collections
+import heapq
+import json
+import os
+import sys
+
+from state_store import load_json
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Relative session cost per complexity level; unknown complexity counts as medium.
+COMPLEXITY_WEIGHTS = {"low": 1, "medium": 2, "high": 3}
+DEFAULT_WEIGHT = COMPLEXITY_WEIGHTS["medium"]
+
+DONE_STATUSES = {"completed", "skipped", "split"}
+
+PIPELINE_COMPLETE = "PIPELINE_COMPLETE"
+PIPELINE_BLOCKED = "PIPELINE_BLOCKED"
+PIPELINE_WAIT = "PIPELINE_WAIT"
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _err(msg):
+    """Print an error message to stderr."""
+    print("ERROR: {}".format(msg), file=sys.stderr)
+
+
+def feature_weight(feat):
+    """Return the scheduling weight of *feat* from its estimated complexity."""
+    return COMPLEXITY_WEIGHTS.get(feat.get("estimated_complexity"), DEFAULT_WEIGHT)
+
+
+# ---------------------------------------------------------------------------
+# Planning
+# ---------------------------------------------------------------------------
+
+
+class Schedule(object):
+    """Static schedule of a feature DAG.
+
+    Attributes:
+      ids        feature ids in file order
+      deps       ``{id: [dependency ids]}`` (unknown ids dropped)
+      weight     ``{id: complexity weight}``
+      wave       ``{id: wave number}`` (longest dependency chain, 0-based)
+      tail       ``{id: weighted length of the longest path starting at id}``
+      order      ids in topological order
+    """
+
+    def __init__(self, features):
+        self.features = {f["id"]: f for f in features}
+        self.ids = [f["id"] for f in features]
+        id_set = set(self.ids)
+        self.deps = {
+            f["id"]: [d for d in f.get("dependencies", []) if d in id_set]
+            for f in features
+        }
+        self.dependents = {fid: [] for fid in self.ids}
+        for fid, deps in self.deps.items():
+            for dep in deps:
+                self.dependents[dep].append(fid)
+        self.weight = {f["id"]: feature_weight(f) for f in features}
+
+        remaining = {fid: len(deps) for fid, deps in self.deps.items()}
+        queue = collections.deque(fid for fid in self.ids if remaining[fid] == 0)
+        self.order = []
+        self.wave = {fid: 0 for fid in self.ids}
+        while queue:
+            node = queue.popleft()
+            self.order.append(node)
+            for child in self.dependents[node]:
+                if self.wave[node] + 1 > self.wave[child]:
+                    self.wave[child] = self.wave[node] + 1
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    queue.append(child)
+        if len(self.order) != len(self.ids):
+            stuck = sorted(fid for fid in self.ids if remaining[fid] > 0)
+            raise ValueError("Dependency graph contains cycles: {}".format(", ".join(stuck)))
+
+        self.tail = {}
+        for fid in reversed(self.order):
+            below = [self.tail[c] for c in self.dependents[fid]]
+            self.tail[fid] = self.weight[fid] + (max(below) if below else 0)
+
+    def rank_key(self, fid):
+        """Sort key: longest remaining path first, then feature priority."""
+        return (-self.tail[fid], self.features[fid].get("priority", 0), fid)
+
+    def waves(self):
+        """Return a list of waves, each a list of ids in rank order."""
+        grouped = collections.defaultdict(list)
+        for fid in self.ids:
+            grouped[self.wave[fid]].append(fid)
+        return [sorted(grouped[w], key=self.rank_key) for w in sorted(grouped)]
+
+    def critical_path(self):
+        """Return ``(ids, total_weight)`` of the heaviest dependency chain."""
+        if not self.ids:
+            return [], 0
+        roots = [fid for fid in self.ids if not self.deps[fid]]
+        node = min(roots, key=self.rank_key)
+        path = [node]
+        while self.dependents[node]:
+            node = min(self.dependents[node], key=self.rank_key)
+            path.append(node)
+        return path, self.tail[path[0]]
+
+    def simulate(self, workers):
+        """Return the estimated makespan with *workers* parallel sessions.
+
+        Uses list scheduling: whenever a worker is free, start the ready
+        feature with the longest remaining path.
+        """
+        remaining = {fid: len(deps) for fid, deps in self.deps.items()}
+        ready = [self.rank_key(fid) for fid in self.ids if remaining[fid] == 0]
+        heapq.heapify(ready)
+        running = []  # (finish_time, id)
+        now = 0
+        while ready or running:
+            while ready and len(running) < workers:
+                fid = heapq.heappop(ready)[2]
+                heapq.heappush(running, (now + self.weight[fid], fid))
+            now, fid = heapq.heappop(running)
+            for child in self.dependents[fid]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    heapq.heappush(ready, self.rank_key(child))
+        return now
+
+
+def build_plan(features, workers=1):
+    """Return a JSON-serialisable plan for *features*."""
+    schedule = Schedule(features)
+    path, length = schedule.critical_path()
+    total = sum(schedule.weight.values())
+    return {
+        "waves": [
+            [{"id": fid, "weight": schedule.weight[fid]} for fid in wave]
+            for wave in schedule.waves()
+        ],
+        "critical_path": path,
+        "critical_path_weight": length,
+        "total_weight": total,
+        "parallel": workers,
+        "estimated_makespan": schedule.simulate(workers),
+        "sequential_makespan": total,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Progress
+# ---------------------------------------------------------------------------
+
+
+def collect_progress(state_dir, feature_ids):
+    """Summarise session history for each feature from the state directory.
+
+    Returns ``{id: {"done": bool, "retry_count": int, "resume_from_phase": int|None}}``.
+    """
+    progress = {}
+    for fid in feature_ids:
+        info = {"done": False, "retry_count": 0, "resume_from_phase": None}
+        sessions_dir = os.path.join(state_dir, "features", fid, "sessions")
+        try:
+            sessions = sorted(os.listdir(sessions_dir))
+        except OSError:
+            sessions = []
+        for session_id in sessions:
+            status = load_json(os.path.join(sessions_dir, session_id, "session-status.json"))
+            if isinstance(status, dict) and status.get("status") == "success":
+                info["done"] = True
+                break
+            info["retry_count"] += 1
+            if (isinstance(status, dict) and status.get("status") == "partial"
+                    and status.get("can_resume")):
+                info["resume_from_phase"] = status.get("resume_from_phase")
+            else:
+                info["resume_from_phase"] = None
+        progress[fid] = info
+    return progress
+
+
+def next_features(features, state_dir, limit=1, exclude=(), max_retries=3):
+    """Return ``(ready, signal)`` for the next batch of sessions to start.
+
+    *ready* holds up to *limit* feature dicts (``feature_id``, ``title``,
+    ``retry_count``, ``resume_from_phase``) whose dependencies are done,
+    ordered by critical-path rank.  *exclude* lists features that already
+    have a running session.  When *ready* is empty, *signal* is one of
+    ``PIPELINE_COMPLETE``, ``PIPELINE_BLOCKED`` or ``PIPELINE_WAIT``
+    (sessions still running may unblock more work).
+    """
+    schedule = Schedule(features)
+    progress = collect_progress(state_dir, schedule.ids)
+    running = set(exclude)
+
+    done = set()
+    for fid in schedule.ids:
+        if progress[fid]["done"] or schedule.features[fid].get("status") in DONE_STATUSES:
+            done.add(fid)
+
+    candidates = []
+    for fid in schedule.ids:
+        if fid in done or fid in running:
+            continue
+        if progress[fid]["retry_count"] > max_retries:
+            continue
+        if all(dep in done for dep in schedule.deps[fid]):
+            candidates.append(fid)
+    candidates.sort(key=schedule.rank_key)
+
+    ready = []
+    for fid in candidates[:max(limit, 0)]:
+        ready.append({
+            "feature_id": fid,
+            "title": schedule.features[fid].get("title", ""),
+            "retry_count": progress[fid]["retry_count"],
+            "resume_from_phase": progress[fid]["resume_from_phase"],
+            "weight": schedule.weight[fid],
+        })
+
+    if ready:
+        signal = None
+    elif len(done) == len(schedule.ids):
+        signal = PIPELINE_COMPLETE
+    elif running:
+        signal = PIPELINE_WAIT
+    else:
+        signal = PIPELINE_BLOCKED
+    return ready, signal
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _format_plan_text(plan):
+    lines = []
+    for idx, wave in enumerate(plan["waves"]):
+        lines.append("Wave {}: {}".format(
+            idx + 1, ", ".join("{} ({})".format(f["id"], f["weight"]) for f in wave)
+        ))
+    lines.append("")
+    lines.append("Critical path: {} (weight {})".format(
+        " -> ".join(plan["critical_path"]), plan["critical_path_weight"]
+    ))
+    lines.append("Estimated makespan with {} parallel session(s): {} (sequential: {})".format(
+        plan["parallel"], plan["estimated_makespan"], plan["sequential_makespan"]
+    ))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Wave and critical-path scheduler for dev-pipeline feature lists.",
+    )
+    parser.add_argument("--feature-list", required=True, help="Path to feature-list.json")
+    parser.add_argument("--state-dir", default="state", help="Pipeline state directory")
+    parser.add_argument("--action", choices=["plan", "next"], default="plan")
+    parser.add_argument("--parallel", type=int, default=1,
+                        help="Parallel sessions for the makespan estimate (plan)")
+    parser.add_argument("--format", choices=["text", "json"], default="text",
+                        help="Output format for plan (default: text)")
+    parser.add_argument("--limit", type=int, default=1,
+                        help="Max ready features to print (next)")
+    parser.add_argument("--exclude", default="",
+                        help="Comma-separated feature ids with running sessions (next)")
+    parser.add_argument("--max-retries", type=int, default=3)
+    args = parser.parse_args()
+
+    data = load_json(args.feature_list)
+    if not isinstance(data, dict) or not isinstance(data.get("features"), list):
+        _err("Cannot read features from {}".format(args.feature_list))
+        return 2
+    features = [f for f in data["features"] if isinstance(f, dict) and "id" in f]
+
+    try:
+        if args.action == "plan":
+            plan = build_plan(features, max(args.parallel, 1))
+            if args.format == "json":
+                print(json.dumps(plan, indent=2, ensure_ascii=False))
+            else:
+                print(_format_plan_text(plan))
+            return 0
+
+        exclude = [fid for fid in args.exclude.split(",") if fid]
+        ready, signal = next_features(
+            features, args.state_dir, args.limit, exclude, args.max_retries
+        )
+    except ValueError as exc:
+        _err(str(exc))
+        return 1
+
+    for item in ready:
+        print(json.dumps(item, ensure_ascii=False))
+    if signal:
+        print(signal)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
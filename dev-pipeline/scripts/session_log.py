@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+session_log.py - Size-bounded log sink for CodeBuddy sessions.
+
+Replaces ``tee logs/session.log``.  Reads the session output from stdin
+and writes it to ``logs/session.log``, rotating to a new segment before the
+active file would pass --max-bytes (on a line boundary when one fits, else
+mid-line, so a line longer than that spans segments).  Sealed segments are compressed in a
+background thread (zstd when the ``zstandard`` package is installed,
+gzip otherwise), and the whole session is compressed when the input ends.
+
+Alongside the segments, ``logs/index.json`` records per segment the line
+range, size, the last TAIL_LINES lines and every line that looks like an
+error.  ``tail`` and ``errors`` answer from the index (plus the active
+file), so they never decompress a segment.
+
+A per-run disk quota (--quota-bytes over every session's logs under
+--state-dir) is enforced on rotation and at the end of the session by
+deleting the oldest compressed segments of other sessions.
+
+Modes:
+  sink     Copy stdin to the session logs (--echo also copies to stdout)
+  tail     Print the last N lines of a session log
+  errors   Print indexed error lines of a session log
+
+Usage:
+  cbc ... | python3 session_log.py sink --log-dir DIR [--state-dir S] [--echo]
+  python3 session_log.py tail --log-dir DIR [-n 50]
+  python3 session_log.py errors --log-dir DIR
+
+Python 3.6+ required. Optional: zstandard.
+"""
+
+import argparse
+import gzip
+import os
+import queue
+import re
+import shutil
+import signal
+import sys
+import threading
+import time
+
+from state_store import load_json, write_json_atomic
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+ACTIVE_LOG = "session.log"
+INDEX_FILE = "index.json"
+TAIL_LINES = 200
+ERROR_TEXT_LIMIT = 300
+MAX_INDEXED_ERRORS = 1000
+# Only this much of each line is searched for errors and kept in tails.
+INDEXED_LINE_LIMIT = 64 * 1024
+INDEX_SAVE_INTERVAL = 1.0
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_QUOTA_BYTES = 2 * 1024 * 1024 * 1024
+READ_CHUNK = 64 * 1024
+
+ERROR_PATTERN = re.compile(rb"\b(error|exception|traceback|fatal|failed|panic)\b", re.I)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _err(msg):
+    """Print an error message to stderr."""
+    print("ERROR: {}".format(msg), file=sys.stderr)
+
+
+def _decode(line):
+    return line.decode("utf-8", "replace").rstrip("\r\n")
+
+
+def compress_file(path):
+    """Compress *path* next to itself and remove the original.
+
+    Returns the compressed file name.
+    """
+    if zstandard is not None:
+        target = path + ".zst"
+        with open(path, "rb") as src, open(target + ".tmp", "wb") as dst:
+            zstandard.ZstdCompressor(level=6).copy_stream(src, dst)
+    else:
+        target = path + ".gz"
+        with open(path, "rb") as src, gzip.open(target + ".tmp", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, READ_CHUNK)
+    os.replace(target + ".tmp", target)
+    os.remove(path)
+    return os.path.basename(target)
+
+
+# ---------------------------------------------------------------------------
+# Sink
+# ---------------------------------------------------------------------------
+
+
+class SessionLogSink(object):
+    """Rotating, compressing writer for one session's log directory."""
+
+    def __init__(self, log_dir, max_bytes=DEFAULT_MAX_BYTES, state_dir=None,
+                 quota_bytes=DEFAULT_QUOTA_BYTES, echo=None):
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.state_dir = state_dir
+        self.quota_bytes = quota_bytes
+        self.echo = echo
+        os.makedirs(log_dir, exist_ok=True)
+
+        self.index = load_json(os.path.join(log_dir, INDEX_FILE)) or {
+            "version": 1, "segments": [], "errors": [], "total_lines": 0, "total_bytes": 0,
+        }
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._jobs = queue.Queue()
+        self._worker = threading.Thread(target=self._compress_loop, daemon=True)
+        self._worker.start()
+
+        self._open_segment()
+        self._carry = b""
+
+    # -- segments ------------------------------------------------------
+
+    def _open_segment(self):
+        self.active_path = os.path.join(self.log_dir, ACTIVE_LOG)
+        self.active = open(self.active_path, "ab")
+        self.segment = {
+            "start_line": self.index["total_lines"] + 1,
+            "lines": 0,
+            "bytes": 0,
+            "tail": [],
+        }
+
+    def _seal_segment(self):
+        """Close the active file and queue it for compression."""
+        self.active.close()
+        number = len(self.index["segments"]) + 1
+        sealed_name = "{}.{}".format(ACTIVE_LOG, number)
+        os.replace(self.active_path, os.path.join(self.log_dir, sealed_name))
+        entry = dict(self.segment, file=sealed_name, number=number)
+        with self._lock:
+            self.index["segments"].append(entry)
+            self._save_index()
+        self._jobs.put(entry)
+
+    def _compress_loop(self):
+        while True:
+            entry = self._jobs.get()
+            if entry is None:
+                return
+            try:
+                name = compress_file(os.path.join(self.log_dir, entry["file"]))
+                with self._lock:
+                    entry["file"] = name
+                    entry["compressed"] = True
+                    self._save_index()
+            except OSError as exc:
+                _err("Cannot compress {}: {}".format(entry["file"], exc))
+
+    def _save_index(self):
+        self._last_save = time.time()
+        write_json_atomic(os.path.join(self.log_dir, INDEX_FILE), self.index)
+
+    # -- writing -------------------------------------------------------
+
+    def _account(self, lines):
+        """Record complete *lines* in the index; caller holds the lock."""
+        segment = self.segment
+        found_error = False
+        for line in lines:
+            segment["lines"] += 1
+            self.index["total_lines"] += 1
+            line = line[:INDEXED_LINE_LIMIT]
+            if ERROR_PATTERN.search(line) and len(self.index["errors"]) < MAX_INDEXED_ERRORS:
+                found_error = True
+                self.index["errors"].append({
+                    "line": self.index["total_lines"],
+                    "segment": len(self.index["segments"]) + 1,
+                    "text": _decode(line)[:ERROR_TEXT_LIMIT],
+                })
+        tail = segment["tail"]
+        tail.extend(_decode(line[:INDEXED_LINE_LIMIT]) for line in lines[-TAIL_LINES:])
+        if len(tail) > TAIL_LINES:
+            del tail[:len(tail) - TAIL_LINES]
+        # Errors become visible to readers without waiting for rotation.
+        now = time.time()
+        if found_error and now - self._last_save >= INDEX_SAVE_INTERVAL:
+            self._save_index()
+
+    def _append(self, data):
+        self.active.write(data)
+        self.segment["bytes"] += len(data)
+        self.index["total_bytes"] += len(data)
+        if len(self._carry) >= INDEXED_LINE_LIMIT:
+            # The rest of an overlong line is written but not indexed.
+            newline = data.find(b"\n")
+            if newline < 0:
+                return
+            data = data[newline:]
+        pieces = (self._carry + data).split(b"\n")
+        self._carry = pieces.pop()[:INDEXED_LINE_LIMIT]
+        if pieces:
+            self._account(pieces)
+
+    def write(self, data):
+        """Write a chunk of session output."""
+        if self.echo is not None:
+            self.echo.write(data)
+            self.echo.flush()
+        while True:
+            with self._lock:
+                room = self.max_bytes - self.segment["bytes"]
+                rotate = len(data) >= room
+                if rotate:
+                    # Prefer the last line boundary that fits; a line longer
+                    # than the room left is split across segments.
+                    cut = data.rfind(b"\n", 0, room) + 1 or max(room, 1)
+                else:
+                    cut = len(data)
+                self._append(data[:cut])
+                self.active.flush()
+            if not rotate:
+                return
+            self._seal_segment()
+            self._open_segment()
+            self.enforce_quota()
+            data = data[cut:]
+            if not data:
+                return
+
+    def close(self):
+        """Flush, seal and compress the final segment, then enforce the quota."""
+        if self._carry:
+            with self._lock:
+                self._account([self._carry])
+            self._carry = b""
+        if self.segment["bytes"] or not self.index["segments"]:
+            self._seal_segment()
+        else:
+            self.active.close()
+            os.remove(self.active_path)
+        self._jobs.put(None)
+        self._worker.join()
+        with self._lock:
+            self.index["complete"] = True
+            self._save_index()
+        self.enforce_quota()
+
+    # -- quota ---------------------------------------------------------
+
+    def enforce_quota(self):
+        """Delete the oldest compressed segments of other sessions over quota."""
+        if not self.state_dir or self.quota_bytes <= 0:
+            return
+        features_dir = os.path.join(self.state_dir, "features")
+        own = os.path.abspath(self.log_dir)
+        candidates = []
+        total = 0
+        try:
+            feature_ids = os.listdir(features_dir)
+        except OSError:
+            return
+        for fid in feature_ids:
+            sessions_dir = os.path.join(features_dir, fid, "sessions")
+            try:
+                session_ids = os.listdir(sessions_dir)
+            except OSError:
+                continue
+            for sid in session_ids:
+                log_dir = os.path.join(sessions_dir, sid, "logs")
+                try:
+                    entries = list(os.scandir(log_dir))
+                except OSError:
+                    continue
+                for entry in entries:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    total += st.st_size
+                    if (os.path.abspath(log_dir) != own
+                            and entry.name.endswith((".gz", ".zst"))):
+                        candidates.append((st.st_mtime, st.st_size, log_dir, entry.name))
+        if total <= self.quota_bytes:
+            return
+        candidates.sort()
+        for _, size, log_dir, name in candidates:
+            if total <= self.quota_bytes:
+                break
+            try:
+                os.remove(os.path.join(log_dir, name))
+            except OSError:
+                continue
+            total -= size
+            _mark_evicted(log_dir, name)
+
+
+def _mark_evicted(log_dir, name):
+    index_path = os.path.join(log_dir, INDEX_FILE)
+    index = load_json(index_path)
+    if not isinstance(index, dict):
+        return
+    for segment in index.get("segments", []):
+        if segment.get("file") == name:
+            segment["evicted"] = True
+    try:
+        write_json_atomic(index_path, index)
+    except OSError:
+        pass
+
+
+def run_sink(args):
+    # Stop only at end of input: when the CLI is interrupted or killed the
+    # pipe closes and the sink still seals and compresses what it has.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    echo = sys.stdout.buffer if args.echo else None
+    sink = SessionLogSink(args.log_dir, args.max_bytes, args.state_dir, args.quota_bytes, echo)
+    stdin = sys.stdin.fileno()
+    try:
+        while True:
+            chunk = os.read(stdin, READ_CHUNK)
+            if not chunk:
+                break
+            sink.write(chunk)
+    finally:
+        sink.close()
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Readers
+# ---------------------------------------------------------------------------
+
+
+def _active_tail(path, count):
+    """Return the last *count* lines of *path*, reading backwards from the end."""
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        return []
+    with fh:
+        fh.seek(0, os.SEEK_END)
+        end = fh.tell()
+        data = b""
+        pos = end
+        while pos > 0 and data.count(b"\n") <= count:
+            step = min(READ_CHUNK, pos)
+            pos -= step
+            fh.seek(pos)
+            data = fh.read(step) + data
+    lines = data.split(b"\n")
+    if lines and lines[-1] == b"":
+        lines.pop()
+    return [_decode(line) for line in lines[-count:]]
+
+
+def tail_lines(log_dir, count=50):
+    """Return the last *count* lines of a session log without decompressing."""
+    index = load_json(os.path.join(log_dir, INDEX_FILE)) or {"segments": []}
+    lines = _active_tail(os.path.join(log_dir, ACTIVE_LOG), count)
+    for segment in reversed(index.get("segments", [])):
+        if len(lines) >= count:
+            break
+        lines = segment.get("tail", [])[-(count - len(lines)):] + lines
+    if not index.get("segments") and not lines:
+        # Logs written before the sink existed: plain session.log only.
+        return _active_tail(os.path.join(log_dir, ACTIVE_LOG), count)
+    return lines[-count:]
+
+
+def error_lines(log_dir):
+    """Return indexed error lines as ``[{line, segment, text}]``."""
+    index = load_json(os.path.join(log_dir, INDEX_FILE)) or {}
+    return index.get("errors", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size-bounded log sink for CodeBuddy sessions.")
+    subparsers = parser.add_subparsers(dest="mode")
+
+    p_sink = subparsers.add_parser("sink", help="Copy stdin into rotating session logs")
+    p_sink.add_argument("--log-dir", required=True, help="Session logs directory")
+    p_sink.add_argument("--state-dir", help="Pipeline state directory (enables the disk quota)")
+    p_sink.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES,
+                        help="Rotate the active log after this many bytes (default: 64 MiB)")
+    p_sink.add_argument("--quota-bytes", type=int, default=DEFAULT_QUOTA_BYTES,
+                        help="Disk quota for all session logs in --state-dir (default: 2 GiB, 0 = off)")
+    p_sink.add_argument("--echo", action="store_true", help="Also copy input to stdout")
+
+    p_tail = subparsers.add_parser("tail", help="Print the last lines of a session log")
+    p_tail.add_argument("--log-dir", required=True)
+    p_tail.add_argument("-n", "--lines", type=int, default=50)
+
+    p_errors = subparsers.add_parser("errors", help="Print indexed error lines")
+    p_errors.add_argument("--log-dir", required=True)
+    args = parser.parse_args()
+
+    if args.mode == "sink":
+        return run_sink(args)
+    if args.mode == "tail":
+        for line in tail_lines(args.log_dir, args.lines):
+            print(line)
+        return 0
+    if args.mode == "errors":
+        for item in error_lines(args.log_dir):
+            print("{:>8}: {}".format(item["line"], item["text"]))
+        return 0
+    parser.print_help(sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+session_watcher.py - Wake up on file-system changes in session directories.
+
+On Linux the watcher uses inotify (through ctypes, no extra packages), so
+a waiter wakes as soon as a file is created, replaced, deleted or closed
+after writing in one of the watched directories.  Plain writes to a file
+that stays open (a growing log) only wake for directories passed as
+*content_directories*.  Elsewhere, or when inotify is unavailable, it falls back to
+polling every POLL_INTERVAL seconds.  Either way callers re-check their own
+conditions after each wake-up; the watcher only decides *when* to look.
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import sys
+
+POLL_INTERVAL = 0.5
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_CONTENT_WATCH_MASK = _WATCH_MASK | _IN_MODIFY
+
+_libc = None
+
+
+def _load_libc():
+    """Return libc with the inotify functions, or None if unsupported."""
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith("linux"):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                _libc = libc
+            except (OSError, AttributeError):
+                pass
+    return _libc or None
+
+
+class DirectoryWatcher(object):
+    """Wait for changes in a set of directories.
+
+    Usage::
+
+        with DirectoryWatcher(dirs) as watcher:
+            while not condition():
+                watcher.wait(timeout)
+
+    In *content_directories* every write to a file also wakes the waiter.
+    Directories that do not exist are skipped.  ``wait`` returns
+    ``"change"``, ``"timeout"`` or ``"input"`` (data became readable on
+    *interrupt_fd*).  In polling mode every wake-up reports ``"change"``.
+    """
+
+    def __init__(self, directories, interrupt_fd=None, use_inotify=True,
+                 content_directories=()):
+        self.interrupt_fd = interrupt_fd
+        self._fd = None
+        libc = _load_libc() if use_inotify else None
+        if libc is None:
+            return
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return
+        masks = dict.fromkeys(directories, _WATCH_MASK)
+        masks.update(dict.fromkeys(content_directories, _CONTENT_WATCH_MASK))
+        for path, mask in masks.items():
+            if os.path.isdir(path):
+                libc.inotify_add_watch(fd, os.fsencode(path), mask)
+        self._fd = fd
+
+    @property
+    def mode(self):
+        return "inotify" if self._fd is not None else "poll"
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _drain(self):
+        while True:
+            try:
+                if not os.read(self._fd, 65536):
+                    return
+            except OSError as exc:
+                if exc.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise
+
+    def wait(self, timeout):
+        """Block until a change, input on *interrupt_fd*, or *timeout* seconds."""
+        fds = []
+        if self._fd is not None:
+            fds.append(self._fd)
+        else:
+            timeout = min(timeout, POLL_INTERVAL)
+        if self.interrupt_fd is not None:
+            fds.append(self.interrupt_fd)
+        try:
+            readable, _, _ = select.select(fds, [], [], max(timeout, 0))
+        except InterruptedError:
+            return "change"
+        if self.interrupt_fd is not None and self.interrupt_fd in readable:
+            return "input"
+        if self._fd is not None:
+            if self._fd in readable:
+                self._drain()
+                return "change"
+            return "timeout"
+        return "change"
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+state_store.py - Snapshot + append-only journal for dev-pipeline state.
+
+``<state-dir>/pipeline.json`` is a snapshot of the pipeline state and
+``<state-dir>/pipeline.journal`` holds every change made since, one JSON
+object per line:
+
+  {"seq": 42, "feature_id": "F-003", "record": {...full feature record...}}
+  {"seq": 43, "pipeline": {"status": "paused"}}
+
+A state change therefore costs one short append instead of rewriting the
+whole state file.  The journal is folded into a new snapshot (written
+atomically, tagged with ``journal_seq``) once it grows past
+COMPACT_EVERY entries and when the controller shuts down; replay skips
+entries the snapshot already contains, so a crash between the two steps
+is harmless.
+
+Loading also migrates older layouts: version-1 snapshots without a
+journal, and snapshots whose ``features`` is a list of records.
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import json
+import os
+
+STATE_VERSION = 2
+SNAPSHOT_FILE = "pipeline.json"
+JOURNAL_FILE = "pipeline.journal"
+COMPACT_EVERY = 1000
+
+
+def load_json(path):
+    """Load JSON from *path*, returning None if it is missing or invalid."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_atomic(path, data):
+    """Write *data* to *path* via a temp file and rename."""
+    parent = os.path.dirname(path)
+    if parent and not os.path.isdir(parent):
+        os.makedirs(parent, exist_ok=True)
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, ensure_ascii=False)
+        fh.write("\n")
+    os.replace(tmp_path, path)
+
+
+def _migrate(state):
+    """Bring a loaded snapshot to STATE_VERSION; return True if it changed."""
+    changed = False
+    features = state.get("features")
+    if isinstance(features, list):
+        converted = {}
+        for item in features:
+            if not isinstance(item, dict):
+                continue
+            fid = item.get("feature_id") or item.get("id")
+            if not fid:
+                continue
+            record = {k: v for k, v in item.items() if k not in ("id", "feature_id")}
+            record.setdefault("status", "pending")
+            record.setdefault("retry_count", 0)
+            record.setdefault("resume_from_phase", None)
+            record.setdefault("last_session_id", None)
+            record.setdefault("last_session_status", None)
+            converted[fid] = record
+        state["features"] = converted
+        changed = True
+    elif not isinstance(features, dict):
+        state["features"] = {}
+        changed = True
+    if state.get("version") != STATE_VERSION:
+        state["version"] = STATE_VERSION
+        changed = True
+    state.setdefault("journal_seq", 0)
+    return changed
+
+
+def _replay(state, journal_path):
+    """Apply journal entries newer than the snapshot; return the last seq."""
+    seq = state.get("journal_seq", 0)
+    try:
+        fh = open(journal_path, "r", encoding="utf-8")
+    except OSError:
+        return seq
+    with fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn trailing write
+            if not isinstance(entry, dict) or entry.get("seq", 0) <= seq:
+                continue
+            seq = entry["seq"]
+            if "feature_id" in entry and isinstance(entry.get("record"), dict):
+                state["features"][entry["feature_id"]] = entry["record"]
+            elif isinstance(entry.get("pipeline"), dict):
+                state.update(entry["pipeline"])
+    return seq
+
+
+def load_state(state_dir):
+    """Return the current pipeline state (snapshot + journal), or None."""
+    state = load_json(os.path.join(state_dir, SNAPSHOT_FILE))
+    if not isinstance(state, dict):
+        return None
+    _migrate(state)
+    _replay(state, os.path.join(state_dir, JOURNAL_FILE))
+    return state
+
+
+class StateStore(object):
+    """Owner of the pipeline state files; the only writer."""
+
+    def __init__(self, state_dir, compact_every=COMPACT_EVERY):
+        self.state_dir = state_dir
+        self.snapshot_path = os.path.join(state_dir, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(state_dir, JOURNAL_FILE)
+        self.compact_every = compact_every
+        self.state = None
+        self.seq = 0
+        self._journal = None
+        self._entries = 0
+
+    def load(self):
+        """Load and migrate the state; return it (or None if there is none)."""
+        state = load_json(self.snapshot_path)
+        if not isinstance(state, dict):
+            self.state = None
+            return None
+        migrated = _migrate(state)
+        self.seq = _replay(state, self.journal_path)
+        self.state = state
+        self._entries = self.seq - state["journal_seq"]
+        if migrated:
+            self.compact()
+        return state
+
+    def create(self, state):
+        """Start a new state and write its first snapshot."""
+        state["version"] = STATE_VERSION
+        state["journal_seq"] = 0
+        self.state = state
+        self.seq = 0
+        self.compact()
+
+    def _append(self, entry):
+        self.seq += 1
+        entry["seq"] = self.seq
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(entry, ensure_ascii=False, sort_keys=True) + "\n")
+        self._journal.flush()
+        self._entries += 1
+        if self._entries >= self.compact_every:
+            self.compact()
+
+    def put_feature(self, feature_id, record):
+        """Store *record* as the current record of *feature_id*."""
+        self.state["features"][feature_id] = record
+        self._append({"feature_id": feature_id, "record": record})
+
+    def put_pipeline(self, **fields):
+        """Update top-level pipeline fields (status, updated_at, ...)."""
+        self.state.update(fields)
+        self._append({"pipeline": fields})
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and truncate it."""
+        if self.state is None:
+            return
+        self.state["journal_seq"] = self.seq
+        write_json_atomic(self.snapshot_path, self.state)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        try:
+            with open(self.journal_path, "w", encoding="utf-8"):
+                pass
+        except OSError:
+            pass
+        self._entries = 0
+
+    def close(self):
+        if self._entries:
+            self.compact()
+        elif self._journal is not None:
+            self._journal.close()
+            self._journal = None
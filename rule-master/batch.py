@@ -0,0 +1,269 @@
+"""
+Rule Master 非交互批量模式
+
+根据答案文件为一批目标仓库生成 rule.md，无需终端交互：
+
+    python3 rule-master/main.py batch --answers answers.json --targets targets.txt
+    python3 rule-master/batch.py --answers answers.json --target ../svc-a --target ../svc-b
+
+答案文件格式（规则 id -> 选择结果）：
+
+    {
+      "rules": {
+        "role_definition": "后端专家 (Python/Go)",
+        "tech_stack": {
+          "select": ["python", "sql_db"],
+          "inputs": {"python": {"version": "3.11", "framework": "FastAPI"}},
+          "custom": "额外的自定义内容"
+        },
+        "security": "skip"
+      },
+      "custom_rules": [{"title": "My Custom Rule", "content": "..."}]
+    }
+
+选项可用 value 或 label 引用；未列出的规则视为跳过；未提供的输入变量使用
+规则文件中的 default。渲染复用 render_rule / compiler.compile_rules，
+与交互模式的输出逐字节一致；--budget 指定 token 预算时，压缩后仍超出预算的
+目标视为失败，不写入文件。
+
+目标列表可以是每行一个路径的文本文件，也可以是 JSON 数组，元素为路径或
+{"path": ..., "answers": {...}}，其中 answers 按规则 id 覆盖公共答案。
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import main as rule_master
+from compiler import TokenizerError, compile_rules, format_report, get_tokenizer
+from main import Color
+from resolver import ResolveError, RuleResolver
+
+DEFAULT_OUTPUT_NAME = 'rule.md'
+
+
+class AnswerError(ValueError):
+    """答案文件与规则定义不匹配"""
+
+
+def find_option(rule, ref):
+    """按 value 或 label 查找规则选项"""
+    for opt in rule.get('options', []):
+        if ref in (opt.get('value'), opt.get('label')):
+            return opt
+    raise AnswerError(f"{rule['id']}: unknown option {ref!r}")
+
+
+def option_inputs(answer, opt):
+    inputs = answer.get('inputs') or {}
+    for ref in (opt.get('value'), opt.get('label')):
+        if ref is not None and ref in inputs:
+            return inputs[ref]
+    return {}
+
+
+def answer_replacements(opt, values):
+    """非交互版 collect_inputs：输入值取自答案，缺省时取 default"""
+    replacements = {}
+    for inp in opt.get('inputs', []):
+        key = inp.get('key')
+        value = values.get(key, inp.get('default', ''))
+        replacements[key] = str(value).strip()
+    return replacements
+
+
+def render_rule_answer(rule, answer, resolver):
+    """按答案处理单个规则，返回与 process_rule 相同的选择结果"""
+    if not rule.get('options'):
+        return []
+    if answer is None or answer == 'skip':
+        answer = {}
+    elif not isinstance(answer, dict):
+        answer = {'select': answer}
+
+    select = answer.get('select', [])
+    if not isinstance(select, list):
+        select = [select]
+    if rule.get('type', 'single_select') != 'multi_select' and len(select) > 1:
+        raise AnswerError(f"{rule['id']}: single_select rule accepts one option")
+    for ref in select:
+        try:
+            resolver.select(rule, find_option(rule, ref))
+        except ResolveError as e:
+            raise AnswerError(str(e))
+
+    # 与交互模式相同：按选项在规则中的顺序输出（含被依赖选中的选项），自定义内容排在最后
+    picks = []
+    for opt in rule['options']:
+        if resolver.status(rule, opt) is True:
+            picks.append((opt, answer_replacements(opt, option_inputs(answer, opt))))
+    resolver.finish_rule(rule)
+    if answer.get('custom'):
+        picks.append((None, answer['custom']))
+
+    return picks
+
+
+def render_answers(rules, answers, budget=None, tokenizer=None):
+    """按答案编译完整的 rule.md，返回 compile_rules 的结果"""
+    rule_answers = answers.get('rules') or {}
+    unknown = set(rule_answers) - {rule['id'] for rule in rules}
+    if unknown:
+        raise AnswerError(f"unknown rule id: {', '.join(sorted(unknown))}")
+
+    resolver = RuleResolver(rules)
+    sections = [(rule, render_rule_answer(rule, rule_answers.get(rule['id']), resolver))
+                for rule in rules]
+    custom_rules = [(item['title'], item['content'])
+                    for item in answers.get('custom_rules') or []
+                    if item.get('title') and item.get('content')]
+    return compile_rules(sections, custom_rules, budget, tokenizer)
+
+
+def load_targets(path):
+    """读取目标列表，返回 [(路径, 覆盖答案或 None)]"""
+    with open(path, 'r', encoding='utf-8') as fp:
+        if path.endswith('.json'):
+            items = json.load(fp)
+        else:
+            items = [line.strip() for line in fp
+                     if line.strip() and not line.lstrip().startswith('#')]
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    targets = []
+    for item in items:
+        if isinstance(item, dict):
+            target, overrides = item['path'], item.get('answers')
+        else:
+            target, overrides = item, None
+        targets.append((os.path.join(base_dir, os.path.expanduser(target)), overrides))
+    return targets
+
+
+def merge_answers(answers, overrides):
+    if not overrides:
+        return answers
+    merged = dict(answers)
+    merged['rules'] = dict(answers.get('rules') or {}, **(overrides.get('rules') or {}))
+    if 'custom_rules' in overrides:
+        merged['custom_rules'] = overrides['custom_rules']
+    return merged
+
+
+# -- 工作进程 ----------------------------------------------------------------
+
+_rules = None
+_budget = None
+_tokenizer = None
+_rendered = {}
+
+
+def _init_worker(rules, budget=None, tokenizer=None):
+    global _rules, _budget, _tokenizer
+    _rules = rules
+    _budget = budget
+    _tokenizer = tokenizer
+    _rendered.clear()
+
+
+def render_target(task):
+    """渲染并原子写入一个目标，返回 (路径, 错误信息或 None)"""
+    target, answers, output_name = task
+    try:
+        # 相同答案的目标只渲染一次
+        key = json.dumps(answers, sort_keys=True, ensure_ascii=False)
+        result = _rendered.get(key)
+        if result is None:
+            result = _rendered[key] = render_answers(_rules, answers, _budget, _tokenizer)
+        if result['over_budget']:
+            return target, f"{result['tokens']} tokens exceeds budget {_budget}"
+        if not os.path.isdir(target):
+            return target, "target directory not found"
+        rule_master.write_file_atomic(os.path.join(target, output_name), result['text'])
+    except (AnswerError, OSError) as e:
+        return target, str(e)
+    return target, None
+
+
+def run_batch(rules, answers, targets, output_name=DEFAULT_OUTPUT_NAME, jobs=None,
+              budget=None, tokenizer=None):
+    """为所有目标生成输出，返回 [(路径, 错误信息或 None)]
+
+    tokenizer 以名称传给工作进程，由各进程自行创建计数器。
+    """
+    tasks = [(target, merge_answers(answers, overrides), output_name)
+             for target, overrides in targets]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(tasks) <= 1:
+        _init_worker(rules, budget, tokenizer)
+        return [render_target(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(rules, budget, tokenizer)) as pool:
+        return list(pool.map(render_target, tasks, chunksize=chunksize))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='main.py batch',
+        description='Generate rule.md for many repositories from an answers file.',
+    )
+    parser.add_argument('--answers', required=True, help='Answers JSON file')
+    parser.add_argument('--targets', help='Target list (text: one path per line, or .json)')
+    parser.add_argument('--target', action='append', default=[], help='Target directory (repeatable)')
+    parser.add_argument('--output-name', default=DEFAULT_OUTPUT_NAME,
+                        help=f'Output file name inside each target (default: {DEFAULT_OUTPUT_NAME})')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count; 1 = in-process)')
+    parser.add_argument('--budget', type=int, default=None,
+                        help='Token budget; targets still over it after compaction fail')
+    parser.add_argument('--tokenizer', default=None,
+                        help='auto | bytes | tiktoken[:<encoding>] | <module>:<func> '
+                             '(default: $RULE_MASTER_TOKENIZER or auto)')
+    parser.add_argument('--report', action='store_true',
+                        help='Print per-section token sizes for the shared answers')
+    args = parser.parse_args(argv)
+    try:
+        get_tokenizer(args.tokenizer)
+    except TokenizerError as e:
+        parser.error(str(e))
+
+    try:
+        with open(args.answers, 'r', encoding='utf-8') as fp:
+            answers = json.load(fp)
+        targets = load_targets(args.targets) if args.targets else []
+    except (OSError, ValueError, KeyError) as e:
+        print(f"{Color.FAIL}Cannot read input: {e}{Color.ENDC}", file=sys.stderr)
+        return 2
+    targets.extend((os.path.abspath(t), None) for t in args.target)
+    if not targets:
+        parser.error('no targets given (use --targets or --target)')
+
+    rules = rule_master.load_rules()
+    if not rules:
+        print(f"{Color.FAIL}没有找到规则定义文件。请检查 rules/ 目录。{Color.ENDC}", file=sys.stderr)
+        return 1
+
+    for error in RuleResolver(rules).errors:
+        print(f"{Color.WARNING}{error}{Color.ENDC}", file=sys.stderr)
+
+    if args.report:
+        try:
+            print(format_report(render_answers(rules, answers, args.budget, args.tokenizer)))
+        except AnswerError as e:
+            print(f"{Color.FAIL}{e}{Color.ENDC}", file=sys.stderr)
+
+    results = run_batch(rules, answers, targets, args.output_name, args.jobs,
+                        args.budget, args.tokenizer)
+    failed = [(target, error) for target, error in results if error]
+    for target, error in failed:
+        print(f"{Color.FAIL}{target}: {error}{Color.ENDC}", file=sys.stderr)
+    print(f"{Color.GREEN}已生成 {len(results) - len(failed)} 个文件，失败 {len(failed)} 个{Color.ENDC}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+批量模式基准测试
+
+在临时目录中创建 N 个目标仓库（默认 1000），用一份选中所有选项的答案
+分别以单进程和进程池运行批量生成，并校验所有输出一致：
+
+    python3 rule-master/bench_batch.py [--targets 1000] [--jobs N]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import batch
+import main as rule_master
+
+
+def full_answers(rules):
+    """选择每个规则的全部选项（单选规则取第一项），输入变量使用默认值"""
+    answers = {}
+    for rule in rules:
+        options = rule.get('options', [])
+        refs = [opt.get('value', opt.get('label')) for opt in options]
+        if rule.get('type', 'single_select') != 'multi_select':
+            refs = refs[:1]
+        answers[rule['id']] = {'select': refs}
+    return {'rules': answers, 'custom_rules': [{'title': 'Bench', 'content': 'Generated'}]}
+
+
+def run(rules, answers, workdir, count, jobs):
+    targets = []
+    for i in range(count):
+        target = os.path.join(workdir, f'repo-{i:04d}')
+        os.makedirs(target, exist_ok=True)
+        targets.append((target, None))
+    start = time.perf_counter()
+    results = batch.run_batch(rules, answers, targets, jobs=jobs)
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if r[1]]
+    if failed:
+        raise SystemExit(f'{len(failed)} targets failed: {failed[0]}')
+    return elapsed, targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark rule-master batch mode.')
+    parser.add_argument('--targets', type=int, default=1000, help='Number of targets (default: 1000)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for the pool run (default: CPU count)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rules = rule_master.load_rules()
+    load_ms = (time.perf_counter() - start) * 1000
+    answers = full_answers(rules)
+    expected = batch.render_answers(rules, answers)['text']
+
+    workdir = tempfile.mkdtemp(prefix='bench-rule-master-')
+    try:
+        print(f'{len(rules)} rules loaded in {load_ms:.1f} ms, {args.targets} targets')
+        for label, jobs in (('in-process', 1), (f'pool x{args.jobs}', args.jobs)):
+            elapsed, targets = run(rules, answers, os.path.join(workdir, label.replace(' ', '')),
+                                   args.targets, jobs)
+            for target, _ in targets:
+                with open(os.path.join(target, batch.DEFAULT_OUTPUT_NAME), 'r', encoding='utf-8') as fp:
+                    if fp.read() != expected:
+                        raise SystemExit(f'output mismatch in {target}')
+            print(f'  {label:<11} {elapsed * 1000:>8.1f} ms total  {elapsed * 1e6 / args.targets:>7.1f} us/target')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+按 token 预算编译 rule.md
+
+rule.md 会整体进入 AI 的上下文，体积直接占用 token。compile_rules 渲染文档
+并统计每个段落的 token / 字节数；给出预算时，依次应用以下压缩策略，直到
+文档不超过预算为止（每一步都在前一步的基础上进行）：
+
+    collapse_whitespace  去掉行尾空白、合并连续空行和行内多余空格（代码块内不变）
+    drop_descriptions    删除引用说明行 (> ...) 与 HTML 注释
+    short_variants       选项声明了 short_content 时改用精简版本
+
+不给预算或文档本身未超出预算时，输出即 document_parts 各部分按行拼接，不做任何改动。
+
+token 计数器（--tokenizer 或环境变量 RULE_MASTER_TOKENIZER）：
+
+    auto               已安装 tiktoken 时使用 tiktoken，否则使用 bytes
+    bytes              UTF-8 字节数 / 4（向上取整）的近似值
+    tiktoken[:<enc>]   tiktoken 编码，默认 cl100k_base
+    <module>:<func>    自定义函数，接收文本返回 token 数
+"""
+
+import importlib
+import os
+import re
+
+import main as rule_master
+
+DEFAULT_TOKENIZER = os.environ.get('RULE_MASTER_TOKENIZER', 'auto')
+DEFAULT_ENCODING = 'cl100k_base'
+
+STRATEGIES = ('collapse_whitespace', 'drop_descriptions', 'short_variants')
+
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+COMMENT_RE = re.compile(r'<!--.*?-->\n?', re.S)
+SPACES_RE = re.compile(r'(?<=\S)[ \t]{2,}')
+
+
+class TokenizerError(ValueError):
+    """无法创建指定的 token 计数器"""
+
+
+def count_bytes(text):
+    return (len(text.encode('utf-8')) + 3) // 4
+
+
+def get_tokenizer(spec=None):
+    """返回 (名称, 计数函数)"""
+    spec = spec or DEFAULT_TOKENIZER
+    if spec == 'bytes':
+        return 'bytes', count_bytes
+    if spec == 'auto' or spec == 'tiktoken' or spec.startswith('tiktoken:'):
+        encoding_name = spec.partition(':')[2] or DEFAULT_ENCODING
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            if spec == 'auto':
+                return 'bytes', count_bytes
+            raise TokenizerError(f"tiktoken unavailable: {e}")
+        return (f'tiktoken:{encoding_name}',
+                lambda text: len(encoding.encode(text, disallowed_special=())))
+    module_name, _, func_name = spec.partition(':')
+    if not func_name:
+        raise TokenizerError(f"unknown tokenizer {spec!r}")
+    try:
+        func = getattr(importlib.import_module(module_name), func_name)
+    except (ImportError, AttributeError) as e:
+        raise TokenizerError(f"cannot load tokenizer {spec!r}: {e}")
+    return spec, func
+
+
+# -- 压缩策略 ----------------------------------------------------------------
+
+def collapse_whitespace(text):
+    """无损压缩空白：代码块外去掉行尾空白、合并空行和行内连续空格"""
+    lines = []
+    in_fence = False
+    for line in text.split('\n'):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            lines.append(line.rstrip())
+            continue
+        if in_fence:
+            lines.append(line)
+            continue
+        line = SPACES_RE.sub(' ', line.rstrip())
+        if not line and lines and not lines[-1]:
+            continue
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def drop_descriptions(text):
+    """删除代码块外的引用说明行与 HTML 注释"""
+    lines = []
+    in_fence = False
+    for line in COMMENT_RE.sub('', text).split('\n'):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and line.lstrip().startswith('>'):
+            continue
+        lines.append(line)
+    text = '\n'.join(lines)
+    return '' if not text.strip() else text
+
+
+TEXT_STRATEGIES = {
+    'collapse_whitespace': collapse_whitespace,
+    'drop_descriptions': drop_descriptions,
+}
+
+
+# -- 编译 --------------------------------------------------------------------
+
+def build_parts(sections, custom_rules, short=False):
+    rule_sections = [rule_master.render_rule(rule, picks, short) for rule, picks in sections]
+    names = [rule['id'] for rule, _ in sections]
+    return rule_master.document_parts(rule_sections, custom_rules, names)
+
+
+def join_parts(parts):
+    return '\n'.join(text for _, text in parts if text)
+
+
+def compile_rules(sections, custom_rules=(), budget=None, tokenizer=None):
+    """渲染 rule.md 并按预算压缩
+
+    sections 为 [(rule, picks)]，picks 同 process_rule 的返回值；
+    tokenizer 为计数器名称（见模块说明）。返回字典：
+    text / tokens / bytes / budget / tokenizer / strategies（已应用的策略）/
+    sections（[(名称, tokens, bytes)]）/ over_budget。
+    """
+    tokenizer_name, count = get_tokenizer(tokenizer)
+    parts = build_parts(sections, custom_rules)
+    text = join_parts(parts)
+    applied = []
+
+    for strategy in STRATEGIES:
+        if budget is None or count(text) <= budget:
+            break
+        if strategy == 'short_variants':
+            # 精简版本替换的是原始内容，需重新渲染后再应用前面的文本策略
+            parts = build_parts(sections, custom_rules, short=True)
+            for previous in applied:
+                parts = [(name, TEXT_STRATEGIES[previous](part)) for name, part in parts]
+        else:
+            parts = [(name, TEXT_STRATEGIES[strategy](part)) for name, part in parts]
+        applied.append(strategy)
+        text = join_parts(parts)
+
+    tokens = count(text)
+    rows = [(name, count(part), len(part.encode('utf-8'))) for name, part in parts if part]
+    return {
+        'text': text,
+        'tokens': tokens,
+        'bytes': len(text.encode('utf-8')),
+        'budget': budget,
+        'tokenizer': tokenizer_name,
+        'strategies': applied,
+        'sections': rows,
+        'over_budget': budget is not None and tokens > budget,
+    }
+
+
+def format_report(result):
+    """按段落列出 token / 字节数"""
+    lines = [f"{'tokens':>8} {'bytes':>8}  section"]
+    for name, tokens, size in result['sections']:
+        lines.append(f"{tokens:>8} {size:>8}  {name}")
+    total = f"{result['tokens']:>8} {result['bytes']:>8}  total ({result['tokenizer']})"
+    if result['budget'] is not None:
+        total += f", budget {result['budget']}"
+    lines.append(total)
+    if result['strategies']:
+        lines.append(f"applied: {', '.join(result['strategies'])}")
+    return '\n'.join(lines)
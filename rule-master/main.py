@@ -1,22 +1,31 @@
+import hashlib
 import json
 import os
+import pickle
 import sys
 import re
-import questionary
-from questionary import Choice, Separator
-from prompt_toolkit import Application
-from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.layout.containers import Window, HSplit
-from prompt_toolkit.layout.controls import FormattedTextControl
-from prompt_toolkit.layout.layout import Layout
-from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.styles import Style
+import time
+
+from resolver import ResolveError, RuleResolver
+
+# questionary / prompt_toolkit 只在交互流程中按需导入，
+# 非交互路径（加载规则、渲染内容）无需承担其导入开销。
 
 # 配置路径
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RULES_DIR = os.path.join(BASE_DIR, 'rules')
 OUTPUT_FILE = os.path.join(BASE_DIR, 'rule.md')
 
+# 已编译的规则目录：缓存每个规则文件解析、校验后的结果
+CACHE_DIR = os.path.join(BASE_DIR, '.cache')
+CATALOG_FILE = os.path.join(CACHE_DIR, 'rules.pickle')
+CATALOG_VERSION = 3
+# mtime 落在目录写入时间附近的文件无法只凭 stat 判断是否变化，需重新计算哈希
+CATALOG_RACY_WINDOW_NS = 2 * 10**9
+
+# 选择列表除选项行外占用的终端行数（标题、筛选栏、滚动提示、快捷键说明）
+SELECT_CHROME_ROWS = 7
+
 class Color:
     HEADER = '\033[95m'
     BLUE = '\033[94m'
@@ -37,35 +46,117 @@ def print_info(text):
 def print_success(text):
     print(f"{Color.GREEN}{text}{Color.ENDC}")
 
-def load_rules():
-    """加载所有规则文件"""
+def compile_rule_file(name, raw):
+    """解析并校验单个规则文件，返回目录条目 (rule 或 error 二选一)"""
+    try:
+        rule_data = json.loads(raw.decode('utf-8'))
+    except Exception as e:
+        return {'rule': None, 'error': (Color.FAIL, f"Error loading {name}: {e}")}
+    # 简单的校验
+    if not isinstance(rule_data, dict) or 'id' not in rule_data or 'options' not in rule_data:
+        return {'rule': None, 'error': (Color.WARNING, f"Skipping invalid rule file: {name}")}
+    # 预编译带输入变量的选项内容，随规则目录一起缓存
+    for opt in rule_data['options']:
+        if isinstance(opt, dict) and opt.get('inputs'):
+            option_template(opt)
+            if opt.get('short_content'):
+                option_template(opt, 'short_content')
+    return {'rule': rule_data, 'error': None}
+
+def load_catalog():
+    """读取已编译的规则目录，不存在、损坏或版本不符时返回 None"""
+    try:
+        with open(CATALOG_FILE, 'rb') as fp:
+            catalog = pickle.load(fp)
+    except Exception:
+        return None
+    if (not isinstance(catalog, dict) or catalog.get('version') != CATALOG_VERSION
+            or catalog.get('rules_dir') != RULES_DIR):
+        return None
+    return catalog
+
+def save_catalog(entries, built_at_ns):
+    """原子写入规则目录；缓存目录不可写时静默跳过"""
+    catalog = {
+        'version': CATALOG_VERSION,
+        'rules_dir': RULES_DIR,
+        'built_at_ns': built_at_ns,
+        'entries': entries,
+    }
+    tmp_path = f"{CATALOG_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'wb') as fp:
+            pickle.dump(catalog, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, CATALOG_FILE)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+def load_rules(use_cache=True):
+    """加载所有规则文件
+
+    解析结果缓存在 .cache/rules.pickle 中，按文件的 mtime/大小 和 sha256 作键：
+    stat 未变化的文件直接复用缓存；stat 变化但内容哈希相同的文件也无需重新解析。
+    只有规则文件有增删改时才重写缓存。
+    """
     rules = []
     if not os.path.exists(RULES_DIR):
         print(f"{Color.FAIL}Rules directory not found: {RULES_DIR}{Color.ENDC}")
         return rules
-    
+
+    catalog = load_catalog() if use_cache else None
+    cached = catalog['entries'] if catalog else {}
+    racy_before = catalog['built_at_ns'] - CATALOG_RACY_WINDOW_NS if catalog else 0
+    built_at_ns = time.time_ns()
+
+    entries = {}
+    changed = False
     files = sorted([f for f in os.listdir(RULES_DIR) if f.endswith('.json')])
     for f in files:
+        path = os.path.join(RULES_DIR, f)
+        entry = cached.get(f)
         try:
-            with open(os.path.join(RULES_DIR, f), 'r', encoding='utf-8') as fp:
-                rule_data = json.load(fp)
-                # 简单的校验
-                if 'id' not in rule_data or 'options' not in rule_data:
-                    print(f"{Color.WARNING}Skipping invalid rule file: {f}{Color.ENDC}")
-                    continue
-                rules.append(rule_data)
-        except Exception as e:
+            st = os.stat(path)
+            if (entry is None or entry['mtime_ns'] != st.st_mtime_ns
+                    or entry['size'] != st.st_size or st.st_mtime_ns >= racy_before):
+                with open(path, 'rb') as fp:
+                    raw = fp.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                if entry is None or entry['sha256'] != digest:
+                    entry = compile_rule_file(f, raw)
+                    entry['sha256'] = digest
+                entry = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+                changed = True
+        except OSError as e:
             print(f"{Color.FAIL}Error loading {f}: {e}{Color.ENDC}")
+            continue
+        entries[f] = entry
+        if entry['error']:
+            color, message = entry['error']
+            print(f"{color}{message}{Color.ENDC}")
+        else:
+            rules.append(entry['rule'])
+
+    if use_cache and (changed or entries.keys() != cached.keys()):
+        save_catalog(entries, built_at_ns)
     return rules
 
 def process_inputs(option):
     """处理选项中的自定义输入变量"""
-    content = option.get('content', '')
+    return render_option(option, collect_inputs(option))
+
+def collect_inputs(option):
+    """交互式询问选项声明的输入变量，返回 {key: value}"""
     inputs = option.get('inputs', [])
     
     if not inputs:
-        return content
+        return {}
     
+    import questionary
+
     print_info(f"  > 需要配置详细信息 ({option.get('label')}):")
     replacements = {}
     for inp in inputs:
@@ -84,33 +175,168 @@ def process_inputs(option):
             
         replacements[key] = value.strip()
         
-    # 执行替换
-    try:
-        # 使用 format 进行替换，允许 content 中包含 {key}
-        # 为了防止 content 中有其他花括号（如代码块），我们需要小心
-        # 这里简单起见，我们假设 content 中的花括号都是变量，或者用户需要转义
-        # 更稳健的做法是使用正则替换
-        for key, val in replacements.items():
-            pattern = r'\{' + re.escape(key) + r'\}'
-            content = re.sub(pattern, str(val), content)
-    except Exception as e:
-        print(f"{Color.WARNING}  Template rendering warning: {e}{Color.ENDC}")
-        
-    return content
+    return replacements
+
+def compile_template(content, keys):
+    """将内容编译为模板片段列表 [文本, 变量名, 文本, ..., 文本]
 
-def custom_select(title, options, multi=False):
+    只有 keys 中声明的 {key} 才是占位符，代码块里的其他花括号原样保留。
+    转义：\\{key} 输出字面量 {key}；占位符前的 \\\\ 输出一个反斜杠。
     """
-    自定义选择器，支持 'd' 查看详情，'e' 编辑内容
+    parts = []
+    literal = []
+    pos = 0
+    keys = sorted(k for k in set(keys) if isinstance(k, str) and k)
+    if keys:
+        pattern = re.compile(r'(\\*)\{(' + '|'.join(map(re.escape, keys)) + r')\}')
+        for m in pattern.finditer(content):
+            slashes = len(m.group(1))
+            literal.append(content[pos:m.start()])
+            literal.append('\\' * (slashes // 2))
+            if slashes % 2:
+                literal.append('{' + m.group(2) + '}')
+            else:
+                parts.append(''.join(literal))
+                parts.append(m.group(2))
+                literal = []
+            pos = m.end()
+    literal.append(content[pos:])
+    parts.append(''.join(literal))
+    return parts
+
+def render_template(parts, replacements):
+    """一次拼接渲染已编译的模板；缺少取值的变量保留为 {key}"""
+    out = list(parts)
+    for i in range(1, len(out), 2):
+        key = out[i]
+        out[i] = str(replacements[key]) if key in replacements else '{' + key + '}'
+    return ''.join(out)
+
+def option_template(option, field='content'):
+    """返回选项内容（或 short_content）的已编译模板，缓存在 option['_template'] 中
+
+    规则目录缓存会连同编译结果一起持久化；内容被 'e' 编辑过时重新编译。
     """
-    selected_indices = set()
-    current_index = 0
+    content = option.get(field, '')
+    templates = option.setdefault('_template', {})
+    cached = templates.get(field)
+    if cached is None or cached[0] is not content:
+        keys = [inp.get('key') for inp in option.get('inputs', [])]
+        cached = templates[field] = (content, compile_template(content, keys))
+    return cached[1]
+
+def render_option(option, replacements, short=False):
+    """代入输入变量渲染选项内容（交互与批量模式共用）
+
+    short 为 True 且选项提供了 short_content 时渲染精简版本。
+    """
+    field = 'short_content' if short and option.get('short_content') else 'content'
+    if not option.get('inputs'):
+        return option.get(field, '')
+    return render_template(option_template(option, field), replacements)
+
+def build_search_index(options):
+    """为选项预先计算小写的检索文本（标签 + 描述）"""
+    index = []
+    for opt in options:
+        value = getattr(opt, 'value', None)
+        desc = value.get('description', '') if isinstance(value, dict) else ''
+        index.append(f"{opt.title} {desc}".lower())
+    return index
+
+def fuzzy_score(query, text):
+    """子序列模糊匹配，不匹配返回 None；连续命中、词首命中得分更高"""
+    score = 0
+    pos = 0
+    prev = -2
+    for ch in query:
+        found = text.find(ch, pos)
+        if found < 0:
+            return None
+        if found == prev + 1:
+            score += 3
+        elif found == 0 or not text[found - 1].isalnum():
+            score += 2
+        else:
+            score += 1
+        prev = found
+        pos = found + 1
+    return score
+
+def option_detail(opt):
+    """'d' 详情区的文本"""
+    # 如果 value 是 CUSTOM_TOKEN 或 SKIP_TOKEN，没有 description
+    value = opt.value
+    desc = ""
+    if isinstance(value, dict):
+        desc = value.get('description', 'No description available.')
+        content = value.get('content', '')
+        if content:
+            desc += f"\n\nContent Preview:\n{content[:200]}..."
+    elif value == "___CUSTOM___":
+        desc = "手动输入自定义规则内容。"
+    elif value == "___SKIP___":
+        desc = "跳过当前规则配置。"
+    return desc
+
+def custom_select(title, options, multi=False, selected=()):
+    """
+    自定义选择器，支持 'd' 查看详情，'e' 编辑内容，'/' 模糊筛选
+    selected 为多选模式下预先选中的选项索引。
+
+    列表是虚拟化的：只渲染终端能显示的窗口，每行的片段按
+    (选项, 是否光标行, 是否选中) 缓存，选中状态变化前直接复用。
+    """
+    import shutil
+    from questionary import Separator
+    from prompt_toolkit import Application
+    from prompt_toolkit.filters import Condition
+    from prompt_toolkit.key_binding import KeyBindings
+    from prompt_toolkit.layout.containers import Window, HSplit
+    from prompt_toolkit.layout.controls import FormattedTextControl
+    from prompt_toolkit.layout.layout import Layout
+    from prompt_toolkit.styles import Style
+
+    selected_indices = set(selected)
     
     # 过滤掉 Separator，只保留真实选项
     real_options = [opt for opt in options if not isinstance(opt, Separator)]
-    
-    # 映射回原始 options 列表中的索引，用于显示 Separator
-    # 这里简化处理，只显示真实选项列表
-    
+    search_index = build_search_index(real_options)
+
+    # visible 为当前显示的选项索引（筛选后），current_index 是光标在 visible 中的位置
+    query = ""
+    filtering = False
+    matches = list(range(len(real_options)))
+    visible = matches
+    current_index = 0
+    top = 0
+    detail_msg = None
+    row_cache = {}
+    detail_cache = {}
+
+    def apply_filter(new_query):
+        nonlocal query, matches, visible, current_index, top
+        # 查询只是在末尾追加字符时，只需在上一次的匹配结果中继续筛选
+        if query and new_query.startswith(query):
+            candidates = matches
+        else:
+            candidates = range(len(real_options))
+        needle = new_query.lower()
+        scored = []
+        for i in candidates:
+            score = fuzzy_score(needle, search_index[i])
+            if score is not None:
+                scored.append((-score, i))
+        matches = [i for _, i in scored]
+        visible = [i for _, i in sorted(scored)] if new_query else matches
+        query = new_query
+        current_index = 0
+        top = 0
+
+    def current_option():
+        return visible[current_index] if visible else None
+
+    is_filtering = Condition(lambda: filtering)
     kb = KeyBindings()
 
     @kb.add('c-c')
@@ -120,91 +346,147 @@ def custom_select(title, options, multi=False):
     @kb.add('up')
     def up(event):
         nonlocal current_index
-        current_index = (current_index - 1) % len(real_options)
+        if visible:
+            current_index = (current_index - 1) % len(visible)
 
     @kb.add('down')
     def down(event):
         nonlocal current_index
-        current_index = (current_index + 1) % len(real_options)
+        if visible:
+            current_index = (current_index + 1) % len(visible)
+
+    @kb.add('pageup')
+    def page_up(event):
+        nonlocal current_index
+        current_index = max(current_index - page_rows(), 0)
+
+    @kb.add('pagedown')
+    def page_down(event):
+        nonlocal current_index
+        current_index = max(min(current_index + page_rows(), len(visible) - 1), 0)
+
+    @kb.add('/', filter=~is_filtering)
+    def start_filter(event):
+        nonlocal filtering
+        filtering = True
+
+    @kb.add('<any>', filter=is_filtering)
+    def type_filter(event):
+        if event.data and event.data.isprintable():
+            apply_filter(query + event.data)
+
+    @kb.add('backspace', filter=is_filtering)
+    def erase_filter(event):
+        nonlocal filtering
+        if query:
+            apply_filter(query[:-1])
+        else:
+            filtering = False
+
+    @kb.add('escape', filter=is_filtering)
+    def cancel_filter(event):
+        nonlocal filtering
+        filtering = False
+        apply_filter("")
 
     if multi:
-        @kb.add('space')
+        @kb.add('space', filter=~is_filtering)
         def toggle(event):
-            if current_index in selected_indices:
-                selected_indices.remove(current_index)
+            i = current_option()
+            if i is None:
+                return
+            if i in selected_indices:
+                selected_indices.remove(i)
             else:
-                selected_indices.add(current_index)
+                selected_indices.add(i)
     
     @kb.add('enter')
     def enter(event):
+        nonlocal filtering
+        if filtering:
+            # 结束输入，保留筛选结果，方便继续选择/查看
+            filtering = False
+            return
+        i = current_option()
         if not multi:
-            selected_indices.add(current_index)
-        event.app.exit(result=list(selected_indices))
+            if i is None:
+                return
+            selected_indices.add(i)
+        event.app.exit(result=sorted(selected_indices))
 
-    @kb.add('d')
+    @kb.add('d', filter=~is_filtering)
     def show_detail(event):
-        opt = real_options[current_index]
-        # 假设 value 是 dict，包含 description
-        # 如果 value 是 CUSTOM_TOKEN 或 SKIP_TOKEN，可能没有 description
-        value = opt.value
-        desc = ""
-        if isinstance(value, dict):
-            desc = value.get('description', 'No description available.')
-            content = value.get('content', '')
-            if content:
-                desc += f"\n\nContent Preview:\n{content[:200]}..."
-        elif value == "___CUSTOM___":
-            desc = "手动输入自定义规则内容。"
-        elif value == "___SKIP___":
-            desc = "跳过当前规则配置。"
-        
-        # 清屏并打印详情，然后重新绘制
-        # 由于 prompt_toolkit 是全屏应用模式（这里 full_screen=False），
-        # 直接 print 会破坏布局。
-        # 我们可以在下方显示详情区域，或者弹窗。
-        # 简单起见，我们更新一个状态变量，让 get_text 渲染详情
+        # 在列表下方显示详情区域，由 get_text 渲染
         nonlocal detail_msg
-        detail_msg = desc
-
-    @kb.add('e')
+        i = current_option()
+        if i is None:
+            return
+        if i not in detail_cache:
+            detail_cache[i] = option_detail(real_options[i])
+        detail_msg = detail_cache[i]
+
+    @kb.add('e', filter=~is_filtering)
     def edit_content(event):
-        opt = real_options[current_index]
-        value = opt.value
-        if isinstance(value, dict):
-            # 退出当前 app，进入编辑模式
-            # 但这里比较麻烦，因为 app.run() 是阻塞的。
-            # 我们可以先 exit，返回一个特殊信号，让外层处理编辑，然后再回来？
-            # 或者使用 suspend_to_background (复杂)
-            # 简单方案：标记编辑状态，退出 app，在外层处理完后再重新进入 custom_select
-            # 但这样会丢失当前的选择状态（除非传入）
-            event.app.exit(result=('EDIT', current_index))
+        i = current_option()
+        if i is None:
+            return
+        if isinstance(real_options[i].value, dict):
+            # 退出当前 app，返回编辑信号，由外层处理编辑后重新进入 custom_select
+            event.app.exit(result=('EDIT', i))
         else:
             nonlocal detail_msg
             detail_msg = "此选项不支持编辑 (仅预定义规则内容可编辑)"
 
-    detail_msg = None
+    def page_rows():
+        rows = shutil.get_terminal_size().lines - SELECT_CHROME_ROWS
+        if detail_msg:
+            rows -= detail_msg.count('\n') + 3
+        return max(rows, 3)
+
+    def row_fragment(i, is_current):
+        is_selected = i in selected_indices
+        key = (i, is_current, is_selected)
+        fragment = row_cache.get(key)
+        if fragment is None:
+            prefix = "  "
+            if multi:
+                prefix = "[x] " if is_selected else "[ ] "
+            style = 'class:selected' if is_current else ''
+            prefix = ("> " if is_current else "  ") + prefix
+            fragment = row_cache[key] = (style, f'{prefix}{real_options[i].title}\n')
+        return fragment
 
     def get_text():
+        nonlocal top
+        rows = page_rows()
+        # 保持光标在可见窗口内
+        if current_index < top:
+            top = current_index
+        elif current_index >= top + rows:
+            top = current_index - rows + 1
+        top = max(min(top, len(visible) - rows), 0)
+        end = min(top + rows, len(visible))
+
         text = []
         text.append(('', f'{title}\n'))
-        
-        for i, opt in enumerate(real_options):
-            prefix = "  "
+        if filtering or query:
+            cursor = '_' if filtering else ''
+            text.append(('class:filter', f'  /{query}{cursor}  ({len(visible)}/{len(real_options)})\n'))
+        if top > 0:
+            text.append(('class:more', f'  ↑ {top} more\n'))
+        for pos in range(top, end):
+            text.append(row_fragment(visible[pos], pos == current_index))
+        if end < len(visible):
+            text.append(('class:more', f'  ↓ {len(visible) - end} more\n'))
+        if not visible:
+            text.append(('class:more', '  (无匹配选项)\n'))
+
+        if filtering:
+            text.append(('', '\n[Enter]完成筛选 [Esc]清除筛选'))
+        else:
+            text.append(('', '\n[d]详情 [e]编辑 [/]筛选 [Enter]确认'))
             if multi:
-                prefix = "[x] " if i in selected_indices else "[ ] "
-            
-            style = ''
-            if i == current_index:
-                style = 'class:selected'
-                prefix = "> " + prefix
-            else:
-                prefix = "  " + prefix
-
-            text.append((style, f'{prefix}{opt.title}\n'))
-            
-        text.append(('', '\n[d]详情 [e]编辑 [Enter]确认'))
-        if multi:
-            text.append(('', ' [Space]选择'))
+                text.append(('', ' [Space]选择'))
         
         if detail_msg:
             text.append(('class:detail', f'\n\n--- Detail ---\n{detail_msg}'))
@@ -215,13 +497,22 @@ def custom_select(title, options, multi=False):
     style = Style.from_dict({
         'selected': 'fg:cyan bold',
         'detail': 'fg:yellow',
+        'filter': 'fg:green',
+        'more': 'fg:ansibrightblack',
     })
     
     app = Application(layout=layout, key_bindings=kb, full_screen=False, style=style)
     return app.run()
 
-def process_rule(rule):
-    """处理单个规则"""
+def process_rule(rule, resolver=None):
+    """处理单个规则，返回选择结果 [(选项, 输入变量)]，自定义内容为 (None, 文本)
+
+    传入 resolver 时按跨规则的依赖关系处理：已被排除的选项不再显示，
+    被其他选择强制选中的选项自动包含在输出中。
+    """
+    import questionary
+    from questionary import Choice
+
     print_header(rule.get('title', 'Unknown Rule'))
     description = rule.get('description', '')
     if description:
@@ -229,11 +520,18 @@ def process_rule(rule):
     
     options = rule.get('options', [])
     if not options:
-        return ""
+        return []
 
     rule_type = rule.get('type', 'single_select')
     # 强制允许跳过，不再依赖配置文件中的 allow_skip
     allow_skip = True 
+
+    forced = []
+    if resolver is not None:
+        forced = [opt for opt in options if resolver.status(rule, opt) is True]
+        for opt in forced:
+            print_info(f"  > 已由依赖自动选择: {opt.get('label')}")
+        options = [opt for opt in options if resolver.status(rule, opt) is not False]
     
     SKIP_TOKEN = "___SKIP___"
     CUSTOM_TOKEN = "___CUSTOM___"
@@ -256,12 +554,14 @@ def process_rule(rule):
 
     selected_opts = []
     
-    while True:
+    # 单选规则已被依赖确定时无需再询问
+    while not (forced and rule_type != 'multi_select'):
         # 使用自定义选择器
         result = custom_select(
             "请选择 (上下键移动):", 
             choices, 
-            multi=(rule_type == 'multi_select')
+            multi=(rule_type == 'multi_select'),
+            selected=[i for i, opt in enumerate(options) if any(opt is f for f in forced)]
         )
         
         if result is None: # Cancelled
@@ -280,6 +580,8 @@ def process_rule(rule):
             
             if new_content is not None:
                 opt_to_edit['content'] = new_content
+                # 编辑过的内容不再被精简版本替换
+                opt_to_edit.pop('short_content', None)
                 print_success("内容已更新")
             continue # 重新进入选择界面
             
@@ -312,18 +614,57 @@ def process_rule(rule):
         
         break
 
+    if resolver is not None:
+        accepted = []
+        for opt in selected_opts:
+            if isinstance(opt, dict):
+                try:
+                    resolver.select(rule, opt)
+                except ResolveError as e:
+                    print(f"{Color.WARNING}  已忽略 {opt.get('label')}: {e}{Color.ENDC}")
+                    continue
+            accepted.append(opt)
+        # 按规则中的顺序包含用户选择和被依赖选中的选项，自定义内容在最后
+        selected_opts = [opt for opt in rule['options'] if resolver.status(rule, opt) is True]
+        selected_opts += [opt for opt in accepted if not isinstance(opt, dict)]
+        resolver.finish_rule(rule)
+
     # 处理选中的内容
-    selected_contents = []
+    picks = []
     for opt in selected_opts:
         if opt == CUSTOM_TOKEN:
             custom_content = questionary.text("请输入自定义内容 (支持 Markdown):").ask()
             if custom_content:
                 print_success("已添加自定义内容")
-                selected_contents.append(custom_content)
+                picks.append((None, custom_content))
         elif opt and opt != SKIP_TOKEN: # 过滤掉 None 和 SKIP_TOKEN
             print_success(f"已选择: {opt.get('label')}")
-            content = process_inputs(opt)
-            selected_contents.append(content)
+            picks.append((opt, collect_inputs(opt)))
+
+    return picks
+
+def render_rule(rule, picks, short=False):
+    """拼接单个规则的输出段落
+
+    picks 为 process_rule 返回的选择结果；short 为 True 时使用选项的精简版本。
+    完全相同的内容只保留一份；相邻内容以同一标题行开头时合并到第一个标题下。
+    """
+    selected_contents = [render_option(opt, value, short) if opt is not None else value
+                         for opt, value in picks]
+    contents = []
+    last_heading = None
+    for content in selected_contents:
+        if content in contents:
+            continue
+        heading, _, body = content.partition('\n')
+        if not heading.startswith('#'):
+            last_heading = None
+        elif heading == last_heading and body:
+            content = body
+        else:
+            last_heading = heading
+        contents.append(content)
+    selected_contents = contents
 
     if not selected_contents:
         return ""
@@ -335,7 +676,66 @@ def process_rule(rule):
 
     return "\n\n".join(selected_contents)
 
-def main():
+def document_parts(rule_sections, custom_rules=(), names=None):
+    """返回 rule.md 的组成部分 [(名称, 文本)]，按行拼接即为完整内容
+
+    rule_sections 为各规则的输出段落（空字符串表示跳过），
+    custom_rules 为 (标题, 内容) 列表；names 为各段落的名称，默认取段落首行。
+    """
+    # 添加文件头
+    parts = [("(header)", "# Project Rules\n"), ("(header)", "> Generated by Rule Master\n")]
+    seen_blocks = set()
+    for i, section in enumerate(rule_sections):
+        section = dedupe_blocks(section, seen_blocks)
+        if section:
+            name = names[i] if names else section.split('\n', 1)[0].lstrip('#- ')
+            parts.append((name, section))
+    for title, content in custom_rules:
+        parts.append((title, f"## {title}\n\n{content}"))
+    return parts
+
+def dedupe_blocks(section, seen_blocks):
+    """删除与前面规则段落完全相同的内容块（以空行分隔；单行块如标题不处理）"""
+    blocks = []
+    for block in section.split('\n\n'):
+        key = block.strip()
+        if key and '\n' in key and key in seen_blocks:
+            continue
+        seen_blocks.add(key)
+        blocks.append(block)
+    return '\n\n'.join(blocks)
+
+def write_file_atomic(path, text):
+    """先写临时文件再重命名，避免留下写了一半的输出文件"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def main(argv=None):
+    import argparse
+    import questionary
+    from compiler import TokenizerError, compile_rules, format_report, get_tokenizer
+
+    parser = argparse.ArgumentParser(description='Interactively generate rule.md.')
+    parser.add_argument('--budget', type=int, default=None,
+                        help='Token budget; rule.md is compacted until it fits')
+    parser.add_argument('--tokenizer', default=None,
+                        help='auto | bytes | tiktoken[:<encoding>] | <module>:<func> '
+                             '(default: $RULE_MASTER_TOKENIZER or auto)')
+    args = parser.parse_args(argv)
+    try:
+        get_tokenizer(args.tokenizer)
+    except TokenizerError as e:
+        parser.error(str(e))
+
     print_header("Rule Master - AI Coding 规范生成器")
     print_info("将引导您生成项目的 rule.md 文件...")
     
@@ -344,16 +744,17 @@ def main():
         print(f"{Color.FAIL}没有找到规则定义文件。请检查 rules/ 目录。{Color.ENDC}")
         return
 
-    final_content = []
-    
-    # 添加文件头
-    final_content.append("# Project Rules\n")
-    final_content.append("> Generated by Rule Master\n")
+    resolver = RuleResolver(rules)
+    for error in resolver.errors:
+        print(f"{Color.WARNING}{error}{Color.ENDC}")
+
+    sections = []
+    custom_rules = []
 
     for rule in rules:
-        content = process_rule(rule)
-        if content:
-            final_content.append(content)
+        picks = process_rule(rule, resolver)
+        sections.append((rule, picks))
+        if picks:
             print_success("规则已添加。")
         else:
             print_info("规则已跳过。")
@@ -369,17 +770,25 @@ def main():
         if not content:
             continue
             
-        final_content.append(f"## {title}\n\n{content}")
+        custom_rules.append((title, content))
         print_success(f"已添加自定义规则: {title}")
 
+    result = compile_rules(sections, custom_rules, args.budget, args.tokenizer)
+    print_header("体积统计")
+    print(format_report(result))
+    if result['over_budget']:
+        print(f"{Color.WARNING}压缩后仍超出预算 {args.budget} tokens，请减少选择的规则。{Color.ENDC}")
+
     # 写入文件
     try:
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            f.write("\n".join(final_content))
+        write_file_atomic(OUTPUT_FILE, result['text'])
         print_header("生成完成")
         print_success(f"文件已生成: {OUTPUT_FILE}")
     except Exception as e:
         print(f"{Color.FAIL}写入文件失败: {e}{Color.ENDC}")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    if sys.argv[1:2] == ['batch']:
+        from batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    main(sys.argv[1:])
\ No newline at end of file
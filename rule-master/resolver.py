@@ -0,0 +1,118 @@
+"""
+规则选项之间的依赖与冲突求解
+
+选项可以声明与其他规则选项的关系，引用格式为 "<规则 id>.<选项 value>"
+（没有 value 的选项用 label）：
+
+    "requires":  ["tech_stack.python"]       python 被排除时此项不可选
+    "implies":   ["agent_hook.db_sync"]      选中此项时自动选中 db_sync
+    "conflicts": ["coding_style.go_style"]   与 go_style 互斥（双向）
+
+单选规则的选项之间隐含互斥。implies 是子句 ¬A ∨ B，conflicts 是 ¬A ∨ ¬B，
+均为二元子句（2-SAT），因此每次选择后做一次单元传播就能得到其余选项的强制
+选中 / 排除状态：传播无冲突时，剩余约束总能由“其余选项都不选”满足。
+
+requires 只是前置检查，不参与求解：目标被排除时排除此项，但从不因此项被选中
+而强制选中目标；目标尚未决定时此项照常可选，之后目标被排除也不会撤销已做的
+选择（所需规则可能排在后面，或被跳过）。传播开销只与受影响的选项数有关。
+"""
+
+
+class ResolveError(ValueError):
+    """选择与已声明的依赖 / 冲突关系矛盾"""
+
+
+def option_ref(rule, opt):
+    return f"{rule['id']}.{opt.get('value', opt.get('label'))}"
+
+
+class RuleResolver:
+    """跨规则文件的选项约束状态
+
+    value[ref] 为 True（选中 / 被强制选中）、False（排除）或不存在（未决定），
+    reason[ref] 记录导致该状态的选项，用于提示信息。
+    """
+
+    def __init__(self, rules):
+        self.rules = {rule['id']: rule for rule in rules}
+        self.implies = {}
+        self.implied_by = {}
+        self.required_by = {}
+        self.conflicts = {}
+        self.errors = []
+        self.value = {}
+        self.reason = {}
+
+        refs = set()
+        for rule in rules:
+            for opt in rule.get('options', []):
+                refs.add(option_ref(rule, opt))
+
+        for rule in rules:
+            options = rule.get('options', [])
+            own = [option_ref(rule, opt) for opt in options]
+            if rule.get('type', 'single_select') != 'multi_select':
+                for ref in own:
+                    self.conflicts.setdefault(ref, set()).update(r for r in own if r != ref)
+            for ref, opt in zip(own, options):
+                for kind in ('requires', 'implies', 'conflicts'):
+                    for target in opt.get(kind, []):
+                        if target not in refs:
+                            self.errors.append(f"{ref}: unknown {kind} target {target!r}")
+                        elif kind == 'conflicts':
+                            self.conflicts.setdefault(ref, set()).add(target)
+                            self.conflicts.setdefault(target, set()).add(ref)
+                        elif kind == 'requires':
+                            self.required_by.setdefault(target, []).append(ref)
+                        else:
+                            self.implies.setdefault(ref, []).append(target)
+                            self.implied_by.setdefault(target, []).append(ref)
+
+    def status(self, rule, opt):
+        return self.value.get(option_ref(rule, opt))
+
+    def select(self, rule, opt):
+        """选中一个选项并传播；矛盾时不改变状态并抛出 ResolveError"""
+        return self.assign(option_ref(rule, opt), True)
+
+    def finish_rule(self, rule):
+        """规则已回答：其中未选中的选项全部排除"""
+        for opt in rule.get('options', []):
+            ref = option_ref(rule, opt)
+            if ref not in self.value:
+                self.assign(ref, False)
+
+    def assign(self, ref, value, cause=None):
+        """设置 ref 的状态并做单元传播，返回本次新确定的选项列表"""
+        trail = []
+        # 第四项为 True 的是 requires 检查：只排除尚未决定的选项，不产生矛盾
+        queue = [(ref, value, cause, False)]
+        try:
+            while queue:
+                r, v, c, check = queue.pop()
+                current = self.value.get(r)
+                if current is not None:
+                    if current != v and not check:
+                        raise ResolveError(self._explain(r, v, c))
+                    continue
+                self.value[r] = v
+                self.reason[r] = c
+                trail.append(r)
+                if v:
+                    queue.extend((t, True, r, False) for t in self.implies.get(r, ()))
+                    queue.extend((t, False, r, False) for t in self.conflicts.get(r, ()))
+                else:
+                    queue.extend((s, False, r, False) for s in self.implied_by.get(r, ()))
+                    queue.extend((s, False, r, True) for s in self.required_by.get(r, ()))
+        except ResolveError:
+            for r in trail:
+                del self.value[r]
+                del self.reason[r]
+            raise
+        return trail
+
+    def _explain(self, ref, value, cause):
+        state = 'selected' if self.value[ref] else 'excluded'
+        wanted = 'select' if value else 'exclude'
+        held_by = self.reason.get(ref) or 'an earlier answer'
+        return f"cannot {wanted} {ref} (needed by {cause or 'this answer'}): already {state} by {held_by}"
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+feature_graph.py - Compact integer-indexed dependency graph for feature lists.
+
+Feature ids are interned to dense integers once, and edges are stored in
+array-backed CSR (compressed sparse row) form in both directions:
+
+  dependency -> dependents    (forward, used for ordering and depth)
+  dependent  -> dependencies  (reverse, used for ancestry queries)
+
+The graph is shared by every command in validate-and-generate.py, so a
+summary run builds it exactly once.
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import collections
+from array import array
+
+# Typecode for index arrays; "l" is at least 32 bits on every platform.
+_INDEX_TYPE = "l"
+
+
+def _csr(n, sources, targets):
+    """Return ``(offsets, columns)`` grouping *targets* by *sources*.
+
+    Edge order inside each row follows insertion order (stable counting
+    sort), so iteration order is deterministic.
+    """
+    offsets = array(_INDEX_TYPE, [0]) * (n + 1)
+    for s in sources:
+        offsets[s + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    cursor = array(_INDEX_TYPE, offsets[:n])
+    columns = array(_INDEX_TYPE, [0]) * len(targets)
+    for s, t in zip(sources, targets):
+        columns[cursor[s]] = t
+        cursor[s] += 1
+    return offsets, columns
+
+
+class FeatureGraph(object):
+    """Dependency graph over feature ids backed by integer CSR arrays.
+
+    Duplicate dependency entries are kept as parallel edges and
+    dependencies on unknown ids are dropped, matching the semantics the
+    validator has always used for cycle detection and depth.
+    """
+
+    def __init__(self, ids, sources, targets):
+        self.ids = ids
+        self.index = {fid: i for i, fid in enumerate(ids)}
+        n = len(ids)
+        self._out_offsets, self._out = _csr(n, sources, targets)
+        self._in_offsets, self._in = _csr(n, targets, sources)
+        self._order = None
+        self._depth = None
+
+    @classmethod
+    def from_features(cls, features):
+        """Build a graph from feature dicts with ``id`` and ``dependencies``."""
+        index = {}
+        ids = []
+        for feat in features:
+            fid = feat["id"]
+            if fid not in index:
+                index[fid] = len(ids)
+                ids.append(fid)
+        sources = array(_INDEX_TYPE)
+        targets = array(_INDEX_TYPE)
+        for feat in features:
+            target = index[feat["id"]]
+            for dep in feat.get("dependencies", []):
+                source = index.get(dep)
+                if source is not None:
+                    sources.append(source)
+                    targets.append(target)
+        return cls(ids, sources, targets)
+
+    # ------------------------------------------------------------------
+    # Structure
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def edge_count(self):
+        return len(self._out)
+
+    def dependents(self, i):
+        """Return the indices that depend on node *i*."""
+        return self._out[self._out_offsets[i]:self._out_offsets[i + 1]]
+
+    def dependencies(self, i):
+        """Return the indices node *i* depends on."""
+        return self._in[self._in_offsets[i]:self._in_offsets[i + 1]]
+
+    def in_degree(self, i):
+        return self._in_offsets[i + 1] - self._in_offsets[i]
+
+    # ------------------------------------------------------------------
+    # Ordering and depth
+    # ------------------------------------------------------------------
+
+    def _analyse(self):
+        if self._order is None:
+            self._order, self._depth = self._kahn(range(len(self.ids)), None)
+        return self._order, self._depth
+
+    def _kahn(self, nodes, depth):
+        """Run Kahn's algorithm restricted to *nodes*.
+
+        *depth* holds known depths for nodes outside *nodes* (or None when
+        *nodes* is the whole graph).  Returns ``(order, depth)`` where
+        *order* lists the nodes of *nodes* that are not on or behind a
+        cycle.
+        """
+        out_offsets, out = self._out_offsets, self._out
+        in_offsets, inc = self._in_offsets, self._in
+        if depth is None:
+            depth = array(_INDEX_TYPE, [0]) * len(self.ids)
+            member = None
+        else:
+            member = set(nodes)
+
+        remaining = {}
+        queue = collections.deque()
+        for i in nodes:
+            count = 0
+            seed = 0
+            for k in range(in_offsets[i], in_offsets[i + 1]):
+                dep = inc[k]
+                if member is None or dep in member:
+                    count += 1
+                elif depth[dep] + 1 > seed:
+                    seed = depth[dep] + 1
+            depth[i] = seed
+            if count:
+                remaining[i] = count
+            else:
+                queue.append(i)
+
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            next_depth = depth[node] + 1
+            for k in range(out_offsets[node], out_offsets[node + 1]):
+                child = out[k]
+                if member is not None and child not in member:
+                    continue
+                if next_depth > depth[child]:
+                    depth[child] = next_depth
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    queue.append(child)
+        return order, depth
+
+    def topological_order(self):
+        """Return ids in dependency order (nodes on or behind cycles omitted)."""
+        order, _ = self._analyse()
+        return [self.ids[i] for i in order]
+
+    @property
+    def has_cycles(self):
+        order, _ = self._analyse()
+        return len(order) != len(self.ids)
+
+    def depths(self):
+        """Return ``{id: longest dependency chain length}``."""
+        _, depth = self._analyse()
+        return {fid: depth[i] for i, fid in enumerate(self.ids)}
+
+    @property
+    def max_depth(self):
+        """Longest path in the DAG (0 for a single node or an empty graph)."""
+        _, depth = self._analyse()
+        return max(depth) if len(depth) else 0
+
+    def update_depths(self, changed, known):
+        """Recompute depth only for *changed* ids and everything downstream.
+
+        *known* maps ids to depths from a previous acyclic analysis of a
+        graph whose unchanged nodes had the same dependencies.  Returns
+        ``(has_cycles, depths)`` with *depths* as ``{id: depth}``.  A cycle
+        can only appear among the affected nodes, because the cached part
+        of the graph was acyclic.
+        """
+        index = self.index
+        affected = set(index[fid] for fid in changed)
+        stack = list(affected)
+        while stack:
+            node = stack.pop()
+            for child in self.dependents(node):
+                if child not in affected:
+                    affected.add(child)
+                    stack.append(child)
+
+        depth = array(_INDEX_TYPE, [0]) * len(self.ids)
+        for i, fid in enumerate(self.ids):
+            if i not in affected:
+                depth[i] = known[fid]
+        order, depth = self._kahn(sorted(affected), depth)
+        if len(order) != len(affected):
+            return True, None
+        return False, {fid: depth[i] for i, fid in enumerate(self.ids)}
+
+    # ------------------------------------------------------------------
+    # Cycles and reachability
+    # ------------------------------------------------------------------
+
+    def cycle_members(self):
+        """Return the sorted ids that lie on at least one dependency cycle.
+
+        Nodes that are merely downstream of a cycle are not included.
+        Uses an iterative Tarjan SCC pass over the nodes Kahn could not
+        order.
+        """
+        order, _ = self._analyse()
+        if len(order) == len(self.ids):
+            return []
+        ordered = set(order)
+        candidates = [i for i in range(len(self.ids)) if i not in ordered]
+
+        index_of = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        members = []
+        counter = 0
+        for root in candidates:
+            if root in index_of:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, pos = work.pop()
+                if pos == 0:
+                    index_of[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                children = self.dependents(node)
+                descended = False
+                while pos < len(children):
+                    child = children[pos]
+                    pos += 1
+                    if child in ordered:
+                        continue
+                    if child not in index_of:
+                        work.append((node, pos))
+                        work.append((child, 0))
+                        descended = True
+                        break
+                    if child in on_stack and index_of[child] < low[node]:
+                        low[node] = index_of[child]
+                if descended:
+                    continue
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.dependents(node):
+                        members.extend(component)
+        return sorted(self.ids[i] for i in members)
+
+    def reachable(self, fid, reverse=False):
+        """Return the set of ids reachable from *fid*.
+
+        Follows dependency -> dependent edges (everything that transitively
+        depends on *fid*), or dependent -> dependency edges when *reverse*
+        is true (everything *fid* transitively depends on).  *fid* itself
+        is only included if it lies on a cycle.
+        """
+        step = self.dependencies if reverse else self.dependents
+        seen = set()
+        stack = [self.index[fid]]
+        while stack:
+            node = stack.pop()
+            for child in step(node):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return {self.ids[i] for i in seen}
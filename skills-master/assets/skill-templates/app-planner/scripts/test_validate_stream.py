@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Tests for the streaming feature-list reader of validate-and-generate.py.
+
+Run: python3 -m unittest test_validate_stream (from this directory)
+"""
+
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+_spec = importlib.util.spec_from_file_location(
+    "validate_and_generate", os.path.join(SCRIPT_DIR, "validate-and-generate.py"))
+vg = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(vg)
+
+
+def _feature():
+    return {
+        "id": "F-001", "title": "Login", "description": "User login",
+        "priority": 1, "dependencies": [], "acceptance_criteria": ["works"],
+        "status": "pending",
+    }
+
+
+class NumberAtChunkBoundaryTest(unittest.TestCase):
+
+    def test_numbers_split_at_every_offset(self):
+        text = '[1.5, -2e-3, 12345, 0.25E+2, -0, true, 7]'
+        expected = json.loads(text)
+        for chunk_size in range(1, len(text) + 1):
+            reader = vg._JsonStreamReader(io.StringIO(text), chunk_size=chunk_size)
+            reader.expect("[")
+            values = [reader.value()]
+            while reader.expect(",]") == ",":
+                values.append(reader.value())
+            self.assertEqual(values, expected, "chunk_size={}".format(chunk_size))
+
+    def test_top_level_number_across_stream_chunk(self):
+        prefix = '{"$schema": "%s", "app_name": "demo", "notes": "' % vg.SCHEMA_VERSION
+        # "1." ends the first chunk, ".5"'s digit starts the second.
+        padding = "x" * (vg.STREAM_CHUNK_SIZE - 2 - len(prefix) - len('", "plan_version": '))
+        text = prefix + padding + '", "plan_version": 1.5, "features": [' \
+            + json.dumps(_feature()) + "]}"
+        self.assertEqual(text.index("1.5"), vg.STREAM_CHUNK_SIZE - 2)
+
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "feature-list.json")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            with open(path, "r", encoding="utf-8") as fh:
+                pairs = dict((k, v) for k, v in vg.iter_feature_list_stream(fh)
+                             if k != "features[]")
+            self.assertEqual(pairs["plan_version"], 1.5)
+            events = list(vg.iter_stream_validation(path))
+            self.assertTrue(events[-1]["valid"], events)
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_bare_number_elements_across_chunks(self):
+        text = '{"features": [' + ", ".join(["-1.25e+10"] * 50) + "]}"
+        for chunk_size in (1, 2, 3, 5, 7):
+            values = [v for k, v in vg.iter_feature_list_stream(io.StringIO(text), chunk_size)
+                      if k == "features[]"]
+            self.assertEqual(values, [-1.25e10] * 50, "chunk_size={}".format(chunk_size))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,8 @@ Commands:
 
 Usage:
   python3 validate-and-generate.py validate --input feature-list.json [--output validated.json]
+                                            [--jobs N] [--no-cache]
+  python3 validate-and-generate.py validate --input feature-list.json --stream [--fail-fast]
   python3 validate-and-generate.py template --output feature-list.json
   python3 validate-and-generate.py summary --input feature-list.json [--format markdown|json]
 
@@ -18,12 +20,15 @@ Python 3.6+ required. No external dependencies.
 
 import argparse
 import collections
+import hashlib
 import json
 import os
 import re
 import sys
 from datetime import datetime, timezone
 
+from feature_graph import FeatureGraph
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -89,62 +94,323 @@ def _write_json(path, data):
 # ---------------------------------------------------------------------------
 
 
-def _detect_cycles(features):
+def _detect_cycles(features, graph=None):
     """Return (has_cycles: bool, max_depth: int) using Kahn's topological sort.
 
-    *features* is the list of feature dicts.  We build a graph from the
-    ``dependencies`` field and run Kahn's algorithm.
+    *features* is the list of feature dicts.  The graph is built from the
+    ``dependencies`` field unless a prebuilt :class:`FeatureGraph` is
+    passed as *graph*.
 
     Returns a tuple ``(has_cycles, max_depth)`` where *max_depth* is the
     longest path in the DAG (0 if there are cycles or a single node).
     """
-    id_set = {f["id"] for f in features}
-    # Build adjacency list and in-degree map.
-    adj = {fid: [] for fid in id_set}       # dependency -> [dependent]
-    in_degree = {fid: 0 for fid in id_set}
-
-    for feat in features:
-        fid = feat["id"]
-        for dep in feat.get("dependencies", []):
-            if dep in id_set:
-                adj[dep].append(fid)
-                in_degree[fid] += 1
-
-    # Kahn's algorithm
-    queue = collections.deque()
-    for fid, deg in in_degree.items():
-        if deg == 0:
-            queue.append(fid)
-
-    sorted_order = []
-    # Track depth for each node to compute max dependency depth.
-    depth = {fid: 0 for fid in id_set}
-
-    while queue:
-        node = queue.popleft()
-        sorted_order.append(node)
-        for neighbour in adj[node]:
-            in_degree[neighbour] -= 1
-            new_depth = depth[node] + 1
-            if new_depth > depth[neighbour]:
-                depth[neighbour] = new_depth
-            if in_degree[neighbour] == 0:
-                queue.append(neighbour)
-
-    has_cycles = len(sorted_order) != len(id_set)
-    max_depth = max(depth.values()) if depth else 0
-    return has_cycles, max_depth
+    if graph is None:
+        graph = FeatureGraph.from_features(features)
+    return graph.has_cycles, graph.max_depth
 
 
 # ---------------------------------------------------------------------------
 # Validation
 # ---------------------------------------------------------------------------
 
+# Bump whenever the per-feature checks change so stale cache entries are
+# discarded instead of replayed.
+VALIDATION_ENGINE_VERSION = 1
+
+CACHE_SUFFIX = ".validate-cache.json"
+
+REQUIRED_FEATURE_KEYS = {
+    "id", "title", "description", "priority",
+    "dependencies", "acceptance_criteria", "status",
+}
+
+
+def _empty_stats():
+    """Return the stats block used when no features could be validated."""
+    return {
+        "total_features": 0,
+        "total_sub_features": 0,
+        "complexity_distribution": {},
+        "max_dependency_depth": 0,
+        "has_cycles": False,
+    }
+
+
+def _check_feature(feat):
+    """Run every check that depends only on a single feature object.
+
+    The result is position independent so it can be cached by content hash
+    and replayed for any index.  ``entries`` is an ordered list of
+    ``[kind, suffix, value]`` items where *suffix* is appended to the
+    ``features[N]`` label:
+
+    - ``["E", suffix, None]``  error message
+    - ``["W", suffix, None]``  warning message
+    - ``["D", suffix, id]``    duplicate-id checkpoint for *id*
+
+    ``priority`` is the valid priority (or None), ``complexity`` the valid
+    complexity (or None) and ``sub_count`` the number of object sub-features.
+    """
+    entries = []
+    result = {
+        "entries": entries,
+        "priority": None,
+        "complexity": None,
+        "sub_count": 0,
+    }
+
+    def error(suffix):
+        entries.append(["E", suffix, None])
+
+    def warning(suffix):
+        entries.append(["W", suffix, None])
+
+    # -- Required keys --
+    if not isinstance(feat, dict):
+        error(" is not an object")
+        return result
+
+    missing = REQUIRED_FEATURE_KEYS - set(feat.keys())
+    if missing:
+        error(" missing required keys: {}".format(", ".join(sorted(missing))))
+
+    # -- ID format & uniqueness --
+    fid = feat.get("id", "")
+    if not FEATURE_ID_RE.match(str(fid)):
+        error(": id '{}' does not match pattern F-NNN or F-NNN-X".format(fid))
+    entries.append(["D", "", fid])
+
+    # -- Title / description --
+    for key in ("title", "description"):
+        val = feat.get(key)
+        if not isinstance(val, str) or not val.strip():
+            error(": {} must be a non-empty string".format(key))
+
+    # -- Priority --
+    priority = feat.get("priority")
+    if isinstance(priority, int) and priority > 0:
+        result["priority"] = priority
+    else:
+        error(": priority must be a positive integer, got {}".format(repr(priority)))
+
+    # -- Dependencies (list of strings) --
+    deps = feat.get("dependencies")
+    if not isinstance(deps, list):
+        error(": dependencies must be an array")
+
+    # -- Acceptance criteria --
+    criteria = feat.get("acceptance_criteria")
+    if isinstance(criteria, list):
+        if len(criteria) < 1:
+            error(": must have at least 1 acceptance criterion")
+        elif len(criteria) < 3:
+            warning(": only {} acceptance criteria (recommend at least 3)".format(
+                len(criteria)
+            ))
+    else:
+        error(": acceptance_criteria must be an array")
+
+    # -- Status --
+    status = feat.get("status")
+    if status not in VALID_STATUSES:
+        error(": status '{}' invalid, must be one of: {}".format(
+            status, ", ".join(sorted(VALID_STATUSES))
+        ))
+    if status and status != "pending":
+        warning(": status is '{}' (expected 'pending' for new plans)".format(status))
+
+    # -- Complexity (optional but validated if present) --
+    complexity = feat.get("estimated_complexity")
+    if complexity is not None:
+        if complexity not in VALID_COMPLEXITIES:
+            error(": estimated_complexity '{}' invalid, must be one of: {}".format(
+                complexity, ", ".join(sorted(VALID_COMPLEXITIES))
+            ))
+        else:
+            result["complexity"] = complexity
+
+    # -- Granularity (optional but validated if present) --
+    granularity = feat.get("session_granularity")
+    if granularity is not None:
+        if granularity not in VALID_GRANULARITIES:
+            error(": session_granularity '{}' invalid, must be one of: {}".format(
+                granularity, ", ".join(sorted(VALID_GRANULARITIES))
+            ))
+        if granularity == "auto":
+            subs = feat.get("sub_features")
+            if not isinstance(subs, list) or len(subs) == 0:
+                warning(": granularity is 'auto' but no sub_features defined")
+
+    # -- Sub-features --
+    subs = feat.get("sub_features")
+    if isinstance(subs, list):
+        for sidx, sub in enumerate(subs):
+            sub_label = "->sub_features[{}]".format(sidx)
+            if not isinstance(sub, dict):
+                error("{} is not an object".format(sub_label))
+                continue
+
+            sub_missing = {"id", "title", "description"} - set(sub.keys())
+            if sub_missing:
+                error("{} missing required keys: {}".format(
+                    sub_label, ", ".join(sorted(sub_missing))
+                ))
+
+            sub_id = sub.get("id", "")
+            if not SUB_FEATURE_ID_RE.match(str(sub_id)):
+                error("{}: id '{}' must be F-NNN-X format".format(sub_label, sub_id))
+
+            # Sub-feature ID should share parent prefix
+            parent_prefix = str(fid).rstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ").rstrip("-")
+            sub_prefix = str(sub_id)[:5]  # e.g. "F-001"
+            if parent_prefix and sub_prefix != parent_prefix:
+                warning("{}: sub-feature '{}' does not share parent prefix '{}'".format(
+                    sub_label, sub_id, parent_prefix
+                ))
+
+            entries.append(["D", sub_label, sub_id])
+            result["sub_count"] += 1
+
+    return result
+
+
+def _feature_hash(feat):
+    """Return a stable content hash for a feature object."""
+    payload = json.dumps(
+        feat, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def default_cache_path(input_path):
+    """Return the cache file path stored next to *input_path*."""
+    directory, name = os.path.split(os.path.abspath(input_path))
+    return os.path.join(directory, "." + name + CACHE_SUFFIX)
+
+
+def _load_cache(path):
+    """Load a validation cache, returning an empty one if missing or stale."""
+    empty = {"version": VALIDATION_ENGINE_VERSION, "features": {}, "graph": None}
+    if not path or not os.path.isfile(path):
+        return empty
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        return empty
+    if not isinstance(cache, dict) or cache.get("version") != VALIDATION_ENGINE_VERSION:
+        return empty
+    if not isinstance(cache.get("features"), dict):
+        return empty
+    return cache
+
+
+def _save_cache(path, cache):
+    """Atomically write *cache* to *path*; failures are non-fatal."""
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        payload = json.dumps(cache, ensure_ascii=False, separators=(",", ":"))
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(payload)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        _warn("Could not write validation cache {}: {}".format(path, exc))
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _check_features(features, cache, jobs):
+    """Return per-feature check results, reusing *cache* where possible.
+
+    Cache misses are fanned out over a process pool when *jobs* > 1.
+    Updates ``cache["features"]`` to hold exactly the current features.
+    """
+    hashes = [_feature_hash(feat) for feat in features]
+    cached = cache.get("features", {})
+
+    results = {}
+    misses = []
+    for digest, feat in zip(hashes, features):
+        if digest in results:
+            continue
+        if digest in cached:
+            results[digest] = cached[digest]
+        else:
+            results[digest] = None
+            misses.append((digest, feat))
+
+    if misses:
+        miss_feats = [feat for _, feat in misses]
+        if jobs > 1 and len(misses) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunksize = max(1, len(misses) // (jobs * 4))
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                checked = list(pool.map(_check_feature, miss_feats, chunksize=chunksize))
+        else:
+            checked = [_check_feature(feat) for feat in miss_feats]
+        for (digest, _), res in zip(misses, checked):
+            results[digest] = res
+
+    if misses or len(results) != len(cached):
+        cache["dirty"] = True
+    cache["features"] = results
+    return [results[digest] for digest in hashes]
+
+
+def _detect_cycles_incremental(graph, cache):
+    """Return ``(has_cycles, max_depth)`` re-walking only the affected closure.
+
+    The previous acyclic graph (edges and per-node depth) is kept in
+    ``cache["graph"]``.  Nodes whose effective dependency list changed are
+    re-seeded, and only their dependents are re-sorted; every other node
+    keeps its cached depth.  Cyclic or non-string-id graphs fall back to a
+    full pass so the stats stay identical.
+    """
+    previous = cache.get("graph")
+    cache["graph"] = None
+    ids = graph.ids
+    if not all(isinstance(fid, str) for fid in ids):
+        cache["dirty"] = True
+        return graph.has_cycles, graph.max_depth
+
+    edges = {
+        fid: [ids[j] for j in graph.dependencies(i)]
+        for i, fid in enumerate(ids)
+    }
+    if isinstance(previous, dict) and isinstance(previous.get("depth"), dict):
+        prev_edges = previous.get("edges") or {}
+        prev_depth = previous["depth"]
+        changed = [
+            fid for fid in ids
+            if prev_edges.get(fid) != edges[fid] or fid not in prev_depth
+        ]
+    else:
+        prev_depth = {}
+        changed = list(ids)
+
+    if changed or len(prev_depth) != len(edges):
+        cache["dirty"] = True
+    has_cycles, depth = graph.update_depths(changed, prev_depth)
+    if has_cycles:
+        return graph.has_cycles, graph.max_depth
+
+    cache["graph"] = {"edges": edges, "depth": depth}
+    return False, max(depth.values()) if depth else 0
+
 
-def validate_feature_list(data):
+def validate_feature_list(data, cache_path=None, jobs=1):
     """Validate a parsed feature-list data structure.
 
     Returns a dict with keys ``valid``, ``errors``, ``warnings``, ``stats``.
+
+    When *cache_path* is given, per-feature results and the dependency
+    graph are cached there and only changed features (plus the dependency
+    closure affected by them) are re-validated.  *jobs* > 1 runs per-feature
+    checks for cache misses in a process pool.  The result is identical
+    either way.
     """
     errors = []
     warnings = []
@@ -170,162 +436,36 @@ def validate_feature_list(data):
             "valid": False,
             "errors": errors,
             "warnings": warnings,
-            "stats": {
-                "total_features": 0,
-                "total_sub_features": 0,
-                "complexity_distribution": {},
-                "max_dependency_depth": 0,
-                "has_cycles": False,
-            },
+            "stats": _empty_stats(),
         }
 
+    cache = _load_cache(cache_path)
+
     # ------------------------------------------------------------------
     # 2. Per-feature validation
     # ------------------------------------------------------------------
-    required_keys = {
-        "id", "title", "description", "priority",
-        "dependencies", "acceptance_criteria", "status",
-    }
-
     seen_ids = set()
     priorities = []
     complexity_dist = {"low": 0, "medium": 0, "high": 0}
     total_sub_features = 0
 
-    for idx, feat in enumerate(features):
+    checked = _check_features(features, cache, jobs)
+    for idx, res in enumerate(checked):
         label = "features[{}]".format(idx)
-
-        # -- Required keys --
-        if not isinstance(feat, dict):
-            errors.append("{} is not an object".format(label))
-            continue
-
-        missing = required_keys - set(feat.keys())
-        if missing:
-            errors.append("{} missing required keys: {}".format(
-                label, ", ".join(sorted(missing))
-            ))
-
-        # -- ID format & uniqueness --
-        fid = feat.get("id", "")
-        if not FEATURE_ID_RE.match(str(fid)):
-            errors.append(
-                "{}: id '{}' does not match pattern F-NNN or F-NNN-X".format(label, fid)
-            )
-        if fid in seen_ids:
-            errors.append("{}: duplicate id '{}'".format(label, fid))
-        seen_ids.add(fid)
-
-        # -- Title / description --
-        for key in ("title", "description"):
-            val = feat.get(key)
-            if not isinstance(val, str) or not val.strip():
-                errors.append("{}: {} must be a non-empty string".format(label, key))
-
-        # -- Priority --
-        priority = feat.get("priority")
-        if isinstance(priority, int) and priority > 0:
-            priorities.append(priority)
-        else:
-            errors.append("{}: priority must be a positive integer, got {}".format(
-                label, repr(priority)
-            ))
-
-        # -- Dependencies (list of strings) --
-        deps = feat.get("dependencies")
-        if not isinstance(deps, list):
-            errors.append("{}: dependencies must be an array".format(label))
-
-        # -- Acceptance criteria --
-        criteria = feat.get("acceptance_criteria")
-        if isinstance(criteria, list):
-            if len(criteria) < 1:
-                errors.append("{}: must have at least 1 acceptance criterion".format(label))
-            elif len(criteria) < 3:
-                warnings.append(
-                    "{}: only {} acceptance criteria (recommend at least 3)".format(
-                        label, len(criteria)
-                    )
-                )
-        else:
-            errors.append("{}: acceptance_criteria must be an array".format(label))
-
-        # -- Status --
-        status = feat.get("status")
-        if status not in VALID_STATUSES:
-            errors.append(
-                "{}: status '{}' invalid, must be one of: {}".format(
-                    label, status, ", ".join(sorted(VALID_STATUSES))
-                )
-            )
-        if status and status != "pending":
-            warnings.append(
-                "{}: status is '{}' (expected 'pending' for new plans)".format(label, status)
-            )
-
-        # -- Complexity (optional but validated if present) --
-        complexity = feat.get("estimated_complexity")
-        if complexity is not None:
-            if complexity not in VALID_COMPLEXITIES:
-                errors.append(
-                    "{}: estimated_complexity '{}' invalid, must be one of: {}".format(
-                        label, complexity, ", ".join(sorted(VALID_COMPLEXITIES))
-                    )
-                )
+        for kind, suffix, value in res["entries"]:
+            if kind == "E":
+                errors.append(label + suffix)
+            elif kind == "W":
+                warnings.append(label + suffix)
             else:
-                complexity_dist[complexity] += 1
-
-        # -- Granularity (optional but validated if present) --
-        granularity = feat.get("session_granularity")
-        if granularity is not None:
-            if granularity not in VALID_GRANULARITIES:
-                errors.append(
-                    "{}: session_granularity '{}' invalid, must be one of: {}".format(
-                        label, granularity, ", ".join(sorted(VALID_GRANULARITIES))
-                    )
-                )
-            if granularity == "auto":
-                subs = feat.get("sub_features")
-                if not isinstance(subs, list) or len(subs) == 0:
-                    warnings.append(
-                        "{}: granularity is 'auto' but no sub_features defined".format(label)
-                    )
-
-        # -- Sub-features --
-        subs = feat.get("sub_features")
-        if isinstance(subs, list):
-            for sidx, sub in enumerate(subs):
-                sub_label = "{}->sub_features[{}]".format(label, sidx)
-                if not isinstance(sub, dict):
-                    errors.append("{} is not an object".format(sub_label))
-                    continue
-
-                sub_missing = {"id", "title", "description"} - set(sub.keys())
-                if sub_missing:
-                    errors.append("{} missing required keys: {}".format(
-                        sub_label, ", ".join(sorted(sub_missing))
-                    ))
-
-                sub_id = sub.get("id", "")
-                if not SUB_FEATURE_ID_RE.match(str(sub_id)):
-                    errors.append(
-                        "{}: id '{}' must be F-NNN-X format".format(sub_label, sub_id)
-                    )
-
-                # Sub-feature ID should share parent prefix
-                parent_prefix = str(fid).rstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ").rstrip("-")
-                sub_prefix = str(sub_id)[:5]  # e.g. "F-001"
-                if parent_prefix and sub_prefix != parent_prefix:
-                    warnings.append(
-                        "{}: sub-feature '{}' does not share parent prefix '{}'".format(
-                            sub_label, sub_id, parent_prefix
-                        )
-                    )
-
-                if sub_id in seen_ids:
-                    errors.append("{}: duplicate id '{}'".format(sub_label, sub_id))
-                seen_ids.add(sub_id)
-                total_sub_features += 1
+                if value in seen_ids:
+                    errors.append("{}{}: duplicate id '{}'".format(label, suffix, value))
+                seen_ids.add(value)
+        if res["priority"] is not None:
+            priorities.append(res["priority"])
+        if res["complexity"] is not None:
+            complexity_dist[res["complexity"]] += 1
+        total_sub_features += res["sub_count"]
 
     # -- Priority uniqueness --
     if len(priorities) != len(set(priorities)):
@@ -353,7 +493,13 @@ def validate_feature_list(data):
                     )
 
     # -- Cycle detection --
-    has_cycles, max_depth = _detect_cycles(features)
+    graph = FeatureGraph.from_features(features)
+    if cache_path:
+        has_cycles, max_depth = _detect_cycles_incremental(graph, cache)
+        if cache.pop("dirty", False):
+            _save_cache(cache_path, cache)
+    else:
+        has_cycles, max_depth = _detect_cycles(features, graph)
     if has_cycles:
         errors.append("Dependency graph contains cycles (not a valid DAG)")
 
@@ -376,6 +522,315 @@ def validate_feature_list(data):
     }
 
 
+# ---------------------------------------------------------------------------
+# Streaming validation
+# ---------------------------------------------------------------------------
+
+STREAM_CHUNK_SIZE = 1 << 20
+# Largest single key or features[] element the stream reader will buffer.
+STREAM_MAX_VALUE_SIZE = 64 << 20
+_WHITESPACE = " \t\n\r"
+# A decode error this close to the end of the buffer may be a value cut
+# off by the chunk boundary (e.g. "tru", "\u00", "-Infinit").
+_TRUNCATION_MARGIN = 8
+# Bytes that must follow a decoded number before it is accepted, so the
+# rest of a number split by the chunk boundary (".5", "e10") is not lost.
+_NUMBER_LOOKAHEAD = 32
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _JsonStreamReader(object):
+    """Incremental JSON tokenizer over a buffered text file.
+
+    Only the structural characters of the top-level object and of the
+    ``features`` array are tokenized by hand; every key and element is
+    decoded with :meth:`json.JSONDecoder.raw_decode` as soon as it is
+    complete in the buffer, so memory stays bounded by the largest single
+    value rather than the whole document.
+    """
+
+    def __init__(self, fh, chunk_size=STREAM_CHUNK_SIZE, max_value_size=STREAM_MAX_VALUE_SIZE):
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._max_value_size = max_value_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_size):
+        """Append at least *min_size* characters to the buffer (unless EOF)."""
+        if self._pos > self._chunk_size:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        chunk = self._fh.read(max(min_size, self._chunk_size))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            buf = self._buf
+            pos = self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, chars):
+        """Consume and return the next character, which must be in *chars*."""
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError("expected {} at offset {}, got {}".format(
+                " or ".join(repr(c) for c in chars), self.offset, repr(ch) if ch else "EOF"
+            ))
+        self._pos += 1
+        return ch
+
+    def _truncated(self, exc):
+        """True if decode error *exc* may go away once more input is read."""
+        pos = getattr(exc, "pos", None)
+        if pos is None or pos >= len(self._buf) - _TRUNCATION_MARGIN:
+            return True
+        # Reported at the opening quote; strict decoding rejects a raw
+        # newline inside a string, so a malformed one fails at the next line.
+        return exc.msg.startswith("Unterminated string")
+
+    def value(self):
+        """Decode and return the next complete JSON value.
+
+        A malformed value is reported as soon as the decode error lies
+        inside the buffered input, instead of reading on to EOF.
+        """
+        self.peek()
+        while True:
+            try:
+                val, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError as exc:
+                if self._eof or not self._truncated(exc):
+                    raise
+                if len(self._buf) - self._pos > self._max_value_size:
+                    raise ValueError("value at offset {} exceeds {} bytes".format(
+                        self._pos, self._max_value_size
+                    ))
+                # Incomplete value: grow the window geometrically so very
+                # large values are not re-scanned quadratically.
+                if self._fill(len(self._buf) - self._pos + 1):
+                    continue
+                raise
+            # A number near the end of the buffer may still be truncated:
+            # "1" decodes from "1.5", "-1e" or "12" cut at the chunk boundary.
+            # _fill() may compact the buffer, so decode again either way.
+            if (not self._eof and len(self._buf) - end < _NUMBER_LOOKAHEAD
+                    and (end == len(self._buf) or _is_number(val))):
+                self._fill(self._chunk_size)
+                continue
+            self._pos = end
+            return val
+
+    @property
+    def offset(self):
+        return self._pos
+
+
+def iter_feature_list_stream(fh, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield ``(key, value)`` pairs of a feature-list document from *fh*.
+
+    Elements of the top-level ``features`` array are yielded one at a time
+    as ``("features[]", element)`` between a ``("features[", None)`` and a
+    ``("features]", count)`` marker.  Every other top-level key is decoded
+    whole and yielded as ``(key, value)``.
+    """
+    reader = _JsonStreamReader(fh, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError("expected object key at offset {}".format(reader.offset))
+        reader.expect(":")
+        if key == "features" and reader.peek() == "[":
+            reader.expect("[")
+            yield "features[", None
+            count = 0
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield "features[]", reader.value()
+                    count += 1
+                    if reader.expect(",]") == "]":
+                        break
+            yield "features]", count
+        else:
+            yield key, reader.value()
+        if reader.expect(",}") == "}":
+            break
+    if reader.peek():
+        raise ValueError("extra data at offset {}".format(reader.offset))
+
+
+def iter_stream_validation(path):
+    """Validate the feature list at *path* while streaming it.
+
+    Yields event dicts as soon as they are known:
+
+    - ``{"type": "error", "message": ...}`` (``"fatal": true`` when the file
+      cannot be read or parsed)
+    - ``{"type": "warning", "message": ...}``
+    - a final ``{"type": "result", "valid": ..., "stats": ...}``
+
+    Per-feature checks run on each element as it is parsed; duplicate ids,
+    dependency existence and cycle detection run at the end on a compact
+    id/dependency table instead of the full feature documents.
+    """
+    errors = [0]
+    warnings = [0]
+
+    def error(message, fatal=False):
+        errors[0] += 1
+        event = {"type": "error", "message": message}
+        if fatal:
+            event["fatal"] = True
+        return event
+
+    def warning(message):
+        warnings[0] += 1
+        return {"type": "warning", "message": message}
+
+    def result(stats):
+        return {
+            "type": "result",
+            "valid": errors[0] == 0,
+            "error_count": errors[0],
+            "warning_count": warnings[0],
+            "stats": stats,
+        }
+
+    if not os.path.isfile(path):
+        yield error("File not found: {}".format(path), fatal=True)
+        yield result(_empty_stats())
+        return
+
+    seen_keys = set()
+    seen_ids = set()
+    priorities = []
+    complexity_dist = {"low": 0, "medium": 0, "high": 0}
+    total_sub_features = 0
+    # Compact table: one (id, dependencies) stub per feature.
+    table = []
+    features_ok = False
+
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            for key, value in iter_feature_list_stream(fh):
+                if key == "features[]":
+                    idx = len(table)
+                    label = "features[{}]".format(idx)
+                    res = _check_feature(value)
+                    for kind, suffix, dup_id in res["entries"]:
+                        if kind == "E":
+                            yield error(label + suffix)
+                        elif kind == "W":
+                            yield warning(label + suffix)
+                        else:
+                            if dup_id in seen_ids:
+                                yield error("{}{}: duplicate id '{}'".format(
+                                    label, suffix, dup_id
+                                ))
+                            seen_ids.add(dup_id)
+                    if res["priority"] is not None:
+                        priorities.append(res["priority"])
+                    if res["complexity"] is not None:
+                        complexity_dist[res["complexity"]] += 1
+                    total_sub_features += res["sub_count"]
+                    if isinstance(value, dict):
+                        deps = value.get("dependencies", [])
+                        table.append({
+                            "id": value.get("id"),
+                            "dependencies": deps if isinstance(deps, list) else [],
+                        })
+                    else:
+                        table.append({"id": None, "dependencies": []})
+                    continue
+
+                if key == "features[":
+                    seen_keys.add("features")
+                elif key == "features]":
+                    features_ok = value > 0
+                elif key == "$schema":
+                    seen_keys.add(key)
+                    if value != SCHEMA_VERSION:
+                        yield error("$schema must be '{}', got '{}'".format(
+                            SCHEMA_VERSION, value
+                        ))
+                elif key == "app_name":
+                    seen_keys.add(key)
+                    if not isinstance(value, str) or not value.strip():
+                        yield error("app_name must be a non-empty string")
+                elif key == "features":
+                    seen_keys.add(key)
+    except (OSError, UnicodeDecodeError) as exc:
+        yield error("Failed to read {}: {}".format(path, exc), fatal=True)
+        yield result(_empty_stats())
+        return
+    except ValueError as exc:
+        yield error("JSON parse error in {}: {}".format(path, exc), fatal=True)
+        yield result(_empty_stats())
+        return
+
+    if "$schema" not in seen_keys:
+        yield error("$schema must be '{}', got 'None'".format(SCHEMA_VERSION))
+    if "app_name" not in seen_keys:
+        yield error("app_name must be a non-empty string")
+    if not features_ok:
+        yield error("features must be a non-empty array")
+        yield result(_empty_stats())
+        return
+
+    # -- Priority uniqueness --
+    if len(priorities) != len(set(priorities)):
+        dup_prios = [
+            p for p, c in collections.Counter(priorities).items() if c > 1
+        ]
+        yield warning("Duplicate priorities found: {}".format(
+            ", ".join(str(p) for p in sorted(dup_prios))
+        ))
+
+    # -- Dependency existence --
+    all_ids = {row["id"] for row in table}
+    for idx, row in enumerate(table):
+        for dep in row["dependencies"]:
+            if dep not in all_ids:
+                yield error("features[{}]: dependency '{}' does not exist in feature list".format(
+                    idx, dep
+                ))
+
+    # -- Cycle detection --
+    has_cycles, max_depth = _detect_cycles(table, FeatureGraph.from_features(table))
+    if has_cycles:
+        yield error("Dependency graph contains cycles (not a valid DAG)")
+
+    yield result({
+        "total_features": len(table),
+        "total_sub_features": total_sub_features,
+        "complexity_distribution": complexity_dist,
+        "max_dependency_depth": max_depth,
+        "has_cycles": has_cycles,
+    })
+
+
 # ---------------------------------------------------------------------------
 # Template generation
 # ---------------------------------------------------------------------------
@@ -426,36 +881,46 @@ def generate_template():
 # ---------------------------------------------------------------------------
 
 
-def _build_dependency_graph_text(features):
+def _build_dependency_graph_text(features, graph=None):
     """Build a human-readable text representation of the dependency graph.
 
     Produces an arrow-chain format that shows all dependency paths,
     including convergent edges (where multiple paths lead to the same node).
+    Pass a prebuilt :class:`FeatureGraph` as *graph* to avoid rebuilding it.
 
     Returns a list of lines.
     """
+    if graph is None:
+        graph = FeatureGraph.from_features(features)
     all_ids = [f["id"] for f in features]
+    ids = graph.ids
+    index = graph.index
 
-    # Build adjacency: dependency -> list of dependents (forward edges)
-    dependents = {fid: [] for fid in all_ids}
-    has_parent = set()
-    for feat in features:
-        for dep in feat.get("dependencies", []):
-            if dep in dependents:
-                dependents[dep].append(feat["id"])
-                has_parent.add(feat["id"])
+    # Sorted, de-duplicated dependents per node, built on first use
+    sorted_dependents = {}
 
-    # Sort children for deterministic output
-    for fid in dependents:
-        dependents[fid] = sorted(set(dependents[fid]))
+    def _children(node):
+        children = sorted_dependents.get(node)
+        if children is None:
+            children = sorted(set(ids[j] for j in graph.dependents(index[node])))
+            sorted_dependents[node] = children
+        return children
 
     # Roots: features with no incoming dependencies
-    roots = [fid for fid in all_ids if fid not in has_parent]
+    roots = [fid for fid in all_ids if graph.in_degree(index[fid]) == 0]
     if not roots:
         return ["(cycle detected - no root nodes)"]
-    if not any(dependents[r] for r in all_ids):
+    if graph.edge_count == 0:
         # No dependencies at all
         return ["(no dependencies)"]
+    if graph.has_cycles:
+        # Arrow chains through a cycle reachable from a root never terminate
+        members = graph.cycle_members()
+        reached = set()
+        for root in set(roots):
+            reached |= graph.reachable(root)
+        if reached.intersection(members):
+            return ["(cycle detected: {})".format(", ".join(members))]
 
     result_lines = []
 
@@ -466,7 +931,7 @@ def _build_dependency_graph_text(features):
         *is_continuation*: True if this node is appended on the same line
                            as its parent (first child).
         """
-        children = dependents.get(node, [])
+        children = _children(node)
         if not children:
             return
 
@@ -519,8 +984,9 @@ def generate_summary_markdown(data):
     lines.append("")
 
     # Dependency graph
+    graph = FeatureGraph.from_features(features)
     lines.append("## Dependency Graph")
-    graph_lines = _build_dependency_graph_text(features)
+    graph_lines = _build_dependency_graph_text(features, graph)
     for gl in graph_lines:
         lines.append(gl)
     lines.append("")
@@ -536,7 +1002,7 @@ def generate_summary_markdown(data):
         if isinstance(subs, list):
             total_sub += len(subs)
 
-    _, max_depth = _detect_cycles(features)
+    has_cycles, max_depth = _detect_cycles(features, graph)
 
     lines.append("## Statistics")
     lines.append("- Total features: {}".format(len(features)))
@@ -546,6 +1012,8 @@ def generate_summary_markdown(data):
         complexity_dist["low"], complexity_dist["medium"], complexity_dist["high"]
     ))
     lines.append("- Max dependency depth: {}".format(max_depth))
+    if has_cycles:
+        lines.append("- Cycle members: {}".format(", ".join(graph.cycle_members())))
 
     return "\n".join(lines)
 
@@ -564,7 +1032,8 @@ def generate_summary_json(data):
         if isinstance(subs, list):
             total_sub += len(subs)
 
-    has_cycles, max_depth = _detect_cycles(features)
+    graph = FeatureGraph.from_features(features)
+    has_cycles, max_depth = _detect_cycles(features, graph)
 
     feature_summaries = []
     for feat in features:
@@ -588,6 +1057,7 @@ def generate_summary_json(data):
             "complexity_distribution": complexity_dist,
             "max_dependency_depth": max_depth,
             "has_cycles": has_cycles,
+            "cycle_members": graph.cycle_members(),
         },
     }
 
@@ -597,12 +1067,43 @@ def generate_summary_json(data):
 # ---------------------------------------------------------------------------
 
 
+def cmd_validate_stream(args):
+    """Handle the 'validate --stream' command: NDJSON events on stdout."""
+    if args.output:
+        _err("--output cannot be combined with --stream")
+        return 2
+
+    status = 0
+    for event in iter_stream_validation(args.input):
+        sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+        if event["type"] == "error":
+            if event.get("fatal"):
+                status = 2
+            elif args.fail_fast:
+                _err(event["message"])
+                return 1
+            else:
+                status = 1
+        elif event["type"] == "result":
+            if event["valid"]:
+                _info("Validation passed with {} warning(s)".format(event["warning_count"]))
+            else:
+                _err("Validation failed with {} error(s) and {} warning(s)".format(
+                    event["error_count"], event["warning_count"]
+                ))
+    return status
+
+
 def cmd_validate(args):
     """Handle the 'validate' command."""
     if not args.input:
         _err("--input is required for the validate command")
         return 2
 
+    if args.stream:
+        return cmd_validate_stream(args)
+
     data, load_err = _load_json(args.input)
     if load_err:
         _err(load_err)
@@ -610,18 +1111,17 @@ def cmd_validate(args):
             "valid": False,
             "errors": [load_err],
             "warnings": [],
-            "stats": {
-                "total_features": 0,
-                "total_sub_features": 0,
-                "complexity_distribution": {},
-                "max_dependency_depth": 0,
-                "has_cycles": False,
-            },
+            "stats": _empty_stats(),
         }
         print(json.dumps(result, indent=2, ensure_ascii=False))
         return 2
 
-    result = validate_feature_list(data)
+    if args.jobs < 1:
+        _err("--jobs must be at least 1")
+        return 2
+
+    cache_path = None if args.no_cache else default_cache_path(args.input)
+    result = validate_feature_list(data, cache_path=cache_path, jobs=args.jobs)
 
     # Print results to stdout
     print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -690,6 +1190,8 @@ def main():
             "Examples:\n"
             "  %(prog)s validate --input feature-list.json\n"
             "  %(prog)s validate --input feature-list.json --output validated.json\n"
+            "  %(prog)s validate --input feature-list.json --jobs 4\n"
+            "  %(prog)s validate --input feature-list.json --stream --fail-fast\n"
             "  %(prog)s template --output feature-list.json\n"
             "  %(prog)s summary --input feature-list.json\n"
             "  %(prog)s summary --input feature-list.json --format json\n"
@@ -709,6 +1211,22 @@ def main():
     p_validate.add_argument(
         "--output", help="Path to write validated output (optional)"
     )
+    p_validate.add_argument(
+        "--jobs", type=int, default=1,
+        help="Worker processes for per-feature checks (default: 1)",
+    )
+    p_validate.add_argument(
+        "--no-cache", action="store_true",
+        help="Do not read or write the per-feature validation cache",
+    )
+    p_validate.add_argument(
+        "--stream", action="store_true",
+        help="Parse features one at a time and emit NDJSON events (large files)",
+    )
+    p_validate.add_argument(
+        "--fail-fast", action="store_true",
+        help="With --stream, stop at the first error",
+    )
 
     # -- template --
     p_template = subparsers.add_parser(
@@ -1,7 +1,18 @@
 import argparse
+import contextlib
 import datetime
+import hashlib
 import os
 import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
 
 CHANGELOG_FILE = 'CHANGELOG.md'
 
@@ -15,124 +26,384 @@ and this project adheres to [Semantic Versioning](https://semver.org/spec/v2.0.0
 ## [Unreleased]
 """
 
+# Standard Keep a Changelog types mapping
+type_map = {
+    'feat': '### Added',
+    'fix': '### Fixed',
+    'change': '### Changed',
+    'refactor': '### Changed',
+    'perf': '### Changed',
+    'docs': '### Documentation',
+    'chore': '### Miscellaneous'
+}
+
+UNRELEASED = 'Unreleased'
+VERSION_RE = re.compile(rb'^## \[([^\]]+)\]')
+SUBSECTION_RE = re.compile(rb'^### ')
+# "feat: message" / "fix(scope)!: message" lines (batch input, commit subjects)
+ENTRY_RE = re.compile(r'^(?P<type>\w+)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?:\s*(?P<message>.+)$')
+ENTRY_LINE_RE = re.compile(rb'^\s*[-*] (.+)$')
+
+
+class Section:
+    """A `## [name]` section: byte offsets of its header line and its end."""
+
+    def __init__(self, name, start, body):
+        self.name = name
+        self.start = start
+        self.body = body
+        self.end = None
+        self.subsections = {}  # '### Header' -> byte offset of the header line
+
+
 def ensure_changelog_exists():
-    if not os.path.exists(CHANGELOG_FILE):
-        with open(CHANGELOG_FILE, 'w', encoding='utf-8') as f:
+    """Create the changelog from TEMPLATE unless it exists; call under locked()."""
+    try:
+        # Exclusive create: never truncates a changelog another writer just made
+        with open(CHANGELOG_FILE, 'x', encoding='utf-8') as f:
             f.write(TEMPLATE)
-        print(f"Created {CHANGELOG_FILE}")
+    except FileExistsError:
+        return
+    print(f"Created {CHANGELOG_FILE}")
 
-def read_changelog():
-    with open(CHANGELOG_FILE, 'r', encoding='utf-8') as f:
-        return f.read()
 
-def write_changelog(content):
-    with open(CHANGELOG_FILE, 'w', encoding='utf-8') as f:
-        f.write(content)
+def index_changelog(f, stop_after=None):
+    """Scan a changelog opened in binary mode once and index its sections.
 
-def add_entry(entry_type, message):
-    ensure_changelog_exists()
-    content = read_changelog()
-    
-    # Standard Keep a Changelog types mapping
-    type_map = {
-        'feat': '### Added',
-        'fix': '### Fixed',
-        'change': '### Changed',
-        'refactor': '### Changed',
-        'perf': '### Changed',
-        'docs': '### Documentation',
-        'chore': '### Miscellaneous'
-    }
-    
-    header = type_map.get(entry_type, '### Changed')
-    
-    # Find [Unreleased] section
-    unreleased_pattern = r"(## \[Unreleased\].*?)(?=\n## \[|\Z)"
-    match = re.search(unreleased_pattern, content, re.DOTALL)
-    
-    if not match:
-        # If no Unreleased section, add it
-        content = content.replace("## [Unreleased]", "## [Unreleased]\n") # simplistic fix
-        # Retry with simpler approach if regex fails due to file structure
-        if "## [Unreleased]" not in content:
-             # Prepend after header
-             lines = content.splitlines()
-             insert_idx = 0
-             for i, line in enumerate(lines):
-                 if line.startswith('# Changelog'):
-                     insert_idx = i + 1
-                     break
-             # skip some lines
-             while insert_idx < len(lines) and not lines[insert_idx].startswith('## '):
-                 insert_idx += 1
-             
-             lines.insert(insert_idx, "\n## [Unreleased]")
-             content = "\n".join(lines)
-    
-    # Now insert the entry
-    # We need to find the specific subsection (e.g. ### Added) under [Unreleased]
-    # This is getting complex with regex. Let's use a line-based parser for reliability.
-    
-    lines = content.splitlines()
-    output_lines = []
-    in_unreleased = False
-    inserted = False
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        output_lines.append(line)
-        
-        if line.strip().startswith("## [Unreleased]"):
-            in_unreleased = True
-            # Look ahead for the correct subsection or the next section
-            # If we hit next version (## [x.x.x]) or end of file, we need to insert our section
-            
-            # Check if subsection exists
-            has_subsection = False
-            j = i + 1
-            insertion_point = -1
-            
-            while j < len(lines):
-                subline = lines[j]
-                if subline.strip().startswith("## ["): # Next version
-                    break
-                if subline.strip().startswith(header):
-                    has_subsection = True
-                    insertion_point = j
+    Returns the list of Sections in file order. With *stop_after*, scanning
+    stops as soon as that section ends, so the rest of the file is never read.
+    """
+    sections = []
+    offset = 0
+    f.seek(0)
+    for line in f:
+        match = VERSION_RE.match(line)
+        if match:
+            if sections:
+                sections[-1].end = offset
+                if sections[-1].name == stop_after:
+                    return sections
+            sections.append(Section(match.group(1).decode('utf-8'), offset, offset + len(line)))
+        elif sections and SUBSECTION_RE.match(line):
+            header = line.rstrip().decode('utf-8')
+            sections[-1].subsections.setdefault(header, offset)
+        offset += len(line)
+    if sections:
+        sections[-1].end = offset
+    return sections
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Hold an exclusive lock for *path*.
+
+    The changelog itself is replaced on every write, so the lock lives in a
+    separate file in the temp directory (keeping the work tree clean).
+    """
+    key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    with open(os.path.join(tempfile.gettempdir(), f'changelog-{key}.lock'), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def splice(path, start, end, replacement):
+    """Atomically replace bytes [start, end) of *path* with *replacement*.
+
+    The bytes before and after are copied unchanged into a temp file in the
+    same directory, which is then renamed over the original.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    try:
+        with open(path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+            remaining = start
+            while remaining:
+                chunk = src.read(min(remaining, 1 << 16))
+                if not chunk:
                     break
-                j += 1
-            
-            if has_subsection and not inserted:
-                # Insert after the header
-                output_lines.extend(lines[i+1:insertion_point+1])
-                output_lines.append(f"- {message}")
-                i = insertion_point
-                inserted = True
-            elif not inserted:
-                # No subsection found, insert it right after [Unreleased] (or after blank line)
-                output_lines.append("")
-                output_lines.append(header)
-                output_lines.append(f"- {message}")
-                inserted = True
-                
-        i += 1
-        
-    write_changelog("\n".join(output_lines))
-    print(f"Added '{message}' to {header} in [Unreleased]")
+                dst.write(chunk)
+                remaining -= len(chunk)
+            dst.write(replacement)
+            src.seek(end)
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _unreleased_region(f):
+    """Return (start, end, text) of the [Unreleased] section, creating it if missing."""
+    sections = index_changelog(f, stop_after=UNRELEASED)
+    for section in sections:
+        if section.name == UNRELEASED:
+            f.seek(section.start)
+            return section.start, section.end, f.read(section.end - section.start).decode('utf-8')
+    # No Unreleased section: add one before the first version (or at the end)
+    if sections:
+        return sections[0].start, sections[0].start, "## [Unreleased]\n\n"
+    f.seek(0, os.SEEK_END)
+    end = f.tell()
+    f.seek(max(0, end - 2))
+    tail = f.read()
+    prefix = '' if not end or tail == b'\n\n' else ('\n' if tail.endswith(b'\n') else '\n\n')
+    return end, end, prefix + "## [Unreleased]\n"
+
+
+def _insert_entries(region, entries):
+    """Insert (header, message) entries into the [Unreleased] region text.
+
+    Entries go directly under their subsection header, above older ones and
+    in the given order; missing subsections are added right after [Unreleased].
+    """
+    lines = region.split('\n')
+    grouped = {}
+    for header, message in entries:
+        grouped.setdefault(header, []).append(f"- {message}")
+    positions = {}
+    for i, line in enumerate(lines):
+        positions.setdefault(line.strip(), i)
+    start = next(i for i, line in enumerate(lines) if line.startswith('## ['))
+    new_sections = []
+    inserts = []
+    for header, items in grouped.items():
+        if header in positions:
+            inserts.append((positions[header] + 1, items))
+        else:
+            new_sections.extend(["", header] + items)
+    inserts.append((start + 1, new_sections))
+    # Splice from the bottom up so earlier positions stay valid
+    for index, block in sorted(inserts, key=lambda item: item[0], reverse=True):
+        lines[index:index] = block
+    return '\n'.join(lines)
+
+
+def _splice_entries(entries):
+    # Caller holds the lock
+    entries = [(type_map.get(entry_type, '### Changed'), message) for entry_type, message in entries]
+    if not entries:
+        return []
+    with open(CHANGELOG_FILE, 'rb') as f:
+        start, end, region = _unreleased_region(f)
+    splice(CHANGELOG_FILE, start, end, _insert_entries(region, entries).encode('utf-8'))
+    return entries
+
+
+def add_entries(entries):
+    """Add [(entry_type, message)] to [Unreleased] with a single atomic write."""
+    with locked(CHANGELOG_FILE):
+        ensure_changelog_exists()
+        return _splice_entries(entries)
+
+
+def add_entry(entry_type, message):
+    for header, message in add_entries([(entry_type, message)]):
+        print(f"Added '{message}' to {header} in [Unreleased]")
+
+
+def read_entries(path):
+    """Parse "type: message" lines (conventional-commit style) from *path* or '-' for stdin."""
+    if path == '-':
+        return _parse_entries(sys.stdin, path)
+    with open(path, encoding='utf-8') as f:
+        return _parse_entries(f, path)
+
+
+def _parse_entries(f, path):
+    entries = []
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        # Same formatting as `generate`, so both commands dedup against each other
+        entry = commit_message(line)
+        if entry is None:
+            raise ValueError(f"{path}:{number}: expected '<type>: <message>' "
+                             f"with type in {', '.join(type_map)}")
+        entries.append(entry)
+    return entries
+
+
+def _entry_key(message):
+    # Case- and whitespace-insensitive 8-byte digest: keeps the set small on huge histories
+    return hashlib.blake2b(' '.join(message.lower().split()).encode('utf-8'), digest_size=8).digest()
+
+
+def existing_entry_keys(f):
+    """Hash set of every `- entry` already in the changelog (binary file, streamed)."""
+    keys = set()
+    f.seek(0)
+    for line in f:
+        match = ENTRY_LINE_RE.match(line)
+        if match:
+            keys.add(_entry_key(match.group(1).decode('utf-8', 'replace')))
+    return keys
+
+
+def commit_message(subject):
+    """Map a conventional-commit subject to (entry_type, message), or None if not a changelog type."""
+    match = ENTRY_RE.match(subject.strip())
+    if not match or match.group('type') not in type_map:
+        return None
+    message = match.group('message').strip()
+    if match.group('scope'):
+        message = f"**{match.group('scope')}:** {message}"
+    if match.group('breaking'):
+        message = f"**BREAKING:** {message}"
+    return match.group('type'), message
+
+
+def git_subjects(revision):
+    """Stream commit subjects of *revision* (newest first) from git log."""
+    process = subprocess.Popen(
+        ['git', 'log', '--no-merges', '--format=%s', revision, '--'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    try:
+        for line in process.stdout:
+            yield line.rstrip('\n')
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"git log {revision} failed: {stderr.strip()}")
+
+
+def last_tag():
+    result = subprocess.run(['git', 'describe', '--tags', '--abbrev=0'],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            universal_newlines=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def generate(revision='HEAD', dry_run=False):
+    """Add an entry for each conventional commit in *revision* not already in the changelog.
+
+    git log is consumed as a stream; only new entries are kept in memory and
+    they are written with a single splice.
+    """
+    with locked(CHANGELOG_FILE):
+        if not dry_run:
+            ensure_changelog_exists()
+        seen = set()
+        if os.path.exists(CHANGELOG_FILE):
+            with open(CHANGELOG_FILE, 'rb') as f:
+                seen = existing_entry_keys(f)
+        entries = []
+        for subject in git_subjects(revision):
+            entry = commit_message(subject)
+            if entry is None:
+                continue
+            key = _entry_key(entry[1])
+            if key not in seen:
+                seen.add(key)
+                entries.append(entry)
+        if not dry_run:
+            _splice_entries(entries)
+    return entries
+
+
+def release(version, date=None):
+    """Turn [Unreleased] into `## [version] - date` and open a new empty [Unreleased]."""
+    date = date or datetime.date.today().isoformat()
+    with locked(CHANGELOG_FILE):
+        ensure_changelog_exists()
+        with open(CHANGELOG_FILE, 'rb') as f:
+            sections = index_changelog(f)
+            unreleased = next((section for section in sections if section.name == UNRELEASED), None)
+            if any(section.name == version for section in sections):
+                raise ValueError(f"version [{version}] already exists in {CHANGELOG_FILE}")
+            if unreleased is None:
+                raise ValueError(f"no [Unreleased] section in {CHANGELOG_FILE}")
+            f.seek(unreleased.body)
+            body = f.read(unreleased.end - unreleased.body)
+        if not any(ENTRY_LINE_RE.match(line) for line in body.splitlines()):
+            raise ValueError("[Unreleased] has no entries to release")
+        # Only the [Unreleased] header line is replaced
+        header = f"## [Unreleased]\n\n## [{version}] - {date}\n"
+        splice(CHANGELOG_FILE, unreleased.start, unreleased.body, header.encode('utf-8'))
+
 
 def main():
     parser = argparse.ArgumentParser(description='Manage CHANGELOG.md')
     subparsers = parser.add_subparsers(dest='command')
-    
-    add_parser = subparsers.add_parser('add', help='Add a new entry')
-    add_parser.add_argument('--type', required=True, choices=['feat', 'fix', 'change', 'refactor', 'perf', 'docs', 'chore'], help='Type of change')
-    add_parser.add_argument('--message', required=True, help='Description of the change')
-    
+
+    add_parser = subparsers.add_parser('add', help='Add new entries')
+    add_parser.add_argument('--type', choices=list(type_map), help='Type of change')
+    add_parser.add_argument('--message', action='append', default=[],
+                            help='Description of the change (repeat to add several)')
+    add_parser.add_argument('--from-file', metavar='PATH',
+                            help="Add one entry per '<type>: <message>' line ('-' for stdin)")
+
+    generate_parser = subparsers.add_parser(
+        'generate', help='Add entries from conventional commits in git history')
+    generate_parser.add_argument('revision', nargs='?',
+                                 help='Revision or range to read (default: HEAD, '
+                                      'or <last tag>..HEAD with --since-tag)')
+    generate_parser.add_argument('--since-tag', action='store_true',
+                                 help='Only commits after the most recent tag')
+    generate_parser.add_argument('--dry-run', action='store_true',
+                                 help='Print the entries instead of writing them')
+
+    release_parser = subparsers.add_parser(
+        'release', help='Move [Unreleased] entries under a new version')
+    release_parser.add_argument('version', help='Version to release, e.g. 1.2.0')
+    release_parser.add_argument('--date', help='Release date (default: today)')
+    release_parser.add_argument('--from-git', action='store_true',
+                                help='First add entries for commits since the last tag')
+
     args = parser.parse_args()
-    
+
     if args.command == 'add':
-        add_entry(args.type, args.message)
+        if args.message and not args.type:
+            parser.error('--message requires --type')
+        if not args.message and not args.from_file:
+            parser.error('give --type/--message or --from-file')
+        entries = [(args.type, message) for message in args.message]
+        if args.from_file:
+            try:
+                entries.extend(read_entries(args.from_file))
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+        if len(entries) == 1:
+            add_entry(*entries[0])
+        else:
+            add_entries(entries)
+            print(f"Added {len(entries)} entries to [Unreleased]")
+    elif args.command in ('generate', 'release'):
+        try:
+            if args.command == 'generate' or args.from_git:
+                since_tag = args.command == 'release' or args.since_tag
+                revision = getattr(args, 'revision', None) or 'HEAD'
+                if since_tag:
+                    tag = last_tag()
+                    revision = f"{tag}..{revision}" if tag else revision
+                dry_run = getattr(args, 'dry_run', False)
+                entries = generate(revision, dry_run)
+                for entry_type, message in entries if dry_run else ():
+                    print(f"{type_map[entry_type]}: {message}")
+                print(f"{'Found' if dry_run else 'Added'} {len(entries)} new entries from {revision}")
+            if args.command == 'release':
+                release(args.version, args.date)
+                print(f"Released [Unreleased] as [{args.version}]")
+        except (RuntimeError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
     else:
         parser.print_help()
 
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+analysis_index.py - Machine-readable analysis artifact for analyze.py.
+
+analyze.py stores its results in ``docs/AI_CONTEXT/.cache/analysis.db``,
+a SQLite database with three tables:
+
+    facts       key -> JSON value (tech_stack, test_command, entry_points, ...)
+    modules     source directory -> module -> component
+    components  component name -> rank, files, languages, dependencies, ...
+
+``path`` and ``name`` are primary keys, so looking up the component that
+owns a path costs one B-tree probe per ancestor directory; nothing else
+is loaded.  The database is rebuilt in a temporary file and swapped in
+atomically, and only when its content changed.
+
+Usage (Python):
+  with AnalysisIndex.open(root) as index:
+      index.lookup("src/api/routes.py")   # {"directory", "module", "component"}
+      index.fact("test_command")
+      index.component("/src/api")
+
+Usage (CLI): see ``analyze.py query --help``.
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import sqlite3
+
+INDEX_FILE = os.path.join("docs", "AI_CONTEXT", ".cache", "analysis.db")
+INDEX_VERSION = 1
+
+FACT_KEYS = (
+    "tech_stack", "architecture", "languages", "frameworks", "manifests", "directory_map",
+    "entry_points", "config_files", "test_dirs", "colocated_tests", "test_command",
+    "files", "directories", "import_edges", "data_flow",
+)
+
+SCHEMA = """
+CREATE TABLE facts (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE modules (path TEXT PRIMARY KEY, module TEXT NOT NULL, component TEXT NOT NULL);
+CREATE TABLE components (
+    name TEXT PRIMARY KEY, position INTEGER NOT NULL, rank REAL NOT NULL,
+    files INTEGER NOT NULL, cycle INTEGER NOT NULL, languages TEXT NOT NULL,
+    modules TEXT NOT NULL, dependencies TEXT NOT NULL, dependents TEXT NOT NULL
+);
+"""
+
+
+class AnalysisIndexError(Exception):
+    """The analysis index is missing, unreadable or from another version."""
+
+
+def _rows(analysis):
+    facts = [("version", json.dumps(INDEX_VERSION))]
+    facts.extend((key, json.dumps(analysis[key], ensure_ascii=False)) for key in FACT_KEYS)
+    modules = sorted((path, module, analysis["component_of"][module])
+                     for path, module in analysis["module_of"].items() if module is not None)
+    components = []
+    for position, c in enumerate(analysis["components"]):
+        components.append((
+            c["name"], position, round(c["rank"], 9), c["files"], int(c["cycle"]),
+            json.dumps(c["languages"]), json.dumps(c["modules"]),
+            json.dumps(c["dependencies"]), json.dumps(c["dependents"]),
+        ))
+    return facts, modules, components
+
+
+def write_index(path, analysis, cache=None):
+    """Write the analysis to the SQLite index at *path*.
+
+    With a scan *cache*, the database is left untouched when its content
+    matches the last write.  Returns True if the file was (re)written.
+    """
+    facts, modules, components = _rows(analysis)
+    digest = hashlib.sha256(json.dumps([facts, modules, components]).encode("utf-8")).hexdigest()
+    name = os.path.basename(path)
+    if cache is not None and cache["docs"].get(name) == digest and os.path.exists(path):
+        return False
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO facts VALUES (?, ?)", facts)
+        conn.executemany("INSERT INTO modules VALUES (?, ?, ?)", modules)
+        conn.executemany("INSERT INTO components VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", components)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    if cache is not None:
+        cache["docs"][name] = digest
+        cache["dirty"] = True
+    return True
+
+
+class AnalysisIndex(object):
+    """Read-only access to an analysis index written by analyze.py."""
+
+    def __init__(self, path, root=None):
+        if not os.path.exists(path):
+            raise AnalysisIndexError("no analysis index at {} (run analyze.py first)".format(path))
+        self.path = path
+        self.root = os.path.abspath(root) if root else None
+        try:
+            self._conn = sqlite3.connect("file:{}?mode=ro".format(path), uri=True)
+            version = self.fact("version")
+        except sqlite3.Error as exc:
+            raise AnalysisIndexError("cannot read analysis index {}: {}".format(path, exc))
+        if version != INDEX_VERSION:
+            self.close()
+            raise AnalysisIndexError("analysis index {} has version {}, expected {}; "
+                                     "re-run analyze.py".format(path, version, INDEX_VERSION))
+
+    @classmethod
+    def open(cls, root):
+        """Open the index of the project at *root*."""
+        return cls(os.path.join(root, INDEX_FILE), root)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def fact(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM facts WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def facts(self):
+        return {key: json.loads(value)
+                for key, value in self._conn.execute("SELECT key, value FROM facts")}
+
+    def _relative(self, path):
+        if os.path.isabs(path) and self.root and (path + "/").startswith(self.root + "/"):
+            path = os.path.relpath(path, self.root)
+        path = posixpath.normpath(path.replace(os.sep, "/")).strip("/")
+        return "" if path == "." else path
+
+    def lookup(self, path):
+        """Return the module and component owning *path*, or None.
+
+        *path* is a file or directory, relative to the project root (a
+        leading "/" is accepted) or absolute under it.  The nearest
+        ancestor directory holding source files decides.
+        """
+        rel = self._relative(path)
+        while True:
+            row = self._conn.execute(
+                "SELECT path, module, component FROM modules WHERE path = ?", (rel,)).fetchone()
+            if row is not None:
+                return {"directory": "/" + row[0], "module": "/" + row[1], "component": row[2]}
+            if not rel:
+                return None
+            rel = rel.rpartition("/")[0]
+
+    def component(self, name):
+        """Return the component *name* (as listed in CORE_COMPONENTS), or None."""
+        row = self._conn.execute(
+            "SELECT name, position, rank, files, cycle, languages, modules, dependencies, dependents"
+            " FROM components WHERE name = ?", (name,)).fetchone()
+        return self._component(row) if row else None
+
+    def components(self, limit=None):
+        """Components by descending rank."""
+        rows = self._conn.execute(
+            "SELECT name, position, rank, files, cycle, languages, modules, dependencies, dependents"
+            " FROM components ORDER BY position LIMIT ?", (-1 if limit is None else limit,))
+        return [self._component(row) for row in rows]
+
+    @staticmethod
+    def _component(row):
+        return {
+            "name": row[0], "position": row[1], "rank": row[2], "files": row[3],
+            "cycle": bool(row[4]), "languages": json.loads(row[5]), "modules": json.loads(row[6]),
+            "dependencies": json.loads(row[7]), "dependents": json.loads(row[8]),
+        }
@@ -1,38 +1,429 @@
-import os
+#!/usr/bin/env python3
+"""
+analyze.py - Bootstrap Context-First documentation for a project.
+
+Scans the project tree once (see project_scan.py) to detect languages,
+frameworks, entry points and test directories, builds the import graph
+(see import_graph.py) to derive core components and data flow, then
+writes ``docs/AI_CONTEXT/ARCHITECTURE.md`` and
+``docs/AI_CONTEXT/CONSTITUTION.md``.
+
+Scan results and per-file imports are cached in
+``docs/AI_CONTEXT/.cache/analysis.json`` so a re-run only rescans
+directories and re-parses files that changed.  A doc is rewritten only
+when its rendered content differs from the last render (or the file is
+missing), so hand edits survive re-runs that detect nothing new.
+
+The analysis is also stored in ``docs/AI_CONTEXT/.cache/analysis.db``
+(see analysis_index.py) for tools that need facts rather than Markdown:
+
+  python3 analyze.py query [--root ROOT] PATH...      module/component owning each path
+  python3 analyze.py query --fact test_command        a stored fact (omit the name to list all)
+  python3 analyze.py query --component /src/api       one component (omit the name to list all)
+
+Usage:
+  python3 analyze.py [ROOT] [--jobs N] [--no-cache]
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import argparse
+import collections
+import hashlib
 import json
+import os
+import sys
+
+import analysis_index
+import import_graph
+import project_scan
+
+# Directories whose children are listed individually in DIRECTORY_MAP.
+CONTAINER_DIRS = frozenset([
+    "packages", "apps", "services", "libs", "modules", "plugins", "cmd", "crates", "projects",
+])
+
+DIR_PURPOSES = {
+    "src": "Main source code", "lib": "Library code", "app": "Application code",
+    "apps": "Applications", "packages": "Workspace packages", "services": "Services",
+    "libs": "Shared libraries", "cmd": "Command entry points", "internal": "Internal packages",
+    "pkg": "Public packages", "api": "API layer", "web": "Web frontend",
+    "frontend": "Frontend", "backend": "Backend", "server": "Server", "client": "Client",
+    "components": "UI components", "pages": "Page routes", "public": "Static assets",
+    "static": "Static assets", "assets": "Assets", "docs": "Documentation and AI context files",
+    "doc": "Documentation", "scripts": "Scripts and tooling", "tools": "Tooling",
+    "bin": "Executables", "config": "Configuration", "configs": "Configuration",
+    "deploy": "Deployment", "deployments": "Deployment", "infra": "Infrastructure",
+    "migrations": "Database migrations", "examples": "Examples", "vendor": "Vendored dependencies",
+    "third_party": "Vendored dependencies", ".github": "CI workflows and GitHub config",
+    "test": "Tests", "tests": "Tests", "__tests__": "Tests", "spec": "Tests",
+    "e2e": "End-to-end tests", "benchmarks": "Benchmarks", "fixtures": "Test fixtures",
+}
+
+# Share of source files a language needs to be listed without a manifest.
+MIN_LANGUAGE_SHARE = 0.05
+MAX_DIRECTORY_LINES = 40
+MAX_ENTRY_POINTS = 15
+MAX_TEST_DIRS = 10
+MAX_CORE_COMPONENTS = 8
+MAX_COMPONENT_DEPENDENCIES = 5
+MAX_FLOWS = 3
+MAX_FLOW_STEPS = 6
+FLOW_ENTRY_KINDS = ("main", "app", "cli")
+
+CACHE_FILE = os.path.join(".cache", "analysis.json")
+
+
+def _depth(rel):
+    return rel.count("/") + 1 if rel else 0
+
+
+def _runtime(languages, manifests):
+    """Languages worth listing, most used first, with manifest versions."""
+    versions = {}
+    ecosystems = set()
+    for info in manifests:
+        language = project_scan.ECOSYSTEMS.get(info["kind"])
+        if language:
+            ecosystems.add(language)
+            if info["version"] and language not in versions:
+                versions[language] = info["version"]
+    total = sum(languages.values()) or 1
+    names = [lang for lang, count in languages.most_common()
+             if lang in ecosystems or count / total >= MIN_LANGUAGE_SHARE]
+    if "Node.js" in ecosystems:
+        names.insert(0, "Node.js")
+    names.extend(sorted(ecosystems - set(names) - {"JVM", ".NET"}))
+    return ["{} {}".format(name, versions[name]) if name in versions else name for name in names]
+
+
+def _architecture(tree, manifests, runtime):
+    roots = {info["path"].rpartition("/")[0] for info in manifests if info["kind"] != "workspace"}
+    if any(info["workspace"] for info in manifests if _depth(info["path"]) == 1):
+        return "Monorepo"
+    top = tree.get("", {}).get("dirs", [])
+    if any(name in ("packages", "apps") for name in top) or len(roots - {""}) >= 3:
+        return "Monorepo"
+    ecosystems = {info["kind"] for info in manifests if info["kind"] in project_scan.ECOSYSTEMS}
+    if len(ecosystems) >= 2:
+        return "Polyglot"
+    return "Single Service"
+
+
+def _describe(rel, files, langs, manifest):
+    name = rel.rpartition("/")[2]
+    parts = []
+    purpose = DIR_PURPOSES.get(name.lower())
+    if purpose:
+        parts.append(purpose)
+    if manifest:
+        ecosystem = project_scan.ECOSYSTEMS.get(manifest["kind"], manifest["kind"])
+        if manifest["name"]:
+            parts.append("{} package `{}`".format(ecosystem, manifest["name"]))
+        else:
+            parts.append("{} project".format(ecosystem))
+    ranked = langs.most_common(2)
+    if not parts:
+        parts.append("{} source".format(ranked[0][0]) if ranked else "Files")
+    detail = "{} files".format(files)
+    if ranked:
+        if ranked[0][1] * 2 >= sum(langs.values()):
+            detail += ", mostly {}".format(ranked[0][0])
+        else:
+            detail += ", " + ", ".join(lang for lang, _ in ranked)
+    return "{} ({})".format("; ".join(parts), detail)
+
+
+def _directory_map(tree, manifests):
+    """``[(depth, path, purpose)]`` for top-level and container directories."""
+    rollup = {}
+    for rel, facts in tree.items():
+        if not rel:
+            continue
+        parts = rel.split("/")
+        keys = [parts[0]]
+        if len(parts) > 1 and parts[0] in CONTAINER_DIRS:
+            keys.append(parts[0] + "/" + parts[1])
+        for key in keys:
+            entry = rollup.get(key)
+            if entry is None:
+                entry = rollup[key] = [0, collections.Counter()]
+            entry[0] += facts["files"]
+            entry[1].update(facts["langs"])
+
+    by_dir = {}
+    for info in manifests:
+        if info["kind"] != "workspace":
+            by_dir.setdefault(info["path"].rpartition("/")[0], info)
+
+    lines = []
+    for key in sorted(rollup):
+        files, langs = rollup[key]
+        if not files:
+            continue
+        if len(lines) >= MAX_DIRECTORY_LINES:
+            lines.append((1, None, "{} more directories".format(
+                sum(1 for k in rollup if k > key and rollup[k][0]) + 1)))
+            break
+        lines.append((_depth(key), "/" + key, _describe(key, files, langs, by_dir.get(key))))
+    return lines
+
+
+def _entry_points(tree, manifests, entries):
+    seen = set()
+    points = []
+    for info in manifests:
+        for kind, path, note in info["entries"]:
+            if path not in seen:
+                seen.add(path)
+                points.append((kind, path, note))
+    for kind, path, note in entries:
+        if "/" + path not in seen:
+            seen.add("/" + path)
+            points.append((kind, "/" + path, note))
+    points.sort(key=lambda point: (point[1].count("/"), point[1]))
+    return points[:MAX_ENTRY_POINTS]
+
+
+def _tests(tree):
+    """Top-most test directories and the count of co-located test files."""
+    dirs = []
+    colocated = 0
+    for rel in sorted(tree):
+        parts = rel.split("/") if rel else []
+        in_test_dir = any(part in project_scan.TEST_DIRS for part in parts)
+        if parts and parts[-1] in project_scan.TEST_DIRS and not any(
+                part in project_scan.TEST_DIRS for part in parts[:-1]):
+            dirs.append("/" + rel)
+        elif not in_test_dir:
+            colocated += tree[rel]["tests"]
+    return dirs, colocated
+
+
+def _data_flows(graph, entry_points):
+    """Follow the heaviest imports from each entry point's component.
+
+    Returns ``[(entry, [component name, ...])]``, one flow per starting
+    component.
+    """
+    by_name = {component["name"]: component for component in graph["components"]}
+    flows = []
+    started = set()
+    for kind, path, note in entry_points:
+        if kind not in FLOW_ENTRY_KINDS:
+            continue
+        if path.startswith("/"):
+            start = import_graph.component_for_path(graph, path)
+        else:
+            # pyproject script target "pkg.module:function"
+            target = graph["resolver"].resolve("__main__.py", path.partition(":")[0])
+            start = import_graph.component_for_path(graph, target) if target is not None else None
+        if start is None or start in started or not by_name[start]["dependencies"]:
+            continue
+        started.add(start)
+        chain = [start]
+        while len(chain) < MAX_FLOW_STEPS:
+            step = next((name for name in by_name[chain[-1]]["dependencies"]
+                         if name not in chain), None)
+            if step is None:
+                break
+            chain.append(step)
+        flows.append(((kind, path, note), chain))
+        if len(flows) >= MAX_FLOWS:
+            break
+    return flows
+
+
+def analyze_project(root_dir, jobs=None, cache=None):
+    """Scan *root_dir* and return the facts used to fill the docs.
+
+    *cache* is a scan cache from ``project_scan.load_cache``; it is
+    updated in place.  ``module_of`` maps source directories to modules
+    and ``component_of`` maps modules to component names.
+    """
+    tree = project_scan.walk(root_dir, jobs, cache)
+    manifests, entries = project_scan.read_signatures(root_dir, tree, jobs, cache)
+    manifests.sort(key=lambda info: (_depth(info["path"]), info["path"]))
+
+    languages = collections.Counter()
+    for facts in tree.values():
+        languages.update(facts["langs"])
+
+    frameworks = collections.OrderedDict()
+    for info in manifests:
+        for category, label in info["signatures"]:
+            labels = frameworks.setdefault(category, [])
+            if label not in labels:
+                labels.append(label)
+
+    runtime = _runtime(languages, manifests)
+    for label in frameworks.pop("language", []):
+        if label not in runtime and not any(r.startswith(label + " ") for r in runtime):
+            runtime.append(label)
+
+    configs = []
+    for rel in sorted(tree, key=lambda r: (_depth(r), r)):
+        if _depth(rel) <= 1:
+            prefix = "/" + rel + "/" if rel else "/"
+            configs.extend(prefix + name for name in tree[rel]["configs"])
+
+    test_dirs, colocated_tests = _tests(tree)
+    test_command = next((info["test_command"] for info in manifests if info["test_command"]), None)
+    entry_points = _entry_points(tree, manifests, entries)
+    graph = import_graph.build_graph(root_dir, tree, manifests, jobs, cache)
 
-def analyze_project(root_dir):
-    """Simple heuristic analysis of the project structure."""
-    tech_stack = []
-    architecture = "Unknown"
-    
-    # Check for languages/frameworks
-    if os.path.exists(os.path.join(root_dir, 'package.json')):
-        tech_stack.append("Node.js")
-    if os.path.exists(os.path.join(root_dir, 'requirements.txt')) or os.path.exists(os.path.join(root_dir, 'pyproject.toml')):
-        tech_stack.append("Python")
-    if os.path.exists(os.path.join(root_dir, 'go.mod')):
-        tech_stack.append("Go")
-    
-    # Check for Monorepo
-    if os.path.exists(os.path.join(root_dir, 'packages')) or os.path.exists(os.path.join(root_dir, 'apps')):
-        architecture = "Monorepo"
-    elif "Python" in tech_stack and "Node.js" in tech_stack:
-        architecture = "Polyglot"
-    else:
-        architecture = "Single Service"
-        
     return {
-        "tech_stack": tech_stack,
-        "architecture": architecture
+        "tech_stack": runtime,
+        "architecture": _architecture(tree, manifests, runtime),
+        "languages": languages.most_common(),
+        "frameworks": frameworks,
+        "manifests": [info["path"] for info in manifests],
+        "directory_map": _directory_map(tree, manifests),
+        "entry_points": entry_points,
+        "config_files": configs,
+        "test_dirs": test_dirs,
+        "colocated_tests": colocated_tests,
+        "test_command": test_command,
+        "components": graph["components"],
+        "data_flow": _data_flows(graph, entry_points),
+        "import_edges": graph["edges"],
+        "module_of": graph["module_of"],
+        "component_of": graph["component_of"],
+        "files": sum(facts["files"] for facts in tree.values()),
+        "directories": len(tree),
     }
 
-def generate_docs(root_dir):
+
+def _placeholder(values, placeholder):
+    return ", ".join(values) if values else "(placeholder: {})".format(placeholder)
+
+
+def render_tech_stack(analysis):
+    frameworks = analysis["frameworks"]
+    lines = ["- runtime: " + _placeholder(analysis["tech_stack"], "add detected technologies")]
+    if frameworks.get("framework"):
+        lines.append("- frameworks: " + ", ".join(frameworks["framework"]))
+    lines.append("- architecture_pattern: " + analysis["architecture"])
+    lines.append("- styling: " + _placeholder(frameworks.get("styling"), "e.g., Tailwind CSS, CSS Modules"))
+    lines.append("- state: " + _placeholder(frameworks.get("state"), "e.g., Zustand, Redux"))
+    lines.append("- build: " + _placeholder(frameworks.get("build"), "e.g., Vite, Webpack"))
+    if frameworks.get("testing"):
+        lines.append("- testing: " + ", ".join(frameworks["testing"]))
+    if frameworks.get("data"):
+        lines.append("- data: " + ", ".join(frameworks["data"]))
+    return "\n".join(lines)
+
+
+def render_directory_map(analysis):
+    lines = []
+    for depth, path, purpose in analysis["directory_map"]:
+        indent = "  " * (depth - 1)
+        lines.append("{}- {} → {}".format(indent, path, purpose) if path else "- ... → " + purpose)
+    if not lines:
+        lines = [
+            "- /src → (placeholder: main source code purpose)",
+            "- /docs → Documentation and AI context files",
+            "- /tests → (placeholder: test files location)",
+        ]
+    return "\n".join(lines)
+
+
+def render_entry_points(analysis):
+    lines = []
+    for kind, path, note in analysis["entry_points"]:
+        lines.append("- {}: {} ({})".format(kind, path, note))
+    if not any(kind == "main" for kind, _, _ in analysis["entry_points"]):
+        lines.insert(0, "- main: (placeholder: e.g., /src/index.ts)")
+    lines.append("- config: " + _placeholder(analysis["config_files"], "e.g., /config/settings.ts"))
+    tests = analysis["test_dirs"][:MAX_TEST_DIRS]
+    if len(analysis["test_dirs"]) > MAX_TEST_DIRS:
+        tests.append("{} more test directories".format(len(analysis["test_dirs"]) - MAX_TEST_DIRS))
+    if analysis["colocated_tests"]:
+        tests.append("{} co-located test files".format(analysis["colocated_tests"]))
+    if tests:
+        lines.append("- tests: " + ", ".join(tests))
+    if analysis["test_command"]:
+        lines.append("- test_command: " + analysis["test_command"])
+    return "\n".join(lines)
+
+
+def _plural(count, noun):
+    return "{} {}{}".format(count, noun, "" if count == 1 else "s")
+
+
+def render_core_components(analysis):
+    blocks = []
+    for component in analysis["components"][:MAX_CORE_COMPONENTS]:
+        name = component["name"].rpartition("/")[2]
+        purpose = None if component["cycle"] else DIR_PURPOSES.get(name.lower())
+        role = [purpose or "{} module".format(
+            component["languages"][0] if component["languages"] else "Source")]
+        role.append(_plural(component["files"], "file"))
+        if component["dependents"]:
+            role.append("imported by " + _plural(len(component["dependents"]), "component"))
+        if component["cycle"]:
+            role.append("import cycle across {} modules".format(len(component["modules"])))
+        dependencies = component["dependencies"][:MAX_COMPONENT_DEPENDENCIES]
+        if len(component["dependencies"]) > MAX_COMPONENT_DEPENDENCIES:
+            dependencies.append("{} more".format(
+                len(component["dependencies"]) - MAX_COMPONENT_DEPENDENCIES))
+        blocks.append("\n".join([
+            "[{}]".format(component["name"]),
+            "- role: " + "; ".join(role),
+            "- location: " + ", ".join(component["modules"]),
+            "- dependencies: " + (", ".join(dependencies) or "none"),
+        ]))
+    if not blocks:
+        for name in ("ComponentA", "ComponentB"):
+            blocks.append("\n".join([
+                "[{}]".format(name),
+                "- role: (placeholder: describe component responsibility)",
+                "- location: (placeholder: file path)",
+                "- dependencies: (placeholder: list dependencies)",
+            ]))
+    return "\n\n".join(blocks)
+
+
+def render_data_flow(analysis):
+    blocks = []
+    for (kind, path, note), chain in analysis["data_flow"]:
+        lines = ["FLOW: " + " → ".join(chain), ""]
+        lines.append("1. {} {} ({}) starts in [{}]".format(kind, path, note, chain[0]))
+        for number, (caller, callee) in enumerate(zip(chain, chain[1:]), 2):
+            lines.append("{}. [{}] calls into [{}]".format(number, caller, callee))
+        blocks.append("\n".join(lines))
+    if not blocks:
+        blocks.append("""FLOW: (placeholder: describe main data flow)
+
+Example format:
+1. User triggers action in [ComponentA]
+2. ComponentA calls [ServiceB.method()]
+3. ServiceB processes and returns result
+4. ComponentA updates state and re-renders""")
+    return "\n\n".join(blocks)
+
+
+def write_doc(path, content, cache):
+    """Write *content* unless it matches the last render recorded in *cache*."""
+    name = os.path.basename(path)
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    if cache is not None and cache["docs"].get(name) == digest and os.path.exists(path):
+        return False
+    with open(path, 'w') as f:
+        f.write(content)
+    if cache is not None:
+        cache["docs"][name] = digest
+        cache["dirty"] = True
+    return True
+
+def generate_docs(root_dir, jobs=None, use_cache=True):
     context_dir = os.path.join(root_dir, 'docs', 'AI_CONTEXT')
     os.makedirs(context_dir, exist_ok=True)
     
-    analysis = analyze_project(root_dir)
-    tech_list = ', '.join(analysis['tech_stack']) if analysis['tech_stack'] else '(placeholder: add detected technologies)'
+    cache_path = os.path.join(context_dir, CACHE_FILE)
+    cache = project_scan.load_cache(cache_path) if use_cache else None
+    analysis = analyze_project(root_dir, jobs, cache)
+    written = []
     
     # 1. Generate ARCHITECTURE.md (AI-optimized format)
     arch_content = f"""# Project Architecture
@@ -45,55 +436,34 @@ def generate_docs(root_dir):
 ---
 
 ## TECH_STACK
-- runtime: {tech_list}
-- architecture_pattern: {analysis['architecture']}
-- styling: (placeholder: e.g., Tailwind CSS, CSS Modules)
-- state: (placeholder: e.g., Zustand, Redux)
-- build: (placeholder: e.g., Vite, Webpack)
+{render_tech_stack(analysis)}
 
 ---
 
 ## DIRECTORY_MAP
 
 PATH_MAP:
-- /src → (placeholder: main source code purpose)
-- /docs → Documentation and AI context files
-- /tests → (placeholder: test files location)
+{render_directory_map(analysis)}
 
 ---
 
 ## CORE_COMPONENTS
 
-[ComponentA]
-- role: (placeholder: describe component responsibility)
-- location: (placeholder: file path)
-- dependencies: (placeholder: list dependencies)
-
-[ComponentB]
-- role: (placeholder: describe component responsibility)
-- location: (placeholder: file path)
-- dependencies: (placeholder: list dependencies)
+{render_core_components(analysis)}
 
 ---
 
 ## DATA_FLOW
 
-FLOW: (placeholder: describe main data flow)
-
-Example format:
-1. User triggers action in [ComponentA]
-2. ComponentA calls [ServiceB.method()]
-3. ServiceB processes and returns result
-4. ComponentA updates state and re-renders
+{render_data_flow(analysis)}
 
 ---
 
 ## ENTRY_POINTS
-- main: (placeholder: e.g., /src/index.ts)
-- config: (placeholder: e.g., /config/settings.ts)
+{render_entry_points(analysis)}
 """
-    with open(os.path.join(context_dir, 'ARCHITECTURE.md'), 'w') as f:
-        f.write(arch_content)
+    if write_doc(os.path.join(context_dir, 'ARCHITECTURE.md'), arch_content, cache):
+        written.append('ARCHITECTURE.md')
         
     # 2. Generate CONSTITUTION.md (AI-optimized format)
     const_content = """# Project Constitution
@@ -180,11 +550,65 @@ A: (placeholder: add answer with IF-THEN format if applicable)
 - cause: (placeholder: root cause)
 - fix: (placeholder: solution)
 """
-    with open(os.path.join(context_dir, 'CONSTITUTION.md'), 'w') as f:
-        f.write(const_content)
+    if write_doc(os.path.join(context_dir, 'CONSTITUTION.md'), const_content, cache):
+        written.append('CONSTITUTION.md')
+    index_path = os.path.join(root_dir, analysis_index.INDEX_FILE)
+    if analysis_index.write_index(index_path, analysis, cache):
+        written.append(os.path.relpath(index_path, context_dir))
+    if cache is not None:
+        project_scan.save_cache(cache_path, cache)
         
-    print(f"Successfully generated AI-optimized Context Docs in {context_dir}")
+    print(f"Scanned {analysis['files']} files in {analysis['directories']} directories")
+    if written:
+        print(f"Successfully generated AI-optimized Context Docs in {context_dir}: {', '.join(written)}")
+    else:
+        print(f"AI Context Docs in {context_dir} are up to date")
+
+def query(argv):
+    parser = argparse.ArgumentParser(prog="analyze.py query",
+                                     description="Query the analysis index written by analyze.py.")
+    parser.add_argument("paths", nargs="*", metavar="PATH",
+                        help="Files or directories (relative to ROOT, or absolute) to map "
+                             "to their module and component")
+    parser.add_argument("--root", default=os.getcwd(),
+                        help="Project root (default: current directory)")
+    parser.add_argument("--fact", nargs="?", const="", metavar="NAME",
+                        help="Print a stored fact, or all facts without NAME")
+    parser.add_argument("--component", nargs="?", const="", metavar="NAME",
+                        help="Print a component, or all components without NAME")
+    args = parser.parse_args(argv)
+    if not args.paths and args.fact is None and args.component is None:
+        parser.error("give PATH, --fact or --component")
+
+    try:
+        index = analysis_index.AnalysisIndex.open(os.path.abspath(args.root))
+    except analysis_index.AnalysisIndexError as exc:
+        print("Error: {}".format(exc), file=sys.stderr)
+        return 2
+    with index:
+        if args.fact is not None:
+            result = index.fact(args.fact) if args.fact else index.facts()
+        elif args.component is not None:
+            result = index.component(args.component) if args.component else index.components()
+        else:
+            result = {path: index.lookup(path) for path in args.paths}
+            result = result if len(args.paths) > 1 else result[args.paths[0]]
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 1 if result is None else 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["query"]:
+        return query(argv[1:])
+    parser = argparse.ArgumentParser(description="Generate AI-optimized Context-First docs.")
+    parser.add_argument("root", nargs="?", default=os.getcwd(),
+                        help="Project root (default: current directory)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Scanner threads (default: 4 x CPU count, at most 32)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore and do not update the scan cache (the analysis index is still written)")
+    args = parser.parse_args(argv)
+    generate_docs(os.path.abspath(args.root), args.jobs, use_cache=not args.no_cache)
 
 if __name__ == "__main__":
-    root = os.getcwd()
-    generate_docs(root)
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+bench_analyze.py - Benchmark analyze_project() on a synthetic monorepo.
+
+Creates (once, reused on later runs) a monorepo under --dir with
+--files source files spread over TypeScript, Python and Go packages,
+plus ignored build output and node_modules trees, then times a full
+analysis twice: cold (empty in-memory cache) and warm (reusing it).
+
+Usage:
+  python3 bench_analyze.py [--files 500000] [--dir /tmp/bench-analyze] [--jobs N]
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import analyze
+import project_scan
+
+FILES_PER_DIR = 50
+
+
+def _write(path, text=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+def make_monorepo(root, files):
+    """Populate *root* with roughly *files* non-ignored files."""
+    marker = os.path.join(root, ".bench-files")
+    if os.path.exists(marker):
+        with open(marker, encoding="utf-8") as fh:
+            if fh.read().strip() == str(files):
+                return
+    _write(os.path.join(root, ".gitignore"), "dist/\n*.log\n/coverage\n")
+    _write(os.path.join(root, "package.json"),
+           json.dumps({"name": "bench", "private": True, "workspaces": ["packages/*"],
+                       "devDependencies": {"turbo": "1", "typescript": "5"}}))
+    _write(os.path.join(root, "go.mod"), "module example.com/bench\n\ngo 1.21\n\n"
+           "require github.com/gin-gonic/gin v1.9.0\n")
+    _write(os.path.join(root, "cmd", "server", "main.go"), "package main\n\nfunc main() {}\n")
+    kinds = (("ts", "packages", "index.ts"), ("py", "services", "main.py"), ("go", "internal", None))
+    dirs = max(1, files // FILES_PER_DIR)
+    for d in range(dirs):
+        ext, container, entry = kinds[d % len(kinds)]
+        package = "{}-{:03d}".format(ext, d // 200)
+        base = os.path.join(root, container, package, "src", "mod{:05d}".format(d))
+        for i in range(FILES_PER_DIR):
+            _write(os.path.join(base, "file{:03d}.{}".format(i, ext)), "x = 1\n")
+        pkg_root = os.path.join(root, container, package)
+        if d % 200 < len(kinds):  # first directory of each package
+            if ext == "ts":
+                _write(os.path.join(pkg_root, "package.json"),
+                       json.dumps({"name": "@bench/" + package, "main": "src/index.ts",
+                                   "dependencies": {"react": "18", "zustand": "4"},
+                                   "devDependencies": {"vite": "5", "vitest": "1"}}))
+                _write(os.path.join(pkg_root, "src", "index.ts"),
+                       "createRoot(document.getElementById('root'))\n")
+                _write(os.path.join(pkg_root, "dist", "bundle.js"), "")
+                _write(os.path.join(pkg_root, "node_modules", "react", "index.js"), "")
+            elif ext == "py":
+                _write(os.path.join(pkg_root, "pyproject.toml"),
+                       '[project]\nname = "{}"\ndependencies = ["fastapi>=0.100", "sqlalchemy"]\n'
+                       '\n[tool.pytest.ini_options]\n'.format(package))
+                _write(os.path.join(pkg_root, "src", entry), "app = FastAPI()\n")
+                _write(os.path.join(pkg_root, "tests", "test_app.py"), "")
+    with open(marker, "w", encoding="utf-8") as fh:
+        fh.write(str(files))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyze_project() on a synthetic monorepo.")
+    parser.add_argument("--files", type=int, default=500000, help="Source files (default: 500000)")
+    parser.add_argument("--dir", default="/tmp/bench-analyze", help="Where to create the monorepo")
+    parser.add_argument("--jobs", type=int, default=None, help="Scanner threads")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    make_monorepo(args.dir, args.files)
+    print("fixture ready in {:.1f} s".format(time.perf_counter() - start))
+
+    cache = project_scan.load_cache(os.path.join(args.dir, ".bench-cache", "analysis.json"))
+    for run in ("cold", "warm"):
+        start = time.perf_counter()
+        analysis = analyze.analyze_project(args.dir, args.jobs, cache)
+        elapsed = time.perf_counter() - start
+        print("{}: analyzed {} files in {} directories ({} import edges) in {:.2f} s".format(
+            run, analysis["files"], analysis["directories"], analysis["import_edges"], elapsed))
+    print(analyze.render_tech_stack(analysis))
+    print(analyze.render_entry_points(analysis))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+import_graph.py - Module dependency graph for analyze.py.
+
+Imports are extracted per source file (Python via ``ast``, JS/TS via an
+import/require statement scanner, Go via ``import`` blocks) on a process
+pool; results are cached per file by mtime/size in the scan cache, so a
+re-run only parses files that changed.
+
+Imports are resolved to directories inside the project (relative and
+package-absolute Python imports, relative and workspace-package JS/TS
+imports, Go imports under a go.mod module path); third-party imports
+are dropped.  Directories are then truncated to a common depth so at
+most MAX_MODULES modules remain, the module graph is condensed into its
+strongly connected components, and components are ranked by PageRank
+over the import edges (a component many others depend on, directly or
+transitively, ranks high).
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import ast
+import os
+import posixpath
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import project_scan
+
+MAX_MODULES = 200
+# Files per process-pool task; below POOL_MIN_FILES misses are parsed inline.
+CHUNK_SIZE = 256
+POOL_MIN_FILES = 512
+PAGERANK_DAMPING = 0.85
+PAGERANK_ITERATIONS = 40
+
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".mts", ".cts")
+
+_JS_IMPORT_RE = re.compile(
+    r"""(?:\bfrom\s*|\bimport\s*\(?\s*|\brequire\s*\(\s*)['"]([^'"\n]+)['"]""")
+_GO_IMPORT_RE = re.compile(r'^import\s*(?:\((.*?)\)|([^\n]*))', re.M | re.S)
+_GO_PATH_RE = re.compile(r'"([^"\n]+)"')
+_PY_IMPORT_RE = re.compile(r"^\s*(?:from\s+(\.*[\w.]*)\s+import\s+([\w, ]+)|import\s+([\w., ]+))", re.M)
+
+
+# -- Extraction (runs in worker processes) ------------------------------------
+
+def python_imports(text):
+    """Return import specs: dotted names, relative ones with leading dots."""
+    specs = []
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        # Not parseable by this interpreter (e.g. Python 2); scan statements.
+        for from_module, names, modules in _PY_IMPORT_RE.findall(text):
+            if modules:
+                specs.extend(m.split(" as ")[0].strip() for m in modules.split(","))
+            else:
+                specs.append(from_module)
+                sep = "" if from_module.endswith(".") else "."
+                specs.extend(from_module + sep + n.split(" as ")[0].strip()
+                             for n in names.split(",") if n.strip())
+        return [s for s in specs if s]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            specs.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = "." * (node.level or 0) + (node.module or "")
+            if node.module:
+                specs.append(base)
+            sep = "" if base.endswith(".") or not base else "."
+            specs.extend(base + sep + alias.name for alias in node.names if alias.name != "*")
+    return specs
+
+
+def js_imports(text):
+    return _JS_IMPORT_RE.findall(text)
+
+
+def go_imports(text):
+    specs = []
+    for block, single in _GO_IMPORT_RE.findall(text):
+        specs.extend(_GO_PATH_RE.findall(block or single))
+    return specs
+
+
+def extract_imports(path):
+    """Return the import specs of the source file at *path*."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            text = fh.read()
+    except OSError:
+        return []
+    ext = os.path.splitext(path)[1]
+    if ext == ".py":
+        specs = python_imports(text)
+    elif ext == ".go":
+        specs = go_imports(text)
+    else:
+        specs = js_imports(text)
+    return sorted(set(specs))
+
+
+def _parse_chunk(task):
+    root, rels = task
+    return [extract_imports(os.path.join(root, rel)) for rel in rels]
+
+
+def collect_imports(root, files, jobs=None, cache=None):
+    """Return ``{rel: [spec, ...]}`` for *files*, parsing only cache misses."""
+    previous = cache["imports"] if cache is not None else {}
+    trusted_before = (cache["imports_scanned_at"] - project_scan.RACY_WINDOW_NS
+                      if cache is not None else 0)
+    scanned_at = int(time.time() * 1e9)
+    records = {}
+    imports = {}
+    misses = []
+    prefix = os.path.join(root, "")
+    for rel in files:
+        try:
+            st = os.stat(prefix + rel)
+        except OSError:
+            continue
+        key = project_scan.stat_key(st)
+        cached = previous.get(rel)
+        if cached is not None and cached[:2] == key and st.st_mtime_ns < trusted_before:
+            records[rel] = cached
+            imports[rel] = cached[2]
+        else:
+            records[rel] = key
+            misses.append(rel)
+
+    if len(misses) < POOL_MIN_FILES or jobs == 1:
+        results = _parse_chunk((root, misses))
+    else:
+        chunks = [misses[i:i + CHUNK_SIZE] for i in range(0, len(misses), CHUNK_SIZE)]
+        workers = min(jobs or os.cpu_count() or 1, os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [specs for chunk in pool.map(_parse_chunk, [(root, c) for c in chunks])
+                       for specs in chunk]
+    for rel, specs in zip(misses, results):
+        records[rel] = records[rel] + [specs]
+        imports[rel] = specs
+
+    if cache is not None:
+        if misses or len(records) != len(previous):
+            cache["dirty"] = True
+        cache["imports"] = records
+        cache["imports_scanned_at"] = scanned_at
+    return imports
+
+
+# -- Resolution ---------------------------------------------------------------
+
+class Resolver(object):
+    """Map import specs to project directories."""
+
+    def __init__(self, tree, manifests):
+        self.source_dirs = {rel for rel, facts in tree.items() if facts["sources"]}
+        self.files = set()
+        self.py_dirs = {}    # directory basename -> [rel]
+        self.py_files = {}   # module file stem -> [rel dir]
+        for rel, facts in tree.items():
+            prefix = rel + "/" if rel else ""
+            for name in facts["sources"]:
+                self.files.add(prefix + name)
+                if name.endswith(".py") and name != "__init__.py":
+                    self.py_files.setdefault(name[:-3], []).append(rel)
+            if any(name.endswith(".py") for name in facts["sources"]) and rel:
+                self.py_dirs.setdefault(rel.rpartition("/")[2], []).append(rel)
+        self.packages = {}   # npm package name -> dir
+        self.go_modules = {}  # go module path -> dir
+        self.package_roots = set()
+        for info in manifests:
+            base = info["path"].rpartition("/")[0]
+            if info["kind"] == "npm":
+                self.package_roots.add(base)
+                if info["name"]:
+                    self.packages[info["name"]] = base
+            elif info["kind"] == "go" and info["name"]:
+                self.go_modules[info["name"]] = base
+        self._memo = {}
+
+    def resolve(self, importer, spec):
+        """Return the directory *spec* (imported from file *importer*) lives in, or None."""
+        importer_dir = importer.rpartition("/")[0]
+        key = (importer_dir, importer.endswith(".py"), importer.endswith(".go"), spec)
+        if key not in self._memo:
+            if importer.endswith(".py"):
+                target = self._python(importer_dir, spec)
+            elif importer.endswith(".go"):
+                target = self._go(spec)
+            else:
+                target = self._js(importer_dir, spec)
+            self._memo[key] = target
+        return self._memo[key]
+
+    @staticmethod
+    def _nearest(candidates, importer_dir):
+        def shared(rel):
+            a, b = rel.split("/"), importer_dir.split("/")
+            n = 0
+            while n < len(a) and n < len(b) and a[n] == b[n]:
+                n += 1
+            return n
+        return max(candidates, key=lambda rel: (shared(rel), -rel.count("/"), rel))
+
+    def _python_path(self, base, parts):
+        path = "/".join(p for p in [base] + parts if p)
+        if path in self.source_dirs:
+            return path
+        if path + ".py" in self.files:
+            return path.rpartition("/")[0]
+        return None
+
+    def _python(self, importer_dir, spec):
+        level = len(spec) - len(spec.lstrip("."))
+        parts = [p for p in spec[level:].split(".") if p]
+        if level:
+            base = importer_dir.split("/") if importer_dir else []
+            if level - 1 > len(base):
+                return None
+            base = "/".join(base[:len(base) - (level - 1)])
+            return self._python_path(base, parts) if parts else (base if base in self.source_dirs else None)
+        if not parts:
+            return None
+        targets = []
+        for rel in self.py_dirs.get(parts[0], ()):
+            target = self._python_path(rel, parts[1:])
+            if target is not None:
+                targets.append(target)
+        if len(parts) == 1:
+            targets.extend(self.py_files.get(parts[0], ()))
+        return self._nearest(targets, importer_dir) if targets else None
+
+    def _js_path(self, path):
+        path = posixpath.normpath(path)
+        if path.startswith(".."):
+            return None
+        path = "" if path == "." else path
+        if path in self.files:
+            return path.rpartition("/")[0]
+        for ext in JS_EXTENSIONS:
+            if path + ext in self.files:
+                return path.rpartition("/")[0]
+            if path + "/index" + ext in self.files:
+                return path
+        if path in self.source_dirs:
+            return path
+        return None
+
+    def _js(self, importer_dir, spec):
+        if spec.startswith("."):
+            return self._js_path(posixpath.join(importer_dir, spec))
+        if spec.startswith(("@/", "~/")):
+            root = importer_dir
+            while root and root not in self.package_roots:
+                root = root.rpartition("/")[0]
+            return self._js_path(posixpath.join(root, "src", spec[2:]))
+        for name in (spec, "/".join(spec.split("/")[:2]), spec.split("/")[0]):
+            base = self.packages.get(name)
+            if base is not None:
+                rest = spec[len(name):].lstrip("/")
+                return (self._js_path(posixpath.join(base, rest)) if rest else None) or base
+        return None
+
+    def _go(self, spec):
+        for module, base in self.go_modules.items():
+            if spec == module or spec.startswith(module + "/"):
+                path = posixpath.join(base, spec[len(module):].lstrip("/"))
+                path = posixpath.normpath(path)
+                path = "" if path == "." else path
+                return path if path in self.source_dirs else None
+        return None
+
+
+# -- Graph --------------------------------------------------------------------
+
+def module_depth(dirs, limit=MAX_MODULES):
+    """Largest truncation depth that leaves at most *limit* modules (min 1)."""
+    max_depth = max((d.count("/") + 1 for d in dirs if d), default=1)
+    for depth in range(max_depth, 0, -1):
+        if len({"/".join(d.split("/")[:depth]) for d in dirs}) <= limit:
+            return depth
+    return 1
+
+
+def strongly_connected(nodes, edges):
+    """Tarjan's algorithm (iterative); returns SCCs in reverse topological order."""
+    index, low, on_stack = {}, {}, set()
+    stack, sccs = [], []
+    counter = 0
+    for start in nodes:
+        if start in index:
+            continue
+        work = [(start, iter(sorted(edges.get(start, ()))))]
+        index[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(edges.get(child, ())))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                scc = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    scc.append(member)
+                    if member == node:
+                        break
+                sccs.append(sorted(scc))
+    return sccs
+
+
+def pagerank(nodes, edges):
+    """PageRank where an import passes rank from importer to importee."""
+    n = len(nodes)
+    if not n:
+        return {}
+    rank = dict.fromkeys(nodes, 1.0 / n)
+    out_weight = {node: sum(edges.get(node, {}).values()) for node in nodes}
+    for _ in range(PAGERANK_ITERATIONS):
+        dangling = sum(rank[node] for node in nodes if not out_weight[node])
+        base = (1 - PAGERANK_DAMPING) / n + PAGERANK_DAMPING * dangling / n
+        new = dict.fromkeys(nodes, base)
+        for node in nodes:
+            if out_weight[node]:
+                share = PAGERANK_DAMPING * rank[node] / out_weight[node]
+                for target, weight in edges[node].items():
+                    new[target] += share * weight
+        rank = new
+    return rank
+
+
+def build_graph(root, tree, manifests, jobs=None, cache=None):
+    """Build the component graph; return a dict.
+
+    ``components`` is ranked by centrality; each has ``name`` (a /path),
+    ``modules``, ``files``, ``languages``, ``rank``, ``cycle``,
+    ``dependencies`` and ``dependents`` (component names, heaviest
+    first).  ``module_of`` maps every source directory to its module and
+    ``component_of`` maps modules to component names.
+    """
+    files = []
+    for rel in sorted(tree):
+        prefix = rel + "/" if rel else ""
+        files.extend(prefix + name for name in tree[rel]["sources"])
+    imports = collect_imports(root, files, jobs, cache)
+    resolver = Resolver(tree, manifests)
+
+    dirs = sorted(resolver.source_dirs)
+    depth = module_depth(dirs)
+    module_of = {d: "/".join(d.split("/")[:depth]) for d in dirs}
+
+    def module_for(target_dir):
+        if target_dir not in module_of:
+            # A package directory without sources of its own: use its first module
+            prefix = target_dir + "/"
+            module_of[target_dir] = next(
+                (module_of[d] for d in dirs if d.startswith(prefix)), None)
+        return module_of[target_dir]
+
+    edges = {}
+    for rel in files:
+        source = module_of[rel.rpartition("/")[0]]
+        for spec in imports.get(rel, ()):
+            target_dir = resolver.resolve(rel, spec)
+            if target_dir is None:
+                continue
+            target = module_for(target_dir)
+            if target is None or target == source:
+                continue
+            out = edges.setdefault(source, {})
+            out[target] = out.get(target, 0) + 1
+
+    modules = sorted({m for m in module_of.values() if m is not None})
+    sccs = strongly_connected(modules, edges)
+    component_of = {}
+    taken = {"/" + m for m in modules}
+    for scc in sccs:
+        name = "/" + scc[0] if len(scc) == 1 else "/" + _common_prefix(scc)
+        if len(scc) > 1:
+            if name in taken:
+                name = " + ".join("/" + m for m in scc)
+            taken.add(name)
+        for module in scc:
+            component_of[module] = name
+
+    comp_edges = {}
+    for source, targets in edges.items():
+        a = component_of[source]
+        for target, weight in targets.items():
+            b = component_of[target]
+            if a != b:
+                out = comp_edges.setdefault(a, {})
+                out[b] = out.get(b, 0) + weight
+    names = sorted(set(component_of.values()))
+    rank = pagerank(names, comp_edges)
+
+    members = {}
+    for module, name in component_of.items():
+        members.setdefault(name, []).append(module)
+    dependents = {}
+    for a, targets in comp_edges.items():
+        for b, weight in targets.items():
+            dependents.setdefault(b, {})[a] = weight
+
+    stats = {}
+    for d in dirs:
+        entry = stats.setdefault(component_of[module_of[d]], [0, {}])
+        entry[0] += len(tree[d]["sources"])
+        for lang, count in tree[d]["langs"].items():
+            entry[1][lang] = entry[1].get(lang, 0) + count
+
+    def heaviest(weights):
+        return [name for name, _ in sorted(weights.items(), key=lambda item: (-item[1], item[0]))]
+
+    components = []
+    for name in sorted(names, key=lambda name: (-rank[name], -stats[name][0], name)):
+        components.append({
+            "name": name,
+            "modules": sorted("/" + m if m else "/" for m in members[name]),
+            "files": stats[name][0],
+            "languages": heaviest(stats[name][1]),
+            "rank": rank[name],
+            "cycle": len(members[name]) > 1,
+            "dependencies": heaviest(comp_edges.get(name, {})),
+            "dependents": heaviest(dependents.get(name, {})),
+        })
+    return {
+        "components": components,
+        "module_of": module_of,
+        "component_of": component_of,
+        "resolver": resolver,
+        "files": len(files),
+        "edges": sum(len(t) for t in edges.values()),
+    }
+
+
+def _common_prefix(paths):
+    parts = [p.split("/") for p in paths]
+    common = []
+    for segment in zip(*parts):
+        if len(set(segment)) != 1:
+            break
+        common.append(segment[0])
+    return "/".join(common)
+
+
+def component_for_path(graph, path):
+    """Return the component containing project path *path* (a file or dir), or None."""
+    rel = path.strip("/")
+    while True:
+        module = graph["module_of"].get(rel)
+        if module is not None and rel in graph["resolver"].source_dirs:
+            return graph["component_of"][module]
+        if not rel:
+            return None
+        rel = rel.rpartition("/")[0]
@@ -0,0 +1,784 @@
+#!/usr/bin/env python3
+"""
+project_scan.py - Single-pass project tree scanner for analyze.py.
+
+The tree is walked once with ``os.scandir``; every directory is one task
+on a thread pool, so directory listing and classification of its files
+overlap.  ``.gitignore`` files (and ``.git/info/exclude``) are honoured
+with git's semantics: patterns are relative to the file that declares
+them, the last matching pattern wins, deeper files override shallower
+ones, and an ignored directory is never entered.
+
+Each directory is reduced to a small fact record (file and language
+counts, manifests, entry-point and config candidates, test files), so
+memory stays proportional to the number of directories rather than
+files.  Only manifests and a bounded set of entry-point candidates are
+opened afterwards, again on the pool, to read their signatures.
+
+With a scan cache (see load_cache) every directory record is stored
+with its fingerprint: directory mtime, size and a hash of its entry
+list, plus the .gitignore rules in effect.  A directory whose mtime and
+size are unchanged (and older than the previous scan, so a same-tick
+modification cannot hide) costs one ``stat``; a directory whose listing
+hashes the same keeps its facts without reclassification.  Manifests
+and entry candidates are re-read only when their own mtime/size change.
+
+Python 3.6+ required. No external dependencies.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+# Never entered, whatever .gitignore says.
+SKIP_DIRS = frozenset([
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".cache",
+    ".next", ".nuxt", ".gradle", ".idea", ".vscode",
+])
+
+LANGUAGES = {
+    ".py": "Python", ".pyi": "Python",
+    ".js": "JavaScript", ".mjs": "JavaScript", ".cjs": "JavaScript", ".jsx": "JavaScript",
+    ".ts": "TypeScript", ".tsx": "TypeScript", ".mts": "TypeScript", ".cts": "TypeScript",
+    ".go": "Go", ".rs": "Rust", ".java": "Java", ".kt": "Kotlin", ".kts": "Kotlin",
+    ".scala": "Scala", ".rb": "Ruby", ".php": "PHP", ".cs": "C#", ".fs": "F#",
+    ".swift": "Swift", ".m": "Objective-C", ".mm": "Objective-C",
+    ".c": "C", ".h": "C", ".cc": "C++", ".cpp": "C++", ".cxx": "C++", ".hpp": "C++",
+    ".hh": "C++", ".dart": "Dart", ".ex": "Elixir", ".exs": "Elixir", ".erl": "Erlang",
+    ".hs": "Haskell", ".lua": "Lua", ".sh": "Shell", ".bash": "Shell",
+    ".vue": "Vue", ".svelte": "Svelte",
+}
+
+MANIFESTS = {
+    "package.json": "npm", "pyproject.toml": "python", "setup.py": "python",
+    "setup.cfg": "python", "Pipfile": "python", "go.mod": "go", "Cargo.toml": "rust",
+    "pom.xml": "maven", "build.gradle": "gradle", "build.gradle.kts": "gradle",
+    "Gemfile": "ruby", "composer.json": "php", "pubspec.yaml": "dart",
+    "mix.exs": "elixir", "Package.swift": "swift",
+    # Workspace markers (monorepo roots)
+    "pnpm-workspace.yaml": "workspace", "lerna.json": "workspace", "nx.json": "workspace",
+    "turbo.json": "workspace", "go.work": "workspace", "rush.json": "workspace",
+}
+REQUIREMENTS_RE = re.compile(r"^requirements(?:[-_.][\w.-]+)?\.txt$")
+DOTNET_PROJECT_RE = re.compile(r"\.(?:cs|fs|vb)proj$")
+
+ECOSYSTEMS = {
+    "npm": "Node.js", "python": "Python", "go": "Go", "rust": "Rust", "maven": "Java",
+    "gradle": "JVM", "ruby": "Ruby", "php": "PHP", "dart": "Dart", "elixir": "Elixir",
+    "swift": "Swift", "dotnet": ".NET",
+}
+
+CONFIG_RE = re.compile(
+    r"^(?:tsconfig(?:\.[\w-]+)?\.json|(?:vite|webpack|rollup|next|nuxt|svelte|astro|"
+    r"tailwind|jest|vitest|playwright|babel)\.config\.[cm]?[jt]s|angular\.json|"
+    r"tox\.ini|pytest\.ini|noxfile\.py|Makefile|Dockerfile|docker-compose\.ya?ml|"
+    r"compose\.ya?ml|\.env\.example|settings\.py|application\.(?:ya?ml|properties))$"
+)
+
+TEST_DIRS = frozenset(["test", "tests", "__tests__", "spec", "specs", "e2e", "testing"])
+TEST_FILE_RE = re.compile(
+    r"^(?:test_.+\.py|.+_test\.(?:py|go)|.+\.(?:test|spec)\.[cm]?[jt]sx?|"
+    r".+(?:Test|Tests|Spec)\.(?:java|kt|cs|swift)|.+_spec\.rb)$"
+)
+
+# Files whose imports import_graph.py extracts.
+SOURCE_EXTENSIONS = frozenset([
+    ".py", ".js", ".mjs", ".cjs", ".jsx", ".ts", ".tsx", ".mts", ".cts", ".go",
+])
+
+PY_ENTRY_RE = re.compile(r"^(?:__main__|manage|main|app|server|cli|run|wsgi|asgi)\.py$")
+JS_ENTRY_RE = re.compile(r"^(?:index|main|server|app|cli)\.(?:[cm]?js|jsx|ts|tsx|mts)$")
+JS_ENTRY_DIRS = frozenset(["", "src", "app", "server", "bin", "cli"])
+JVM_ENTRY_RE = re.compile(r"^\w*(?:Application|Main)\.(?:java|kt)$")
+
+# Bump whenever classification or signature reading changes so stale
+# cache entries are discarded instead of replayed.
+SCAN_CACHE_VERSION = 2
+# Entries modified this close to the previous scan are re-checked even if
+# their fingerprint matches (filesystem timestamps are coarse).
+RACY_WINDOW_NS = 2 * 10**9
+
+# Entry candidates opened per scan; the shallowest are kept.
+MAX_CANDIDATES = 500
+SIGNATURE_BYTES = 64 * 1024
+
+# dependency name -> (category, label).  Matched exactly against
+# structured manifests and as a prefix ("react" matches "react-dom")
+# against token-scanned ones.
+SIGNATURES = {
+    # JavaScript / TypeScript
+    "react": ("framework", "React"), "next": ("framework", "Next.js"),
+    "vue": ("framework", "Vue"), "nuxt": ("framework", "Nuxt"),
+    "@angular/core": ("framework", "Angular"), "svelte": ("framework", "Svelte"),
+    "@sveltejs/kit": ("framework", "SvelteKit"), "solid-js": ("framework", "Solid"),
+    "express": ("framework", "Express"), "fastify": ("framework", "Fastify"),
+    "koa": ("framework", "Koa"), "@nestjs/core": ("framework", "NestJS"),
+    "hono": ("framework", "Hono"), "electron": ("framework", "Electron"),
+    "react-native": ("framework", "React Native"), "expo": ("framework", "Expo"),
+    "typescript": ("language", "TypeScript"),
+    "tailwindcss": ("styling", "Tailwind CSS"), "styled-components": ("styling", "styled-components"),
+    "@emotion/react": ("styling", "Emotion"), "sass": ("styling", "Sass"),
+    "@mui/material": ("styling", "MUI"), "antd": ("styling", "Ant Design"),
+    "bootstrap": ("styling", "Bootstrap"),
+    "redux": ("state", "Redux"), "@reduxjs/toolkit": ("state", "Redux Toolkit"),
+    "zustand": ("state", "Zustand"), "mobx": ("state", "MobX"), "pinia": ("state", "Pinia"),
+    "vuex": ("state", "Vuex"), "jotai": ("state", "Jotai"), "recoil": ("state", "Recoil"),
+    "@tanstack/react-query": ("state", "TanStack Query"),
+    "vite": ("build", "Vite"), "webpack": ("build", "Webpack"), "rollup": ("build", "Rollup"),
+    "esbuild": ("build", "esbuild"), "parcel": ("build", "Parcel"), "turbo": ("build", "Turborepo"),
+    "nx": ("build", "Nx"), "lerna": ("build", "Lerna"),
+    "jest": ("testing", "Jest"), "vitest": ("testing", "Vitest"), "mocha": ("testing", "Mocha"),
+    "@playwright/test": ("testing", "Playwright"), "cypress": ("testing", "Cypress"),
+    "prisma": ("data", "Prisma"), "@prisma/client": ("data", "Prisma"),
+    "typeorm": ("data", "TypeORM"), "mongoose": ("data", "Mongoose"),
+    "sequelize": ("data", "Sequelize"), "drizzle-orm": ("data", "Drizzle"),
+    # Python
+    "django": ("framework", "Django"), "flask": ("framework", "Flask"),
+    "fastapi": ("framework", "FastAPI"), "starlette": ("framework", "Starlette"),
+    "tornado": ("framework", "Tornado"), "aiohttp": ("framework", "aiohttp"),
+    "streamlit": ("framework", "Streamlit"), "celery": ("framework", "Celery"),
+    "pytest": ("testing", "pytest"), "sqlalchemy": ("data", "SQLAlchemy"),
+    "pymongo": ("data", "PyMongo"), "poetry-core": ("build", "Poetry"),
+    "hatchling": ("build", "Hatch"), "maturin": ("build", "maturin"),
+    # Go (module paths, version suffix stripped)
+    "github.com/gin-gonic/gin": ("framework", "Gin"), "github.com/labstack/echo": ("framework", "Echo"),
+    "github.com/gofiber/fiber": ("framework", "Fiber"), "github.com/go-chi/chi": ("framework", "chi"),
+    "github.com/spf13/cobra": ("framework", "Cobra"), "google.golang.org/grpc": ("framework", "gRPC"),
+    "gorm.io/gorm": ("data", "GORM"), "github.com/stretchr/testify": ("testing", "testify"),
+    # Rust
+    "tokio": ("framework", "Tokio"), "actix-web": ("framework", "Actix Web"),
+    "axum": ("framework", "Axum"), "rocket": ("framework", "Rocket"),
+    "diesel": ("data", "Diesel"), "sqlx": ("data", "SQLx"),
+    # JVM / Ruby / PHP / .NET
+    "spring-boot": ("framework", "Spring Boot"), "junit": ("testing", "JUnit"),
+    "hibernate-core": ("data", "Hibernate"), "rails": ("framework", "Rails"),
+    "sinatra": ("framework", "Sinatra"), "rspec": ("testing", "RSpec"),
+    "laravel/framework": ("framework", "Laravel"), "symfony/framework-bundle": ("framework", "Symfony"),
+    "phpunit/phpunit": ("testing", "PHPUnit"), "microsoft.aspnetcore": ("framework", "ASP.NET Core"),
+    "xunit": ("testing", "xUnit"), "nunit": ("testing", "NUnit"),
+}
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_.@/-]+")
+_GO_VERSION_SUFFIX_RE = re.compile(r"/v\d+$")
+
+
+# -- .gitignore --------------------------------------------------------------
+
+def _translate(pattern):
+    """Translate a gitignore glob (without anchoring) to a regex body."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                i += 2
+                if i < n and pattern[i] == "/":
+                    out.append("(?:.*/)?")
+                    i += 1
+                else:
+                    out.append(".*")
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append("\\[")
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append("[" + body + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_gitignore(text):
+    """Return ``[(regex, negate, dir_only)]`` for the lines of a .gitignore."""
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        regex = _translate(line.lstrip("/"))
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        rules.append((regex, negate, dir_only))
+    return rules
+
+
+class _IgnoreFrame(object):
+    """The rules of one .gitignore, combined into one regex per entry type.
+
+    Alternatives are ordered last rule first, so the first alternative
+    that matches is the rule git would apply.
+    """
+
+    def __init__(self, base, rules):
+        self.prefix = len(base) + 1 if base else 0
+        self.file_re, self.file_negate = self._combine([r for r in rules if not r[2]])
+        self.dir_re, self.dir_negate = self._combine(rules)
+
+    @staticmethod
+    def _combine(rules):
+        if not rules:
+            return None, ()
+        rules = rules[::-1]
+        regex = "|".join("(?P<r{}>{})".format(i, r[0]) for i, r in enumerate(rules))
+        return re.compile(regex, re.S), tuple(r[1] for r in rules)
+
+    def match(self, rel, is_dir):
+        regex, negate = (self.dir_re, self.dir_negate) if is_dir else (self.file_re, self.file_negate)
+        if regex is None:
+            return None
+        m = regex.fullmatch(rel, self.prefix)
+        if m is None:
+            return None
+        return not negate[int(m.lastgroup[1:])]
+
+
+class IgnoreMatcher(object):
+    """Stack of .gitignore frames from the root down to one directory.
+
+    ``key`` identifies the rules in effect and is part of the cached
+    fingerprint of every directory.
+    """
+
+    def __init__(self, frames=(), key=""):
+        self.frames = tuple(frames)
+        self.key = key
+
+    def child(self, base, text):
+        rules = parse_gitignore(text)
+        if not rules:
+            return self
+        key = hashlib.sha1("\0".join((self.key, base, text)).encode("utf-8")).hexdigest()
+        return IgnoreMatcher(self.frames + (_IgnoreFrame(base, rules),), key)
+
+    def ignored(self, rel, is_dir=False):
+        for frame in reversed(self.frames):
+            result = frame.match(rel, is_dir)
+            if result is not None:
+                return result
+        return False
+
+
+def _read_text(path, limit=None):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            return fh.read(limit) if limit else fh.read()
+    except OSError:
+        return None
+
+
+def root_matcher(root):
+    """Matcher for the root: ``.git/info/exclude`` (the root .gitignore is
+    picked up by the walk like any other)."""
+    text = _read_text(os.path.join(root, ".git", "info", "exclude"))
+    return IgnoreMatcher().child("", text) if text else IgnoreMatcher()
+
+
+# -- Walk --------------------------------------------------------------------
+
+def classify_directory(rel, names):
+    """Reduce the (non-ignored) file names of one directory to facts."""
+    depth = rel.count("/") + 1 if rel else 0
+    dir_name = rel.rpartition("/")[2]
+    parent_name = rel.rpartition("/")[0].rpartition("/")[2]
+    has_package = "package.json" in names
+    langs = {}
+    manifests, entries, configs, sources = [], [], [], []
+    tests = 0
+    in_tests = any(part in TEST_DIRS for part in rel.split("/"))
+    for name in names:
+        ext = os.path.splitext(name)[1].lower()
+        lang = LANGUAGES.get(ext)
+        if lang:
+            langs[lang] = langs.get(lang, 0) + 1
+        if (ext in SOURCE_EXTENSIONS and not in_tests and not name.endswith(".d.ts")
+                and not TEST_FILE_RE.match(name)):
+            sources.append(name)
+        if name in MANIFESTS or REQUIREMENTS_RE.match(name) or DOTNET_PROJECT_RE.search(name):
+            manifests.append(name)
+        if CONFIG_RE.match(name):
+            configs.append(name)
+        if TEST_FILE_RE.match(name):
+            tests += 1
+        elif PY_ENTRY_RE.match(name) or JVM_ENTRY_RE.match(name):
+            entries.append(name)
+        elif name == "main.go" or (lang == "Go" and parent_name == "cmd"):
+            entries.append(name)
+        elif lang == "Rust" and (name == "main.rs" or rel.endswith("src/bin")):
+            entries.append(name)
+        elif JS_ENTRY_RE.match(name) and depth <= 3 and (has_package or dir_name in JS_ENTRY_DIRS):
+            entries.append(name)
+    return {
+        "files": len(names),
+        "langs": langs,
+        "manifests": sorted(manifests),
+        "entries": sorted(entries),
+        "configs": sorted(configs),
+        "sources": sorted(sources),
+        "tests": tests,
+    }
+
+
+def stat_key(st):
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _listing_hash(entries):
+    digest = hashlib.sha1()
+    for entry in sorted(entries, key=lambda e: e.name):
+        try:
+            kind = "d" if entry.is_dir(follow_symlinks=False) else "f"
+        except OSError:
+            kind = "?"
+        digest.update("{}\0{}\n".format(entry.name, kind).encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def _own_gitignore(path, cached):
+    """Return the cached ``[mtime, size, text]`` of *path*/.gitignore if it
+    is still current, else False."""
+    try:
+        st = os.stat(os.path.join(path, ".gitignore"))
+    except OSError:
+        return None if cached is None else False
+    if cached is not None and stat_key(st) == cached[:2]:
+        return cached
+    return False
+
+
+def scan_directory(root, rel, matcher, cached=None, trusted_before=0):
+    """List one directory; return ``(facts, [(child_rel, matcher)], record)``.
+
+    *cached* is the directory's record from the previous scan; *record*
+    is the one to store for the next.
+    """
+    path = os.path.join(root, rel) if rel else root
+    prefix = rel + "/" if rel else ""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, [], None
+    inherited = matcher.key
+    if cached is not None and cached["ignore"] != inherited:
+        cached = None
+    if cached is not None and st.st_mtime_ns < trusted_before and stat_key(st) == cached["fp"][:2]:
+        own = _own_gitignore(path, cached["gitignore"])
+        if own is not False:
+            if own:
+                matcher = matcher.child(rel, own[2])
+            facts = cached["facts"]
+            return facts, [(prefix + name, matcher) for name in facts["dirs"]], cached
+
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return None, [], None
+    listing = _listing_hash(entries)
+    own = None
+    for entry in entries:
+        if entry.name == ".gitignore":
+            text = _read_text(entry.path)
+            try:
+                own = stat_key(entry.stat()) + [text or ""]
+            except OSError:
+                own = [0, 0, text or ""]
+            if text:
+                matcher = matcher.child(rel, text)
+            break
+    record = {"fp": stat_key(st) + [listing], "ignore": inherited, "gitignore": own}
+    if (cached is not None and cached["fp"][2] == listing
+            and (cached["gitignore"] or [""])[-1] == (own or [""])[-1]):
+        facts = record["facts"] = cached["facts"]
+        return facts, [(prefix + name, matcher) for name in facts["dirs"]], record
+
+    names, dirs = [], []
+    for entry in entries:
+        name = entry.name
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if name not in SKIP_DIRS and not matcher.ignored(prefix + name, True):
+                    dirs.append(name)
+            elif entry.is_file(follow_symlinks=False):
+                if not matcher.ignored(prefix + name, False):
+                    names.append(name)
+        except OSError:
+            continue
+    facts = classify_directory(rel, names)
+    dirs.sort()
+    facts["dirs"] = dirs
+    record["facts"] = facts
+    return facts, [(prefix + name, matcher) for name in dirs], record
+
+
+def walk(root, jobs=None, cache=None):
+    """Scan the tree under *root*; return ``{rel_dir: facts}``.
+
+    Every directory is a task on a thread pool; finished tasks report
+    through a queue so scheduling stays O(1) per directory.  When *cache*
+    (from load_cache) is given, unchanged directories are reused and the
+    cache is updated in place to describe exactly the current tree.
+    """
+    jobs = jobs or min(32, (os.cpu_count() or 1) * 4)
+    previous = cache["dirs"] if cache is not None else {}
+    trusted_before = cache["scanned_at"] - RACY_WINDOW_NS if cache is not None else 0
+    scanned_at = int(time.time() * 1e9)
+    results = {}
+    records = {}
+    done = queue.Queue()
+
+    def task(rel, matcher):
+        try:
+            done.put((rel, scan_directory(root, rel, matcher, previous.get(rel), trusted_before), None))
+        except Exception as exc:  # reported on the main thread
+            done.put((rel, (None, [], None), exc))
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pool.submit(task, "", root_matcher(root))
+        outstanding = 1
+        while outstanding:
+            rel, (facts, children, record), error = done.get()
+            outstanding -= 1
+            if error is not None:
+                raise error
+            if facts is None:
+                continue
+            results[rel] = facts
+            records[rel] = record
+            for child, matcher in children:
+                pool.submit(task, child, matcher)
+                outstanding += 1
+    if cache is not None:
+        if records != previous:
+            cache["dirty"] = True
+        cache["dirs"] = records
+        cache["scanned_at"] = scanned_at
+    return results
+
+
+# -- Signatures --------------------------------------------------------------
+
+def _match_signature(name, prefix):
+    name = name.lower()
+    if name in SIGNATURES:
+        return name
+    if prefix:
+        for i, c in enumerate(name):
+            if c in "-./" and name[:i] in SIGNATURES:
+                return name[:i]
+    return None
+
+
+def _signature_labels(names, prefix):
+    found = []
+    for name in names:
+        key = _match_signature(name, prefix)
+        if key and SIGNATURES[key] not in found:
+            found.append(SIGNATURES[key])
+    return found
+
+
+def _join(base, path):
+    path = os.path.normpath(os.path.join(base, path)).replace(os.sep, "/")
+    return "" if path == "." else path
+
+
+def _read_package_json(text, info, base):
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        return
+    deps = []
+    for key in ("dependencies", "devDependencies", "peerDependencies"):
+        if isinstance(data.get(key), dict):
+            deps.extend(data[key])
+    info["signatures"] = _signature_labels(deps, prefix=False)
+    info["name"] = data.get("name")
+    engines = data.get("engines")
+    if isinstance(engines, dict) and isinstance(engines.get("node"), str):
+        info["version"] = engines["node"]
+    info["workspace"] = bool(data.get("workspaces"))
+    for field in ("main", "module"):
+        if isinstance(data.get(field), str):
+            info["entries"].append(("main", "/" + _join(base, data[field]), "package.json " + field))
+    bins = data.get("bin")
+    if isinstance(bins, str):
+        bins = {data.get("name") or "bin": bins}
+    if isinstance(bins, dict):
+        for name, path in sorted(bins.items()):
+            if isinstance(path, str):
+                info["entries"].append(("cli", "/" + _join(base, path), "bin " + name))
+    scripts = data.get("scripts")
+    if isinstance(scripts, dict) and isinstance(scripts.get("test"), str):
+        if "no test specified" not in scripts["test"]:
+            info["test_command"] = "npm test"
+
+
+def _read_pyproject(text, info):
+    data = None
+    if tomllib is not None:
+        try:
+            data = tomllib.loads(text)
+        except ValueError:
+            data = None
+    if data is None:
+        info["signatures"] = _signature_labels(_TOKEN_RE.findall(text), prefix=True)
+        return
+    project = data.get("project", {})
+    poetry = data.get("tool", {}).get("poetry", {})
+    deps = [re.split(r"[\s<>=!~;\[(]", d, 1)[0] for d in project.get("dependencies", [])]
+    for group in project.get("optional-dependencies", {}).values():
+        deps.extend(re.split(r"[\s<>=!~;\[(]", d, 1)[0] for d in group)
+    deps.extend(poetry.get("dependencies", {}))
+    deps.extend(poetry.get("dev-dependencies", {}))
+    for group in poetry.get("group", {}).values():
+        deps.extend(group.get("dependencies", {}))
+    deps.extend(re.split(r"[\s<>=!~;\[(]", d, 1)[0] for d in data.get("build-system", {}).get("requires", []))
+    info["signatures"] = _signature_labels([d.replace("_", "-") for d in deps], prefix=False)
+    info["name"] = project.get("name") or poetry.get("name")
+    info["version"] = project.get("requires-python")
+    scripts = dict(poetry.get("scripts", {}))
+    scripts.update(project.get("scripts", {}))
+    for name, target in sorted(scripts.items()):
+        if isinstance(target, str):
+            info["entries"].append(("cli", target, "script " + name))
+    if "pytest" in data.get("tool", {}):
+        info["test_command"] = "pytest"
+
+
+def _read_go_mod(text, info):
+    deps = []
+    in_block = False
+    for line in text.splitlines():
+        line = line.split("//", 1)[0].strip()
+        if line.startswith("module "):
+            info["name"] = line.split()[1]
+        elif line.startswith("go ") and len(line.split()) == 2:
+            info["version"] = line.split()[1]
+        elif line.startswith("require ("):
+            in_block = True
+        elif in_block and line == ")":
+            in_block = False
+        elif in_block or line.startswith("require "):
+            parts = line.replace("require ", "", 1).split()
+            if parts:
+                deps.append(_GO_VERSION_SUFFIX_RE.sub("", parts[0]))
+    info["signatures"] = _signature_labels(deps, prefix=True)
+    info["test_command"] = "go test ./..."
+
+
+def read_manifest(root, rel):
+    """Parse one manifest; return its facts."""
+    base, _, name = rel.rpartition("/")
+    kind = MANIFESTS.get(name)
+    if kind is None:
+        kind = "python" if REQUIREMENTS_RE.match(name) else "dotnet"
+    info = {"path": rel, "kind": kind, "name": None, "version": None, "signatures": [],
+            "entries": [], "workspace": kind == "workspace", "test_command": None}
+    text = _read_text(os.path.join(root, rel))
+    if text is None or kind == "workspace":
+        return info
+    try:
+        if name in ("package.json", "composer.json"):
+            if name == "package.json":
+                _read_package_json(text, info, base)
+            else:
+                data = json.loads(text)
+                deps = list(data.get("require", {})) + list(data.get("require-dev", {}))
+                info["signatures"] = _signature_labels(deps, prefix=False)
+                info["name"] = data.get("name")
+        elif name == "pyproject.toml":
+            _read_pyproject(text, info)
+        elif name == "go.mod":
+            _read_go_mod(text, info)
+        elif kind == "python" and name.endswith(".txt"):
+            deps = [re.split(r"[\s<>=!~;\[]", line.strip(), 1)[0]
+                    for line in text.splitlines() if line.strip() and line.strip()[0].isalnum()]
+            info["signatures"] = _signature_labels([d.replace("_", "-") for d in deps], prefix=False)
+        else:
+            info["signatures"] = _signature_labels(_TOKEN_RE.findall(text), prefix=True)
+    except (ValueError, AttributeError, TypeError):
+        pass
+    if info["test_command"] is None:
+        labels = [label for category, label in info["signatures"] if category == "testing"]
+        if kind == "python" and "pytest" in labels:
+            info["test_command"] = "pytest"
+        elif kind == "rust":
+            info["test_command"] = "cargo test"
+    return info
+
+
+_PY_SIGNATURES = (
+    ("execute_from_command_line", "main", "Django manage.py"),
+    ("FastAPI(", "app", "FastAPI app"),
+    ("Flask(__name__", "app", "Flask app"),
+    ("get_asgi_application", "app", "ASGI application"),
+    ("get_wsgi_application", "app", "WSGI application"),
+)
+_JS_SIGNATURES = (
+    ("NestFactory.create", "main", "NestJS bootstrap"),
+    ("createRoot(", "main", "React root"),
+    ("hydrateRoot(", "main", "React root"),
+    ("ReactDOM.render(", "main", "React root"),
+    ("createApp(", "main", "Vue app"),
+    ("bootstrapApplication(", "main", "Angular bootstrap"),
+    ("bootstrapModule(", "main", "Angular bootstrap"),
+    (".listen(", "main", "server"),
+)
+_PY_MAIN_RE = re.compile(r"""^if\s+__name__\s*==\s*['"]__main__['"]""", re.M)
+
+
+def read_entry(root, rel):
+    """Return ``(kind, rel, note)`` if the file's content marks an entry point."""
+    name = rel.rpartition("/")[2]
+    text = _read_text(os.path.join(root, rel), SIGNATURE_BYTES)
+    if text is None:
+        return None
+    ext = os.path.splitext(name)[1]
+    if ext == ".py":
+        if name == "__main__.py":
+            return ("main", rel, "python -m entry")
+        for marker, kind, note in _PY_SIGNATURES:
+            if marker in text:
+                return (kind, rel, note)
+        if _PY_MAIN_RE.search(text):
+            return ("main", rel, "script")
+    elif ext == ".go":
+        if re.search(r"^package main\b", text, re.M) and "func main()" in text:
+            return ("main", rel, "Go binary")
+    elif ext == ".rs":
+        if "fn main(" in text:
+            return ("main", rel, "Rust binary")
+    elif ext in (".java", ".kt"):
+        if "@SpringBootApplication" in text:
+            return ("main", rel, "Spring Boot application")
+        if "static void main(" in text or "fun main(" in text:
+            return ("main", rel, "JVM main")
+    else:
+        if text.startswith("#!"):
+            return ("cli", rel, "Node CLI")
+        for marker, kind, note in _JS_SIGNATURES:
+            if marker in text:
+                return (kind, rel, note)
+    return None
+
+
+def _cached_read(reader, root, rel, previous, trusted_before):
+    """Call ``reader(root, rel)`` unless *previous* holds a current result."""
+    try:
+        st = os.stat(os.path.join(root, rel))
+    except OSError:
+        return rel, None, reader(root, rel)
+    key = stat_key(st)
+    cached = previous.get(rel)
+    if cached is not None and cached[0] == key and st.st_mtime_ns < trusted_before:
+        return rel, cached, cached[1]
+    result = reader(root, rel)
+    return rel, [key, result], result
+
+
+def read_signatures(root, tree, jobs=None, cache=None):
+    """Read manifests and entry candidates found by :func:`walk`.
+
+    Returns ``(manifests, entries)`` sorted by path.  With *cache*, files
+    whose mtime and size are unchanged are not opened again.
+    """
+    manifest_paths, candidates = [], []
+    for rel, facts in tree.items():
+        prefix = rel + "/" if rel else ""
+        manifest_paths.extend(prefix + name for name in facts["manifests"])
+        candidates.extend(prefix + name for name in facts["entries"])
+    candidates.sort(key=lambda p: (p.count("/"), p))
+    candidates = candidates[:MAX_CANDIDATES]
+    jobs = jobs or min(32, (os.cpu_count() or 1) * 4)
+    previous = cache["files"] if cache is not None else {}
+    # walk() has already advanced scanned_at; the previous value is kept
+    trusted_before = cache["files_scanned_at"] - RACY_WINDOW_NS if cache is not None else 0
+    scanned_at = int(time.time() * 1e9)
+    records = {}
+
+    def read_all(reader, paths):
+        results = []
+        for rel, record, result in pool.map(
+                lambda rel: _cached_read(reader, root, rel, previous, trusted_before), paths):
+            if record is not None:
+                records[rel] = record
+            results.append(result)
+        return results
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        manifests = read_all(read_manifest, sorted(manifest_paths))
+        entries = [e for e in read_all(read_entry, candidates) if e]
+    entries.sort(key=lambda e: (e[1].count("/"), e[1]))
+    if cache is not None:
+        if records != previous:
+            cache["dirty"] = True
+        cache["files"] = records
+        cache["files_scanned_at"] = scanned_at
+    return manifests, entries
+
+
+# -- Cache -------------------------------------------------------------------
+
+def load_cache(path):
+    """Load a scan cache, returning an empty one if missing or stale."""
+    empty = {"version": SCAN_CACHE_VERSION, "scanned_at": 0, "files_scanned_at": 0,
+             "imports_scanned_at": 0, "dirs": {}, "files": {}, "imports": {}, "docs": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        return empty
+    if not isinstance(cache, dict) or cache.get("version") != SCAN_CACHE_VERSION:
+        return empty
+    for key, value in empty.items():
+        if not isinstance(cache.get(key), type(value)):
+            return empty
+    return cache
+
+
+def save_cache(path, cache):
+    """Atomically write *cache* to *path* if it changed; failures are non-fatal."""
+    if not cache.pop("dirty", False) and os.path.exists(path):
+        return
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(cache, fh, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        print("Warning: could not write scan cache {}: {}".format(path, exc))
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
@@ -3,56 +3,146 @@
 Git Diff Statistics Tool
 
 用于分析 git diff 输出并生成结构化的变更统计信息。
+
+只调用一次 git diff --raw --numstat -z，并从管道流式解析输出，
+不缓存整段输出；重命名/复制记录保留来源路径 (old_name)。
+
+大规模变更可用 --by / --depth / --top 按目录或模块汇总（ChangeTree），
+只输出汇总结果而不是完整文件列表。模块来自 .prizm-docs/root.prizm 的
+MODULE_INDEX，或 docs/AI_CONTEXT/ARCHITECTURE.md 的 DIRECTORY_MAP。
+
+--range A..B 统计提交区间的历史：文件变更频率（热点）、按时间段的变更
+行数和经常一起修改的文件对。每个提交的 numstat 按 SHA 缓存在
+<git-dir>/diff-stats/numstat.jsonl，已缓存的提交不再调用 git；未缓存的
+提交分片后由多个进程各自执行 git log --numstat。
 """
 
+import datetime
+import json
+import math
+import os
+import re
 import subprocess
 import sys
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 import argparse
 from collections import defaultdict
 
 
-def run_git_diff(target="HEAD"):
-    """执行 git diff 命令并返回输出"""
-    try:
-        result = subprocess.run(
-            ["git", "diff", target, "--stat", "--numstat"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error running git diff: {e.stderr}", file=sys.stderr)
-        sys.exit(1)
+# raw 状态首字母 -> files 分类；复制视为新增，old_name 记录来源
+STATUS_CATEGORY = {
+    'A': 'added',
+    'C': 'added',
+    'M': 'modified',
+    'T': 'modified',
+    'D': 'deleted',
+    'R': 'renamed',
+}
+
+CHUNK_SIZE = 1 << 16
+
+PRIZM_ROOT = os.path.join('.prizm-docs', 'root.prizm')
+ARCHITECTURE_DOC = os.path.join('docs', 'AI_CONTEXT', 'ARCHITECTURE.md')
+DEFAULT_DEPTH = 2
+
+# root.prizm:  - <source-path>: <file-count> files. <描述>. -> .prizm-docs/<path>.prizm
+PRIZM_MODULE_RE = re.compile(r'^\s*-\s+([^:\s][^:]*?)\s*:\s.*->')
+# ARCHITECTURE.md PATH_MAP:  - /<path> → <用途>
+PATH_MAP_RE = re.compile(r'^\s*-\s+(/\S*)\s+→\s+(.*)$')
+
+HISTORY_CACHE = os.path.join('diff-stats', 'numstat.jsonl')
+# 每个进程一次处理的提交数下限；未缓存提交少于 POOL_MIN_COMMITS 时不启用进程池
+SLICE_MIN_COMMITS = 200
+POOL_MIN_COMMITS = 1000
+# 同时修改超过该数量文件的提交（批量重构、格式化）不计入共同变更
+MAX_COCHANGE_FILES = 50
+MIN_COCHANGE_COMMITS = 2
+DEFAULT_HISTORY_TOP = 20
+PERIODS = ('day', 'week', 'month')
+COMMIT_MARK = '\x01'
+
+# 汇总节点的计数项
+TOTAL_KEYS = ('files', 'lines_added', 'lines_deleted', 'added', 'modified', 'deleted', 'renamed')
+
+
+def read_fields(stream, chunk_size=CHUNK_SIZE):
+    """按 NUL 切分 git -z 输出流，逐个产出字段"""
+    tail = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        fields = (tail + chunk).split(b'\0')
+        tail = fields.pop()
+        for field in fields:
+            yield field.decode('utf-8', 'replace')
+    if tail:
+        yield tail.decode('utf-8', 'replace')
+
+
+def parse_diff_stream(fields):
+    """解析 git diff --raw --numstat -z 的字段流，逐个产出变更记录
+
+    git 先输出全部 raw 记录（状态），再输出 numstat 记录（行数），
+    两者顺序一致；raw 记录暂存到对应的 numstat 记录到达为止。
+    记录格式：{'status', 'name', 'old_name', 'stats'}，
+    old_name 为重命名/复制的来源路径，其余为 None。
+    """
+    fields = iter(fields)
+    pending = {}
+    for field in fields:
+        if not field:
+            continue
+        if field.startswith(':'):
+            # :<旧模式> <新模式> <旧 sha> <新 sha> <状态>[相似度]
+            status = field.rsplit(' ', 1)[-1][0]
+            old_name = next(fields) if status in 'RC' else None
+            pending[next(fields)] = (status, old_name)
+            continue
+        added, deleted, name = field.split('\t', 2)
+        if not name:
+            # 重命名/复制：来源与目标路径在随后的两个字段中
+            next(fields)
+            name = next(fields)
+        status, old_name = pending.pop(name, ('M', None))
+        yield {
+            'status': status,
+            'name': name,
+            'old_name': old_name,
+            # 二进制文件的行数为 '-'
+            'stats': {
+                'added': int(added) if added.isdigit() else 0,
+                'deleted': int(deleted) if deleted.isdigit() else 0,
+            },
+        }
+    # 没有 numstat 记录的条目（如未合并文件）
+    for name, (status, old_name) in pending.items():
+        yield {'status': status, 'name': name, 'old_name': old_name,
+               'stats': {'added': 0, 'deleted': 0}}
 
 
 def get_diff_files(target="HEAD"):
-    """获取变更文件列表及其统计"""
+    """执行一次 git diff，流式产出变更记录（见 parse_diff_stream）"""
+    process = subprocess.Popen(
+        ["git", "diff", target, "--raw", "--numstat", "-z"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
     try:
-        # 获取文件名和状态
-        name_status = subprocess.run(
-            ["git", "diff", target, "--name-status"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # 获取详细统计
-        numstat = subprocess.run(
-            ["git", "diff", target, "--numstat"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        return name_status.stdout, numstat.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {e.stderr}", file=sys.stderr)
+        yield from parse_diff_stream(read_fields(process.stdout))
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode('utf-8', 'replace')
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        print(f"Error: {stderr}", file=sys.stderr)
         sys.exit(1)
 
 
-def parse_diff_stats(name_status_output, numstat_output):
-    """解析 diff 统计信息"""
+def parse_diff_stats(records):
+    """将变更记录按状态分类"""
     files = {
         'added': [],
         'modified': [],
@@ -60,57 +150,230 @@ def parse_diff_stats(name_status_output, numstat_output):
         'renamed': []
     }
     
-    stats = {}
-    
-    # 解析 numstat 获取行数统计
-    for line in numstat_output.strip().split('\n'):
-        if not line:
-            continue
-        parts = line.split('\t')
-        if len(parts) >= 3:
-            added = parts[0] if parts[0] != '-' else '0'
-            deleted = parts[1] if parts[1] != '-' else '0'
-            filename = parts[2]
-            stats[filename] = {
-                'added': int(added) if added.isdigit() else 0,
-                'deleted': int(deleted) if deleted.isdigit() else 0
-            }
-    
-    # 解析 name-status 获取文件状态
-    for line in name_status_output.strip().split('\n'):
-        if not line:
+    for record in records:
+        category = STATUS_CATEGORY.get(record['status'])
+        if category is None:
             continue
-        parts = line.split('\t')
-        if len(parts) >= 2:
-            status = parts[0][0]  # 取第一个字符
-            filename = parts[-1]  # 文件名
-            
-            file_stats = stats.get(filename, {'added': 0, 'deleted': 0})
-            
-            if status == 'A':
-                files['added'].append({
-                    'name': filename,
-                    'stats': file_stats
-                })
-            elif status == 'M':
-                files['modified'].append({
-                    'name': filename,
-                    'stats': file_stats
-                })
-            elif status == 'D':
-                files['deleted'].append({
-                    'name': filename,
-                    'stats': file_stats
-                })
-            elif status == 'R':
-                files['renamed'].append({
-                    'name': filename,
-                    'stats': file_stats
-                })
+        entry = {
+            'name': record['name'],
+            'stats': record['stats']
+        }
+        if record['old_name'] is not None:
+            entry['old_name'] = record['old_name']
+        files[category].append(entry)
     
     return files
 
 
+def load_modules(repo_root):
+    """读取模块路径列表，返回 (来源, [路径])；没有模块映射时返回 (None, [])"""
+    path = os.path.join(repo_root, PRIZM_ROOT)
+    if os.path.isfile(path):
+        modules = []
+        in_index = False
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if re.match(r'^\s*MODULE_INDEX:', line):
+                    in_index = True
+                    continue
+                if in_index:
+                    match = PRIZM_MODULE_RE.match(line)
+                    if match:
+                        modules.append(match.group(1).strip('/'))
+                    elif line.strip() and not line.lstrip().startswith('-'):
+                        break
+        if modules:
+            return PRIZM_ROOT, modules
+    path = os.path.join(repo_root, ARCHITECTURE_DOC)
+    if os.path.isfile(path):
+        modules = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                match = PATH_MAP_RE.match(line)
+                if match and not match.group(2).startswith('(placeholder'):
+                    modules.append(match.group(1).strip('/'))
+        if modules:
+            return ARCHITECTURE_DOC, modules
+    return None, []
+
+
+def run_git(args):
+    """执行 git 命令并返回输出，失败时退出"""
+    try:
+        result = subprocess.run(
+            ["git"] + args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Error: {e.stderr}", file=sys.stderr)
+        sys.exit(1)
+    return result.stdout
+
+
+def get_repo_root():
+    """git diff 输出的路径相对于仓库根目录"""
+    return run_git(["rev-parse", "--show-toplevel"]).strip()
+
+
+def _empty_totals():
+    return dict.fromkeys(TOTAL_KEYS, 0)
+
+
+class _Node(object):
+    __slots__ = ('children', 'totals', 'direct', 'module')
+
+    def __init__(self):
+        self.children = {}
+        self.totals = _empty_totals()   # 整个子树
+        self.direct = None              # 直接位于该目录下的文件
+        self.module = None              # 以该目录为根的模块路径
+
+
+class ChangeTree(object):
+    """按目录前缀汇总变更的前缀树
+
+    add() 在插入记录时沿路径累加，每个节点保存其子树的合计；同时把记录
+    计入路径上最深的模块（没有时计入 None），因此流式输入只需遍历一次。
+    """
+
+    def __init__(self, modules=()):
+        self.root = _Node()
+        self.modules = {}
+        for module in modules:
+            node = self._node(module.split('/') if module else [])
+            node.module = module
+            self.modules[module] = _empty_totals()
+        self.unassigned = _empty_totals()
+
+    def _node(self, parts):
+        node = self.root
+        for part in parts:
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _Node()
+            node = child
+        return node
+
+    @staticmethod
+    def _count(totals, record, category):
+        totals['files'] += 1
+        totals['lines_added'] += record['stats']['added']
+        totals['lines_deleted'] += record['stats']['deleted']
+        totals[category] += 1
+
+    def add(self, record):
+        category = STATUS_CATEGORY.get(record['status'])
+        if category is None:
+            return
+        node = self.root
+        module = node.module
+        self._count(node.totals, record, category)
+        for part in record['name'].split('/')[:-1]:
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _Node()
+            node = child
+            if node.module is not None:
+                module = node.module
+            self._count(node.totals, record, category)
+        if node.direct is None:
+            node.direct = _empty_totals()
+        self._count(node.direct, record, category)
+        self._count(self.modules[module] if module is not None else self.unassigned,
+                    record, category)
+
+    @property
+    def totals(self):
+        return self.root.totals
+
+    def by_directory(self, depth=DEFAULT_DEPTH):
+        """[(路径, 合计)]：depth 层的目录，以及更浅目录中直接包含的文件"""
+        groups = []
+        stack = [('', self.root, 0)]
+        while stack:
+            path, node, level = stack.pop()
+            if level == depth:
+                groups.append((path + '/', node.totals))
+                continue
+            if node.direct is not None:
+                groups.append((path + '/*' if path else '(根目录)', node.direct))
+            for name, child in node.children.items():
+                stack.append((path + '/' + name if path else name, child, level + 1))
+        return groups
+
+    def by_module(self):
+        """[(模块路径, 合计)]，未归属任何模块的文件记为 (未归属模块)"""
+        groups = [(module + '/' if module else '/', totals)
+                  for module, totals in self.modules.items() if totals['files']]
+        if self.unassigned['files']:
+            groups.append(('(未归属模块)', self.unassigned))
+        return groups
+
+
+def rank_groups(groups, top=None):
+    """按变更行数排序并保留前 top 项，其余合并为一项；返回 (分组, 合并项)"""
+    groups = sorted(groups, key=lambda g: (-(g[1]['lines_added'] + g[1]['lines_deleted']),
+                                           -g[1]['files'], g[0]))
+    if top is None or len(groups) <= top:
+        return groups, None
+    rest = _empty_totals()
+    for _, totals in groups[top:]:
+        for key in TOTAL_KEYS:
+            rest[key] += totals[key]
+    return groups[:top], (f"其他 {len(groups) - top} 项", rest)
+
+
+def build_rollup(tree, by, depth=DEFAULT_DEPTH, top=None, source=None):
+    """生成汇总结果（JSON 结构）"""
+    groups = tree.by_module() if by == 'module' else tree.by_directory(depth)
+    groups, other = rank_groups(groups, top)
+    rollup = {
+        'by': by,
+        'source': source,
+        'depth': depth if by == 'directory' else None,
+        'groups': [dict(path=path, **totals) for path, totals in groups],
+        'other': dict(path=other[0], **other[1]) if other else None,
+    }
+    return rollup
+
+
+def _width(text):
+    """显示宽度（中文字符占两列）"""
+    return sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in text)
+
+
+def print_rollup(totals, rollup):
+    """打印汇总视图"""
+    print("=" * 60)
+    print("📁 Git Diff 变更统计")
+    print("=" * 60)
+    print()
+    print(f"├── 新增文件: {totals['added']} 个")
+    print(f"├── 修改文件: {totals['modified']} 个")
+    print(f"├── 删除文件: {totals['deleted']} 个")
+    print(f"├── 重命名文件: {totals['renamed']} 个")
+    print(f"└── 总变更行数: +{totals['lines_added']} / -{totals['lines_deleted']}")
+    print()
+    if rollup['by'] == 'module':
+        print(f"📦 按模块汇总 ({rollup['source']}):")
+    else:
+        print(f"📂 按目录汇总 (深度 {rollup['depth']}):")
+    rows = rollup['groups'] + ([rollup['other']] if rollup['other'] else [])
+    width = max(_width(row['path']) for row in rows)
+    for row in rows:
+        counts = [f"{row[key]}{label}" for key, label in
+                  (('added', '新增'), ('modified', '修改'), ('deleted', '删除'), ('renamed', '重命名'))
+                  if row[key]]
+        padding = ' ' * (width - _width(row['path']))
+        print(f"   {row['path']}{padding}  {row['files']:>6} 文件  "
+              f"+{row['lines_added']}/-{row['lines_deleted']}  ({', '.join(counts)})")
+    print()
+    print("=" * 60)
+
+
 def print_summary(files):
     """打印变更摘要"""
     total_added = sum(f['stats']['added'] for category in files.values() for f in category)
@@ -130,7 +393,8 @@ def print_summary(files):
     if files['added']:
         print("📄 新增文件:")
         for f in files['added']:
-            print(f"   [新增] {f['name']} (+{f['stats']['added']})")
+            source = f" (复制自 {f['old_name']})" if 'old_name' in f else ''
+            print(f"   [新增] {f['name']} (+{f['stats']['added']}){source}")
         print()
     
     if files['modified']:
@@ -148,7 +412,7 @@ def print_summary(files):
     if files['renamed']:
         print("📋 重命名文件:")
         for f in files['renamed']:
-            print(f"   [重命名] {f['name']}")
+            print(f"   [重命名] {f['old_name']} → {f['name']} (+{f['stats']['added']}/-{f['stats']['deleted']})")
         print()
     
     print("=" * 60)
@@ -165,6 +429,219 @@ def print_summary(files):
     }
 
 
+# -- 提交区间历史 -------------------------------------------------------------
+
+def parse_log_stream(fields):
+    """解析 git log --format=<COMMIT_MARK>%H %ct --numstat -z 的字段流
+
+    逐个产出 (sha, 提交时间, [[路径, 新增行, 删除行], ...])；
+    重命名计入目标路径，二进制文件行数记为 0。
+    """
+    fields = iter(fields)
+    commit = None
+    for field in fields:
+        field = field.lstrip('\n')
+        if not field:
+            continue
+        if field.startswith(COMMIT_MARK):
+            if commit is not None:
+                yield commit
+            sha, _, timestamp = field[1:].partition(' ')
+            commit = (sha, int(timestamp), [])
+            continue
+        added, deleted, name = field.split('\t', 2)
+        if not name:
+            next(fields)
+            name = next(fields)
+        commit[2].append([name,
+                          int(added) if added.isdigit() else 0,
+                          int(deleted) if deleted.isdigit() else 0])
+    if commit is not None:
+        yield commit
+
+
+def read_commits(shas):
+    """用一次 git log 读取 shas 中每个提交的 numstat（可在子进程中运行）"""
+    process = subprocess.Popen(
+        ["git", "log", "--no-walk=unsorted", "--stdin", "-M", "--numstat", "-z",
+         f"--format={COMMIT_MARK}%H %ct"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    # git 读完全部标准输入后才开始输出
+    process.stdin.write(''.join(sha + '\n' for sha in shas).encode('ascii'))
+    process.stdin.close()
+    commits = list(parse_log_stream(read_fields(process.stdout)))
+    process.stdout.close()
+    stderr = process.stderr.read().decode('utf-8', 'replace')
+    process.stderr.close()
+    if process.wait() != 0:
+        raise RuntimeError(stderr)
+    return commits
+
+
+def load_commit_cache(path):
+    """读取 {sha: (提交时间, 文件列表)}；损坏的行忽略"""
+    cache = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    sha, timestamp, files = json.loads(line)
+                except ValueError:
+                    continue
+                cache[sha] = (timestamp, files)
+    except OSError:
+        pass
+    return cache
+
+
+def append_commit_cache(path, commits):
+    """把新读取的提交追加到缓存（一次写入）；失败不影响结果"""
+    lines = ''.join(json.dumps(commit, ensure_ascii=False, separators=(',', ':')) + '\n'
+                    for commit in commits)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+    except OSError as e:
+        print(f"Warning: 无法写入提交缓存 {path}: {e}", file=sys.stderr)
+
+
+def collect_history(revision_range, jobs=None, use_cache=True):
+    """返回区间内非合并提交的 [(sha, 提交时间, 文件列表)]，从新到旧"""
+    shas = run_git(["rev-list", "--no-merges", revision_range, "--"]).split()
+    cache_path = os.path.join(run_git(["rev-parse", "--git-common-dir"]).strip(), HISTORY_CACHE)
+    cache = load_commit_cache(cache_path) if use_cache else {}
+    missing = [sha for sha in shas if sha not in cache]
+
+    if missing:
+        workers = min(jobs or os.cpu_count() or 1,
+                      max(1, len(missing) // SLICE_MIN_COMMITS))
+        try:
+            if len(missing) < POOL_MIN_COMMITS or workers == 1:
+                commits = read_commits(missing)
+            else:
+                size = math.ceil(len(missing) / workers)
+                slices = [missing[i:i + size] for i in range(0, len(missing), size)]
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    commits = [commit for part in pool.map(read_commits, slices) for commit in part]
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        for sha, timestamp, files in commits:
+            cache[sha] = (timestamp, files)
+        if use_cache:
+            append_commit_cache(cache_path, commits)
+    return [(sha,) + tuple(cache[sha]) for sha in shas if sha in cache]
+
+
+def _period_key(timestamp, period):
+    day = datetime.datetime.utcfromtimestamp(timestamp).date()
+    if period == 'day':
+        return day.isoformat()
+    if period == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.strftime('%Y-%m')
+
+
+def analyze_history(commits, top=DEFAULT_HISTORY_TOP, period='month'):
+    """统计热点文件、时间线和共同变更文件对"""
+    per_file = {}
+    timeline = {}
+    pairs = {}
+    for sha, timestamp, files in commits:
+        key = _period_key(timestamp, period)
+        bucket = timeline.setdefault(key, {'period': key, 'commits': 0,
+                                           'lines_added': 0, 'lines_deleted': 0})
+        bucket['commits'] += 1
+        for name, added, deleted in files:
+            entry = per_file.get(name)
+            if entry is None:
+                entry = per_file[name] = {'path': name, 'commits': 0, 'lines_added': 0,
+                                          'lines_deleted': 0, 'first': timestamp, 'last': timestamp}
+            entry['commits'] += 1
+            entry['lines_added'] += added
+            entry['lines_deleted'] += deleted
+            entry['first'] = min(entry['first'], timestamp)
+            entry['last'] = max(entry['last'], timestamp)
+            bucket['lines_added'] += added
+            bucket['lines_deleted'] += deleted
+        names = sorted({name for name, _, _ in files})
+        if len(names) <= MAX_COCHANGE_FILES:
+            for i, a in enumerate(names):
+                for b in names[i + 1:]:
+                    pairs[(a, b)] = pairs.get((a, b), 0) + 1
+
+    hotspots = sorted(per_file.values(), key=lambda f: (
+        -f['commits'], -(f['lines_added'] + f['lines_deleted']), f['path']))
+    cochange = []
+    for (a, b), count in pairs.items():
+        if count >= MIN_COCHANGE_COMMITS:
+            # 共同修改次数 / 两个文件平均修改次数
+            degree = count * 2 / (per_file[a]['commits'] + per_file[b]['commits'])
+            cochange.append({'files': [a, b], 'commits': count, 'degree': round(degree, 3)})
+    cochange.sort(key=lambda p: (-p['commits'], -p['degree'], p['files']))
+    for entry in hotspots[:top]:
+        for field in ('first', 'last'):
+            entry[field] = datetime.datetime.utcfromtimestamp(entry[field]).date().isoformat()
+
+    return {
+        'commits': len(commits),
+        'files': len(per_file),
+        'lines_added': sum(f['lines_added'] for f in per_file.values()),
+        'lines_deleted': sum(f['lines_deleted'] for f in per_file.values()),
+        'hotspots': hotspots[:top],
+        'timeline': [timeline[key] for key in sorted(timeline)],
+        'cochange': cochange[:top],
+    }
+
+
+def print_history(revision_range, history):
+    """打印区间历史统计"""
+    print("=" * 60)
+    print(f"📈 提交历史统计: {revision_range}")
+    print("=" * 60)
+    print()
+    print(f"├── 提交: {history['commits']} 个（不含合并提交）")
+    print(f"├── 涉及文件: {history['files']} 个")
+    print(f"└── 总变更行数: +{history['lines_added']} / -{history['lines_deleted']}")
+    print()
+    if history['hotspots']:
+        print("🔥 热点文件（按修改次数）:")
+        for f in history['hotspots']:
+            print(f"   {f['commits']:>5} 次  +{f['lines_added']}/-{f['lines_deleted']}  "
+                  f"{f['path']} ({f['first']} ~ {f['last']})")
+        print()
+    if history['timeline']:
+        print("🕒 变更时间线:")
+        for bucket in history['timeline']:
+            print(f"   {bucket['period']:<10} {bucket['commits']:>5} 提交  "
+                  f"+{bucket['lines_added']}/-{bucket['lines_deleted']}")
+        print()
+    if history['cochange']:
+        print("🔗 经常一起修改的文件:")
+        for pair in history['cochange']:
+            a, b = pair['files']
+            print(f"   {pair['commits']:>5} 次  {pair['degree']:.0%}  {a} ↔ {b}")
+        print()
+    print("=" * 60)
+
+
+def history_main(args):
+    commits = collect_history(args.range, args.jobs, use_cache=not args.no_cache)
+    if not commits:
+        print(f"区间 {args.range} 中没有提交。")
+        return
+    history = analyze_history(commits, args.top or DEFAULT_HISTORY_TOP, args.period)
+    if args.json:
+        print(json.dumps(dict(range=args.range, **history), indent=2, ensure_ascii=False))
+    else:
+        print_history(args.range, history)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='分析 git diff 并生成变更统计'
@@ -179,20 +656,62 @@ def main():
         action='store_true',
         help='以 JSON 格式输出'
     )
+    parser.add_argument(
+        '--by',
+        choices=['auto', 'directory', 'module'],
+        help='按目录或模块汇总，代替完整文件列表 (auto: 有模块映射时按模块)'
+    )
+    parser.add_argument(
+        '--depth',
+        type=int,
+        help=f'按目录汇总的深度 (默认: {DEFAULT_DEPTH})'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        metavar='N',
+        help=f'只列出变更行数最多的 N 个分组 (--range 时默认: {DEFAULT_HISTORY_TOP})'
+    )
+    parser.add_argument(
+        '--range',
+        metavar='A..B',
+        help='统计提交区间的热点文件、时间线和共同变更（如 v1.0..HEAD）'
+    )
+    parser.add_argument(
+        '--period',
+        choices=PERIODS,
+        default='month',
+        help='--range 时间线的统计粒度 (默认: month)'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        help='--range 读取未缓存提交的进程数 (默认: CPU 数)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='--range 时不读写提交缓存'
+    )
     
     args = parser.parse_args()
     
-    name_status, numstat = get_diff_files(args.target)
+    if args.range:
+        history_main(args)
+        return
+    
+    if args.by or args.depth is not None or args.top is not None:
+        rollup_main(args)
+        return
     
-    if not name_status.strip() and not numstat.strip():
+    files = parse_diff_stats(get_diff_files(args.target))
+    
+    if not any(files.values()):
         print("没有发现未提交的变更。")
         print("提示: 使用 --target <commit> 来比较指定的提交。")
         return
     
-    files = parse_diff_stats(name_status, numstat)
-    
     if args.json:
-        import json
         result = {
             'files': files,
             'summary': {
@@ -207,5 +726,47 @@ def main():
         print_summary(files)
 
 
+def rollup_main(args):
+    """汇总模式：只在一次遍历中累加前缀树，不保留文件列表"""
+    by = args.by or ('directory' if args.depth is not None else 'auto')
+    source, modules = None, []
+    if by != 'directory':
+        source, modules = load_modules(get_repo_root())
+        if not modules:
+            if by == 'module':
+                print(f"Error: 没有找到模块映射 ({PRIZM_ROOT} 或 {ARCHITECTURE_DOC})", file=sys.stderr)
+                sys.exit(1)
+            by = 'directory'
+        else:
+            by = 'module'
+    
+    tree = ChangeTree(modules)
+    for record in get_diff_files(args.target):
+        tree.add(record)
+    
+    if not tree.totals['files']:
+        print("没有发现未提交的变更。")
+        print("提示: 使用 --target <commit> 来比较指定的提交。")
+        return
+    
+    rollup = build_rollup(tree, by, args.depth or DEFAULT_DEPTH, args.top, source)
+    totals = tree.totals
+    if args.json:
+        result = {
+            'summary': {
+                'added_files': totals['added'],
+                'modified_files': totals['modified'],
+                'deleted_files': totals['deleted'],
+                'renamed_files': totals['renamed'],
+                'total_lines_added': totals['lines_added'],
+                'total_lines_deleted': totals['lines_deleted']
+            },
+            'rollup': rollup
+        }
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_rollup(totals, rollup)
+
+
 if __name__ == '__main__':
     main()